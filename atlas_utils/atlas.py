@@ -24,12 +24,47 @@ def atlas_cli():
 @click.option("-p", "--padding", type=click.INT, default=2)
 @click.option("-rm", "--remove", type=click.BOOL, default=False)
 @click.option("-s", "--size", type=click.STRING, default=None)
-def make_atlas(image_glob, atlas_output, padding, remove, size: Optional[str] = None):
+@click.option(
+    "--incremental/--full",
+    default=False,
+    help="Keep placements of unchanged images, only rewriting pages that change",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.INT,
+    default=None,
+    help="Worker threads for --incremental",
+)
+def make_atlas(
+    image_glob,
+    atlas_output,
+    padding,
+    remove,
+    size: Optional[str] = None,
+    incremental: bool = False,
+    jobs: Optional[int] = None,
+):
     """Creates an atlas"""
     atlas_fp = Path(atlas_output)
     if not atlas_fp.suffix:
         atlas_fp = atlas_fp.with_suffix(".atlas")
 
+    if incremental:
+        img_files = glob(image_glob)
+        result = pack_incremental(
+            img_files, atlas_fp, padding, parse_size(size), max_workers=jobs
+        )
+        click.echo(
+            f"Kept {result.kept}, packed {result.packed}, removed {result.removed}. "
+            f"Wrote {len(result.written)} page(s), deleted {len(result.deleted)}"
+        )
+        if remove:
+            for f in img_files:
+                click.echo(f"Removing {f}")
+                os.unlink(f)
+        return
+
     if atlas_fp.exists():
         with open(atlas_fp, "r", encoding="utf-8") as fp:
             atlas_file = json.load(fp)
@@ -55,11 +90,7 @@ def make_atlas(image_glob, atlas_output, padding, remove, size: Optional[str] =
         atlas_size = max(max_w, max_h)
         atlas_size *= 6
     else:
-        size = size.lower().replace("x", ",").split(",")
-        if len(size) == 1:
-            atlas_size = (int(size[0]), int(size[0]))
-        else:
-            atlas_size = (int(size[0]), int(size[1]))
+        atlas_size = parse_size(size)
     os.environ["KIVY_NO_ARGS"] = "1"
     from kivy.atlas import Atlas
 
@@ -70,17 +101,187 @@ def make_atlas(image_glob, atlas_output, padding, remove, size: Optional[str] =
             os.unlink(f)
 
 
+import hashlib
 import json
 import os
+import sys
 from collections import namedtuple
-from typing import Tuple, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Tuple, Dict
 
 import click
 from PIL import Image
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "kvnoteafly"))
+from adapters.atlas.fs.packing import MaxRectsBin, page_size_for  # noqa: E402
+
 CropC = namedtuple("CropC", "x, y, w, h")
 
 
+def parse_size(size: Optional[str]) -> Optional[tuple[int, int]]:
+    if not size:
+        return None
+    size = size.lower().replace("x", ",").split(",")
+    if len(size) == 1:
+        return int(size[0]), int(size[0])
+    return int(size[0]), int(size[1])
+
+
+def hash_file(f: str) -> str:
+    digest = hashlib.sha256()
+    with open(f, "rb") as fp:
+        while chunk := fp.read(1 << 16):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_rgba(f: str) -> Image.Image:
+    """Decode `f` as RGBA, closing the file once read"""
+    with Image.open(f) as im:
+        return im.convert("RGBA")
+
+
+def manifest_path(atlas_fp: Path) -> Path:
+    """Hashes of the images packed into `atlas_fp`, kept alongside it"""
+    return atlas_fp.with_suffix(".manifest.json")
+
+
+class IncrementalResult(NamedTuple):
+    kept: int
+    packed: int
+    removed: int
+    written: list[str]
+    deleted: list[str]
+
+
+def pack_incremental(
+    img_files: list[str],
+    atlas_fp: Path,
+    padding: int = 2,
+    atlas_size: Optional[tuple[int, int]] = None,
+    max_workers: Optional[int] = None,
+) -> IncrementalResult:
+    """
+    Update an atlas in place from `img_files`
+
+    Images whose contents match the manifest keep their placement. Pages that lose or change an image are
+    repacked, along with new and changed images, which are first fitted into the free space of untouched pages.
+    Only pages that change are written. Hashing and decoding run on `max_workers` threads.
+
+    Without a manifest every existing page is treated as changed.
+    """
+    atlas_data: dict[str, dict[str, list[int]]] = {}
+    if atlas_fp.exists():
+        atlas_data = json.loads(atlas_fp.read_text(encoding="utf-8") or "{}")
+    manifest_fp = manifest_path(atlas_fp)
+    manifest: dict[str, str] = {}
+    if manifest_fp.exists():
+        manifest = json.loads(manifest_fp.read_text(encoding="utf-8"))
+
+    sources = {Path(f).stem: f for f in img_files}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        hashes = dict(zip(sources, pool.map(hash_file, sources.values())))
+
+    placed = {
+        name: (page, rect)
+        for page, members in atlas_data.items()
+        for name, rect in members.items()
+    }
+    unchanged = {
+        name
+        for name, digest in hashes.items()
+        if name in placed and manifest.get(name) == digest
+    }
+    affected = {page for name, (page, _) in placed.items() if name not in unchanged}
+    kept_pages = {
+        page: members
+        for page, members in atlas_data.items()
+        if page not in affected and (atlas_fp.parent / page).exists()
+    }
+    affected = set(atlas_data) - set(kept_pages)
+    kept = {name for members in kept_pages.values() for name in members}
+    to_pack = [name for name in sources if name not in kept]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        images = dict(
+            zip(
+                to_pack,
+                pool.map(lambda name: load_rgba(sources[name]), to_pack),
+            )
+        )
+
+    bins = {}
+    for page, members in kept_pages.items():
+        with Image.open(atlas_fp.parent / page) as page_img:
+            bins[page] = page_bin = MaxRectsBin(*page_img.size, padding)
+        for rect in members.values():
+            page_bin.place(rect)
+
+    if atlas_size is None:
+        if bins:
+            side = max(max(b.width, b.height) for b in bins.values())
+        else:
+            side = page_size_for((img.size for img in images.values()), padding)
+        atlas_size = side, side
+
+    # Pages freed by repacking are reused first, keeping the numbering compact
+    stem = atlas_fp.stem
+    free_names = sorted(affected, reverse=True)
+    next_n = 0
+
+    def new_page_name() -> str:
+        nonlocal next_n
+        if free_names:
+            return free_names.pop()
+        while (name := f"{stem}-{next_n}.png") in atlas_data or name in bins:
+            next_n += 1
+        return name
+
+    pages: dict[str, Image.Image] = {}
+    new_data = {page: dict(members) for page, members in kept_pages.items()}
+    for name in sorted(
+        to_pack, key=lambda n: images[n].width * images[n].height, reverse=True
+    ):
+        img = images[name]
+        page, rect = None, None
+        for page_name, page_bin in bins.items():
+            if (rect := page_bin.insert(img.width, img.height)) is not None:
+                page = page_name
+                break
+        if page is None:
+            page = new_page_name()
+            bins[page] = page_bin = MaxRectsBin(
+                max(atlas_size[0], img.width + padding),
+                max(atlas_size[1], img.height + padding),
+                padding,
+            )
+            pages[page] = Image.new("RGBA", (page_bin.width, page_bin.height))
+            new_data[page] = {}
+            rect = page_bin.insert(img.width, img.height)
+        if page not in pages:
+            with Image.open(atlas_fp.parent / page) as page_img:
+                pages[page] = page_img.convert("RGBA")
+        canvas = pages[page]
+        canvas.paste(img, (rect.x, canvas.height - rect.y - rect.h))
+        new_data[page][name] = list(rect)
+
+    for page, canvas in pages.items():
+        canvas.save(atlas_fp.parent / page)
+    deleted = sorted(affected - set(new_data))
+    for page in deleted:
+        (atlas_fp.parent / page).unlink(missing_ok=True)
+
+    atlas_fp.write_text(json.dumps(new_data), encoding="utf-8")
+    manifest_fp.write_text(json.dumps(hashes), encoding="utf-8")
+    return IncrementalResult(
+        kept=len(kept),
+        packed=len(to_pack),
+        removed=len(set(placed) - set(sources)),
+        written=sorted(pages),
+        deleted=deleted,
+    )
+
+
 def cropbox(coords, im):
     x, y, w, h = coords
 
@@ -25,6 +25,18 @@ class AbstractAtlasRepository(ABC):
     ):
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def locate(
+        self, name: str, atlas_name: str
+    ) -> tuple[Path, tuple[int, int, int, int]]:
+        """Return the atlas page holding an image, and its rect within the page"""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stamp(self, atlas_name: str) -> Optional[tuple[int, int]]:
+        """Return a stamp of the atlas that changes whenever it is rewritten"""
+        raise NotImplementedError
+
     @abc.abstractmethod
     def uri_for(self, name: str, atlas_name: str) -> str:
         """Return URI for Image"""
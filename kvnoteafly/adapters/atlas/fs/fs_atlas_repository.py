@@ -1,25 +1,25 @@
 from __future__ import annotations
 
-import asyncio
-import json
 import os
 import re
-import shutil
-import tempfile
-from _operator import itemgetter
-
 from pathlib import Path
-from typing import NamedTuple, NewType, Optional, Sequence, Union
+from typing import Callable, NamedTuple, Optional, Sequence, TYPE_CHECKING, Union
 
-import PIL.Image
 from kivy import Logger
-from kivy.atlas import Atlas as KivyAtlas
 
 from adapters.atlas.atlas_repository import AbstractAtlasRepository
-from adapters.atlas.fs.utils import read_img_sizes
-from utils import EnvironContext, LazyLoaded
+from adapters.atlas.fs.index import AtlasFileData, AtlasIndex, ImgPos
+from adapters.atlas.fs.ingest import ImageIngest
+from adapters.atlas.fs.packing import MaxRectsBin, page_size_for
+from adapters.atlas.fs.pages import PageCache
+from adapters.atlas.fs.utils import read_img_size, read_img_sizes
+from utils import LazyLoaded
+from utils.aio import IOLoop
+
+if TYPE_CHECKING:
+    import PIL.Image
 
-ImgParamType = Union[str, Path, PIL.Image.Image]
+ImgParamType = Union[str, Path, "PIL.Image.Image"]
 
 
 class AtlasItem(NamedTuple):
@@ -27,14 +27,6 @@ class AtlasItem(NamedTuple):
     path: Path
 
 
-X = NewType("X", int)
-Y = NewType("Y", int)
-W = NewType("W", int)
-H = NewType("H", int)
-ImgPos = NewType("ImgPos", tuple[X, Y, W, H])
-AtlasFileData = dict[str, dict[str, ImgPos]]
-
-
 class AtlasService(AbstractAtlasRepository):
     """
     Manages Atlases
@@ -48,9 +40,37 @@ class AtlasService(AbstractAtlasRepository):
     _storage_path: Optional[Path]
     _instance = None
 
-    def __init__(self, storage_path: Optional[Path | str] = None):
+    def __init__(
+        self,
+        storage_path: Optional[Path | str] = None,
+        compact_threshold: Optional[float] = None,
+        ingest: Optional[ImageIngest] = None,
+        page_cache_size: int = 4,
+    ):
+        """
+        Parameters
+        ----------
+        storage_path
+        compact_threshold
+            Optional, if set, atlases spanning several pages are compacted after a save that leaves their
+            utilization below this fraction
+        ingest
+            Normalizes category images before they are packed. Defaults to `ImageIngest()`
+        page_cache_size
+            Number of decoded atlas pages kept in memory by `get_from_atlas`
+
+        Attributes
+        ----------
+        invalidate_listeners
+            Called with the atlas name after an atlas is written or compacted, on the thread that wrote it
+        """
         self.storage_path = storage_path
+        self.compact_threshold = compact_threshold
+        self.ingest = ingest or ImageIngest()
+        self.pages = PageCache(page_cache_size)
         self._atlases = None
+        self._indexes: dict[str, AtlasIndex] = {}
+        self.invalidate_listeners: list[Callable[[str], None]] = []
 
     def __contains__(self, item):
         """
@@ -61,9 +81,7 @@ class AtlasService(AbstractAtlasRepository):
         if "." not in item:
             raise ValueError(f"Expected {item} to be of form atlas_name.image_name")
         atlas_name, image_name = item.split(".")
-        atlas_data = self._read_atlas(atlas_name)
-        image_names = set(name for name_grp in atlas_data.values() for name in name_grp)
-        return image_name in image_names
+        return image_name in self._index(atlas_name)
 
     @property
     def storage_path(self):
@@ -103,15 +121,18 @@ class AtlasService(AbstractAtlasRepository):
 
             raise KeyError(f"{atlas_name} does not exist") from e
 
-    def _read_atlas(self, atlas_name: str) -> AtlasFileData:
+    def _index(self, atlas_name: str) -> AtlasIndex:
         matched_item = self._match_atlas(atlas_name)
-        with matched_item.path.open(mode="r", encoding="utf-8") as fp:
-            return json.load(fp)
+        index = self._indexes.get(atlas_name)
+        if index is None or index.path != matched_item.path:
+            index = self._indexes[atlas_name] = AtlasIndex(matched_item.path)
+        return index
+
+    def _read_atlas(self, atlas_name: str) -> AtlasFileData:
+        return self._index(atlas_name).data()
 
     def _store_atlas(self, atlas_name, data):
-        matched_item = self._match_atlas(atlas_name)
-        with matched_item.path.open(mode="w+", encoding="utf-8") as fp:
-            json.dump(data, fp)
+        self._index(atlas_name).store(data)
 
     def _atlas_path(self, atlas_name: str) -> Path:
         matched_item = self._match_atlas(atlas_name)
@@ -126,17 +147,20 @@ class AtlasService(AbstractAtlasRepository):
         padding=2,
     ):
         """
-        Lazy implementation that will create an n+1 atlas image large enough to contain the passed images.
+        Pack images into the free space of existing atlas pages, adding pages only for what doesn't fit.
+
+        Existing members never move, so their uris and rects stay valid. If `compact_threshold` is set and the
+        atlas spans more than one page with utilization below it, the atlas is compacted afterwards.
 
         Parameters
         ----------
-        padding
-        image_names
         images
+        image_names
+            Names to store `images` under, lower cased
         atlas_name
         atlas_size
-            Optional, if not passed, will be inferred from existing atlas.
-            If passed, expects to be of form (width, height)
+            Optional, size of any new page, of form (width, height).
+            If not passed, will match the largest existing page, or be sized to fit `images`
         padding
             Defaults to 2
 
@@ -144,86 +168,214 @@ class AtlasService(AbstractAtlasRepository):
         -------
 
         """
+        import PIL.Image
 
-        def get_width(x: ImgPos):
-            return sum(itemgetter(0, 2)(x)) + padding
+        image_names = [name.lower() for name in image_names]
+        existing = {name.lower() for name in self._index(atlas_name).names()}
+        matched = existing & set(image_names)
+        if matched:
+            raise KeyError(f"{', '.join(matched)} are already preset in the atlas!")
 
-        def get_height(x: ImgPos):
-            return sum(itemgetter(1, 3)(x)) + padding
+        atlas_data = self._read_atlas(atlas_name)
+        bins = self._page_bins(atlas_name, atlas_data, padding)
+        new_imgs = sorted(
+            (
+                (name, PIL.Image.open(fp).convert("RGBA"))
+                for name, fp in zip(image_names, images)
+            ),
+            key=lambda x: x[1].width * x[1].height,
+            reverse=True,
+        )
 
-        def get_max_dimension(data: AtlasFileData):
-            w_max, h_max = 0, 0
-            for img, img_names in data.items():
-                w_max = max(
-                    w_max, max((get_width(img_names[k])) for k in img_names.keys())
+        if atlas_size:
+            page_w, page_h = atlas_size
+        elif bins:
+            page_w = max(b.width for b in bins.values())
+            page_h = max(b.height for b in bins.values())
+        else:
+            page_w = page_h = page_size_for((img.size for _, img in new_imgs), padding)
+
+        next_page = self._last_page_number(atlas_data) + 1
+        pages: dict[str, PIL.Image.Image] = {}
+        for name, img in new_imgs:
+            page, rect = None, None
+            for page_name, page_bin in bins.items():
+                if (rect := page_bin.insert(img.width, img.height)) is not None:
+                    page = page_name
+                    break
+            if page is None:
+                page = f"{atlas_name}-{next_page}.png".replace("_", "-")
+                next_page += 1
+                bins[page] = page_bin = MaxRectsBin(
+                    max(page_w, img.width + padding),
+                    max(page_h, img.height + padding),
+                    padding,
                 )
-                h_max = max(
-                    h_max, max((get_height(img_names[k])) for k in img_names.keys())
+                pages[page] = PIL.Image.new(
+                    "RGBA", (page_bin.width, page_bin.height), (0, 0, 0, 0)
                 )
-            return w_max, h_max
-
-        def get_last_image(data: AtlasFileData) -> int:
-            """
-            We know atlas images follow a pattern of `n.png`. Find the last `n` so we can increment
-            """
-            pattern = re.compile(r"(\d+)(?=.png)")
-            atlas_image_names = ",".join(data.keys())
-            atlas_image_numbers = (int(x) for x in pattern.findall(atlas_image_names))
-            try:
-                return max(atlas_image_numbers)
-            except ValueError:
-                return -1
-
-        def ensure_name_integrity(data: AtlasFileData) -> bool:
-            img_name_set = set(image_names)
-            img_names = set(
-                (name for name_grp in (v for v in data.values()) for name in name_grp)
-            )
-            matched = img_names & img_name_set
-            if matched:
-                raise KeyError(f"{', '.join(matched)} are already preset in the atlas!")
-            return True
-
-        atlas_data = self._read_atlas(atlas_name)
-        ensure_name_integrity(atlas_data)
-        if not atlas_size:
-            atlas_w, atlas_h = get_max_dimension(atlas_data)
-        else:
-            atlas_w, atlas_h = atlas_size
-
-        temp_dir_container = tempfile.TemporaryDirectory()
-        temp_dir_atlas = Path(temp_dir_container.name) / "kv_temp_atlas"
+                atlas_data[page] = {}
+                rect = page_bin.insert(img.width, img.height)
+            if page not in pages:
+                pages[page] = self.pages.get(
+                    self._atlas_path(atlas_name) / page
+                ).convert("RGBA")
+            canvas = pages[page]
+            canvas.paste(img, (rect.x, canvas.height - rect.y - rect.h))
+            atlas_data[page][name] = list(rect)
+
+        for page, canvas in pages.items():
+            self._write_page(atlas_name, page, canvas)
+        self._store_atlas(atlas_name, atlas_data)
+        self._invalidate(atlas_name)
 
-        with EnvironContext(dict(KIVY_NO_ARGS="1")):
-            out_name, meta = KivyAtlas.create(
-                os.fspath(temp_dir_atlas), images, (atlas_w, atlas_w)
-            )
+        utilization = self.page_utilization(atlas_name, padding)
+        Logger.info(
+            f"AtlasService: {atlas_name} page utilization "
+            + ", ".join(f"{k}: {v:.0%}" for k, v in utilization.items())
+        )
+        if (
+            self.compact_threshold is not None
+            and len(utilization) > 1
+            and self.utilization(atlas_name) < self.compact_threshold
+        ):
+            self.compact(atlas_name, padding)
 
-        # Now set about appending these atlas images
-        atlas_n_start = get_last_image(atlas_data) + 1
+    @staticmethod
+    def _last_page_number(data: AtlasFileData) -> int:
+        """
+        We know atlas images follow a pattern of `n.png`. Find the last `n` so we can increment
+        """
+        pattern = re.compile(r"(\d+)(?=.png)")
+        atlas_image_numbers = (int(x) for x in pattern.findall(",".join(data.keys())))
+        return max(atlas_image_numbers, default=-1)
+
+    def _page_bins(
+        self, atlas_name: str, data: AtlasFileData, padding: int
+    ) -> dict[str, MaxRectsBin]:
+        """A bin per existing page, with its members placed"""
+        bins = {}
+        folder = self._atlas_path(atlas_name)
+        for page, members in data.items():
+            try:
+                width, height = read_img_size(folder / page)
+            except FileNotFoundError:
+                continue
+            bins[page] = page_bin = MaxRectsBin(width, height, padding)
+            for rect in members.values():
+                page_bin.place(rect)
+        return bins
+
+    def _write_page(self, atlas_name: str, page: str, img: PIL.Image.Image):
+        dst = self._atlas_path(atlas_name) / page
+        tmp = dst.with_suffix(f".{os.getpid()}.tmp.png")
+        img.save(tmp)
+        os.replace(tmp, dst)
+        self.pages.invalidate(dst)
+
+    def _invalidate(self, atlas_name: str):
+        """
+        Drop Kivy's cached copies of this atlas so the next lookup reloads it, and tell listeners
 
-        def sort_atlas_imgs(p: Path):
-            return int(p.stem.rsplit("-")[-1])
+        Besides the atlas and its regions, Kivy caches each page it loads under the page's filename, which would
+        otherwise be reused for the rewritten page.
+        """
+        from kivy.cache import Cache
+
+        path = self._match_atlas(atlas_name).path
+        rfn = os.fspath(path.with_suffix(""))
+        Cache.remove("kv.atlas", rfn)
+        prefix = f"atlas://{rfn}/"
+        folder = os.path.abspath(path.parent)
+        for category in ("kv.image", "kv.texture"):
+            # Keys are of form "<filename>|<mipmap>|<count>"
+            for key in [
+                k
+                for k in Cache._objects.get(category, {})
+                if k.startswith(prefix)
+                or os.path.dirname(os.path.abspath(k.split("|", 1)[0])) == folder
+            ]:
+                Cache.remove(category, key)
+        for listener in self.invalidate_listeners:
+            listener(atlas_name)
+
+    def page_utilization(self, atlas_name: str, padding=2) -> dict[str, float]:
+        """Fraction of each page covered by images"""
+        return {
+            page: page_bin.utilization
+            for page, page_bin in self._page_bins(
+                atlas_name, self._read_atlas(atlas_name), padding
+            ).items()
+        }
+
+    def utilization(self, atlas_name: str) -> float:
+        """Fraction of all pages covered by images"""
+        bins = self._page_bins(atlas_name, self._read_atlas(atlas_name), 0)
+        total = sum(b.width * b.height for b in bins.values())
+        return sum(b.used_area for b in bins.values()) / total if total else 1.0
+
+    def compact(self, atlas_name: str, padding=2):
+        """
+        Repack every member of an atlas into as few pages as possible
 
-        atlas_img_dst_folder = self._atlas_path(atlas_name)
-        for i, atlas_img in enumerate(
-            sorted(Path(temp_dir_container.name).glob("*.png"), key=sort_atlas_imgs)
-        ):
-            atlas_img_name = f"{atlas_name}-{atlas_n_start + i}.png".replace("_", "-")
-            dst = (atlas_img_dst_folder / atlas_img_name).with_suffix(".png")
-            # Enforce lower casing
-            atlas_data.update(
-                {
-                    atlas_img_name: {
-                        k.lower(): v for k, v in meta[atlas_img.name].items()
-                    }
-                }
-            )
-            shutil.move(atlas_img, dst)
+        Members keep their names, so uris stay valid, but their pages and rects change. Pages left empty are deleted.
+        """
+        import PIL.Image
 
-        temp_dir_container.cleanup()
+        atlas_data = self._read_atlas(atlas_name)
+        folder = self._atlas_path(atlas_name)
+        members = []
+        for page, page_members in atlas_data.items():
+            if not (folder / page).exists():
+                continue
+            page_img = self.pages.get(folder / page)
+            for name, rect in page_members.items():
+                members.append((name, self._crop(page_img, rect).convert("RGBA")))
+        members.sort(key=lambda x: x[1].width * x[1].height, reverse=True)
+
+        side = page_size_for((img.size for _, img in members), padding)
+        compacted: AtlasFileData = {}
+        bins: dict[str, MaxRectsBin] = {}
+        pages: dict[str, PIL.Image.Image] = {}
+        for name, img in members:
+            page, rect = None, None
+            for page_name, page_bin in bins.items():
+                if (rect := page_bin.insert(img.width, img.height)) is not None:
+                    page = page_name
+                    break
+            if page is None:
+                page = f"{atlas_name}-{len(bins)}.png".replace("_", "-")
+                bins[page] = page_bin = MaxRectsBin(
+                    max(side, img.width + padding),
+                    max(side, img.height + padding),
+                    padding,
+                )
+                pages[page] = PIL.Image.new(
+                    "RGBA", (page_bin.width, page_bin.height), (0, 0, 0, 0)
+                )
+                compacted[page] = {}
+                rect = page_bin.insert(img.width, img.height)
+            canvas = pages[page]
+            canvas.paste(img, (rect.x, canvas.height - rect.y - rect.h))
+            compacted[page][name] = list(rect)
+
+        for page, canvas in pages.items():
+            self._write_page(atlas_name, page, canvas)
+        self._store_atlas(atlas_name, compacted)
+        for page in set(atlas_data) - set(compacted):
+            (folder / page).unlink(missing_ok=True)
+            self.pages.invalidate(folder / page)
+        self._invalidate(atlas_name)
+        Logger.info(
+            f"AtlasService: Compacted {atlas_name} from {len(atlas_data)} to {len(compacted)} pages"
+        )
 
-        self._store_atlas(atlas_name, atlas_data)
+    @staticmethod
+    def _crop(page: PIL.Image.Image, rect: ImgPos) -> PIL.Image.Image:
+        x, y, w, h = rect
+        # Atlas rects are measured from the bottom left
+        top = page.height - y - h
+        return page.crop((x, top, x + w, top + h))
 
     def get_from_atlas(self, name: str, atlas_name: str) -> PIL.Image.Image:
         """
@@ -237,29 +389,61 @@ class AtlasService(AbstractAtlasRepository):
         -------
 
         """
-        atlas_data = self._read_atlas(atlas_name)
-        matched_atlas_img, matched_img = self._match_atlas_member(
-            atlas_data, atlas_name, name
-        )
+        page_path, rect = self.locate(name, atlas_name)
+        return self._crop(self.pages.get(page_path), rect)
+
+    def locate(self, name: str, atlas_name: str) -> tuple[Path, ImgPos]:
+        """
+        Page holding an image, and its rect within the page
 
-        matched_img_size = matched_img[1]
-        atlas_path = self._atlas_path(atlas_name)
-        atlas_img_path = atlas_path / matched_atlas_img
-        img_obj = PIL.Image.open(atlas_img_path)
-        x, y, w, h = matched_img_size
-        cropped_im = img_obj.crop((x, (img_obj.height - h - y), x + w, y + h))
-        return cropped_im
-
-    def _match_atlas_member(
-        self, atlas_data: AtlasFileData, atlas_name: str, name: str
-    ) -> tuple[str, ImgPos]:
-        """Find an atlas member"""
-        for atlas_img, members in atlas_data.items():
-            matched_img = next((members[img] for img in members if img == name), None)
-            if matched_img:
-                return atlas_img, matched_img
-
-        raise KeyError(f"{name} not found in atlas {atlas_name}")
+        Raises
+        ------
+        KeyError
+            If the image is not in the atlas
+        """
+        entry = self._index(atlas_name).get(name)
+        if entry is None:
+            raise KeyError(f"{name} not found in atlas {atlas_name}")
+        return self._atlas_path(atlas_name) / entry.page, entry.rect
+
+    def get_many_from_atlas(
+        self, names: Sequence[str], atlas_name: str
+    ) -> dict[str, PIL.Image.Image]:
+        """
+        Retrieve several images from one atlas, decoding each page they span once
+
+        Parameters
+        ----------
+        names
+        atlas_name
+
+        Returns
+        -------
+        Mapping of name to image
+        """
+        index = self._index(atlas_name)
+        by_page: dict[str, list[tuple[str, ImgPos]]] = {}
+        for name in names:
+            entry = index.get(name)
+            if entry is None:
+                raise KeyError(f"{name} not found in atlas {atlas_name}")
+            by_page.setdefault(entry.page, []).append((name, entry.rect))
+
+        folder = self._atlas_path(atlas_name)
+        found = {}
+        for page_name, members in by_page.items():
+            page = self.pages.get(folder / page_name)
+            for name, rect in members:
+                found[name] = self._crop(page, rect)
+        return found
+
+    def stamp(self, atlas_name: str) -> Optional[tuple[int, int]]:
+        """Modified time (ns) and size of the `.atlas` file, or None if it doesn't exist"""
+        try:
+            st = self._match_atlas(atlas_name).path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
 
     def uri_for(self, name: str, atlas_name: str):
         matched = self._match_atlas(atlas_name)
@@ -274,20 +458,13 @@ class AtlasService(AbstractAtlasRepository):
         ]
         if new_imgs:
             Logger.info(f"Found new Images {new_imgs}")
-            img_sizes = asyncio.run(read_img_sizes([fp for _, fp in new_imgs]))
-            # Size the atlas to fit the largest image
-            k_large = max(
-                ((a, b) for a, b in img_sizes.values()), key=lambda x: x[0] * x[1]
-            )
-            # Add padding
-            k_large = max(k_large) + 4
-            names, paths = [], []
-            for cname, img_path in new_imgs:
-                names.append(cname.lower())
-                paths.append(img_path)
+            normalized = self.ingest.ingest(new_imgs)
+            img_sizes = IOLoop().run(read_img_sizes(list(normalized.values())))
+            # Only used if a new page is needed
+            side = page_size_for(img_sizes.values())
             self.save_to_atlas(
-                images=paths,
-                image_names=names,
+                images=list(normalized.values()),
+                image_names=list(normalized.keys()),
                 atlas_name="category_img",
-                atlas_size=(k_large, k_large),
+                atlas_size=(side, side),
             )
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple, NewType, Optional
+
+X = NewType("X", int)
+Y = NewType("Y", int)
+W = NewType("W", int)
+H = NewType("H", int)
+ImgPos = NewType("ImgPos", tuple[X, Y, W, H])
+AtlasFileData = dict[str, dict[str, ImgPos]]
+
+
+class AtlasEntry(NamedTuple):
+    page: str
+    """Atlas image file name, relative to the `.atlas` file"""
+    rect: ImgPos
+
+
+class AtlasIndex:
+    """
+    In-memory view of a single `.atlas` file
+
+    The file is read once and again only when its modified time or size changes, so lookups are dict hits.
+    Writes made through `store` update the index directly.
+
+    Parameters
+    ----------
+    path: Path
+        The `.atlas` file
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._stamp: Optional[tuple[int, int]] = None
+        self._data: AtlasFileData = {}
+        self._entries: dict[str, AtlasEntry] = {}
+
+    def _file_stamp(self) -> Optional[tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, data: AtlasFileData, stamp: Optional[tuple[int, int]]):
+        self._data = data
+        self._entries = {
+            name: AtlasEntry(page, tuple(rect))
+            for page, members in data.items()
+            for name, rect in members.items()
+        }
+        self._stamp = stamp
+
+    def refresh(self) -> bool:
+        """Reload if the file changed. Returns True if it was reloaded"""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        if stamp is None:
+            self._load({}, None)
+            return True
+        with self.path.open(mode="r", encoding="utf-8") as fp:
+            text = fp.read()
+        self._load(json.loads(text) if text.strip() else {}, stamp)
+        return True
+
+    def get(self, name: str) -> Optional[AtlasEntry]:
+        self.refresh()
+        return self._entries.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        self.refresh()
+        return name in self._entries
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._entries)
+
+    def names(self) -> set[str]:
+        self.refresh()
+        return set(self._entries)
+
+    def data(self) -> AtlasFileData:
+        """A copy of the file's contents, safe to modify and pass to `store`"""
+        self.refresh()
+        return {page: dict(members) for page, members in self._data.items()}
+
+    def store(self, data: AtlasFileData):
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp.open(mode="w", encoding="utf-8") as fp:
+            json.dump(data, fp)
+        os.replace(tmp, self.path)
+        self._load(
+            {page: dict(members) for page, members in data.items()},
+            self._file_stamp(),
+        )
@@ -0,0 +1,156 @@
+"""
+Normalizes category images before they are packed into an atlas
+
+Users drop whatever they have into a category folder, often photos many times larger than the button that shows them.
+Each image is decoded, downscaled to fit `size` x `size` and converted to RGBA in a process pool, then written as a
+PNG to the ingest cache. A manifest maps each category to a hash of its source file and of the normalized pixels, so
+an image that hasn't changed is never decoded again.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional, Sequence, TypedDict
+
+import kivy
+from kivy import Logger
+
+DEFAULT_SIZE = 128
+_CHUNK = 1 << 16
+
+
+class IngestRecord(TypedDict):
+    source: str
+    """sha256 of the source file and the target size"""
+    output: str
+    """sha256 of the normalized pixels"""
+    path: str
+
+
+def default_cache_dir() -> Path:
+    return Path(kivy.kivy_home_dir) / "noteafly" / "category_img"
+
+
+def source_key(path: Path | str, size: int) -> str:
+    digest = hashlib.sha256(str(size).encode())
+    with open(path, "rb") as fp:
+        while chunk := fp.read(_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_image(src: str, dst: str, size: int) -> str:
+    """
+    Downscale `src` to fit within `size` x `size` and save it to `dst` as an RGBA PNG
+
+    Runs in a worker process. Returns the sha256 of the normalized pixels.
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        # JPEGs can be decoded directly at a reduced scale, skipping most of the work
+        img.draft("RGB", (size, size))
+        img = ImageOps.exif_transpose(img).convert("RGBA")
+    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    img.save(tmp, format="PNG")
+    os.replace(tmp, dst)
+    return hashlib.sha256(img.tobytes()).hexdigest()
+
+
+class ImageIngest:
+    """
+    Cache of normalized images, keyed by name
+
+    Parameters
+    ----------
+    cache_dir: Optional[Path]
+        Where normalized images and the manifest are kept. Defaults to `<kivy home>/noteafly/category_img`
+    size: int
+        Longest side of a normalized image, in pixels
+    max_workers: Optional[int]
+        Size of the process pool. Defaults to the number of CPUs
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path | str] = None,
+        size: int = DEFAULT_SIZE,
+        max_workers: Optional[int] = None,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.size = size
+        self.max_workers = max_workers
+        self._manifest: Optional[dict[str, IngestRecord]] = None
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.cache_dir / "manifest.json"
+
+    @property
+    def manifest(self) -> dict[str, IngestRecord]:
+        if self._manifest is None:
+            try:
+                self._manifest = json.loads(self.manifest_path.read_text("utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def _store_manifest(self):
+        tmp = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.manifest), "utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def _is_current(self, name: str, key: str) -> bool:
+        record = self.manifest.get(name)
+        return (
+            record is not None
+            and record["source"] == key
+            and Path(record["path"]).exists()
+        )
+
+    def ingest(self, images: Sequence[tuple[str, Path | str]]) -> dict[str, Path]:
+        """
+        Normalize `images`, given as (name, path), reusing earlier results for unchanged sources
+
+        Returns
+        -------
+        Mapping of name to normalized image path
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        pending = []
+        for name, src in images:
+            key = source_key(src, self.size)
+            if not self._is_current(name, key):
+                dst = self.cache_dir / f"{name}.{key[:16]}.png"
+                pending.append((name, key, os.fspath(src), os.fspath(dst)))
+
+        if pending:
+            Logger.info(f"ImageIngest: Normalizing {len(pending)} image(s)")
+            for (name, key, _, dst), output in zip(pending, self._run(pending)):
+                previous = self.manifest.get(name)
+                if previous and previous["path"] != dst:
+                    Path(previous["path"]).unlink(missing_ok=True)
+                self.manifest[name] = IngestRecord(source=key, output=output, path=dst)
+            self._store_manifest()
+
+        return {name: Path(self.manifest[name]["path"]) for name, _ in images}
+
+    def _run(self, pending: list[tuple[str, str, str, str]]) -> list[str]:
+        jobs = [(src, dst, self.size) for _, _, src, dst in pending]
+        if len(jobs) > 1:
+            try:
+                # Spawned, as forking would copy the app's threads and GL state
+                with ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                ) as pool:
+                    return list(pool.map(normalize_image, *zip(*jobs)))
+            except (ImportError, NotImplementedError, OSError) as e:
+                # No working multiprocessing, e.g. on Android
+                Logger.warning(f"ImageIngest: Process pool unavailable, {e}")
+        return [normalize_image(*job) for job in jobs]
@@ -0,0 +1,142 @@
+"""
+MaxRects bin packing for atlas pages
+
+Rects use Kivy's atlas convention, `(x, y, w, h)` with `y` measured from the bottom of the page. The packer itself
+is indifferent to the origin, it only needs every rect in a bin to share one.
+"""
+from __future__ import annotations
+
+import math
+from typing import Iterable, NamedTuple, Optional, Sequence
+
+# Largest page we will create. Comfortably inside the GL_MAX_TEXTURE_SIZE of the Pi's GPU
+MAX_PAGE_SIZE = 2048
+
+
+class Rect(NamedTuple):
+    x: int
+    y: int
+    w: int
+    h: int
+
+    @property
+    def area(self) -> int:
+        return self.w * self.h
+
+    @property
+    def right(self) -> int:
+        return self.x + self.w
+
+    @property
+    def top(self) -> int:
+        return self.y + self.h
+
+    def intersects(self, other: "Rect") -> bool:
+        return not (
+            other.x >= self.right
+            or other.right <= self.x
+            or other.y >= self.top
+            or other.top <= self.y
+        )
+
+    def contains(self, other: "Rect") -> bool:
+        return (
+            other.x >= self.x
+            and other.y >= self.y
+            and other.right <= self.right
+            and other.top <= self.top
+        )
+
+
+class MaxRectsBin:
+    """
+    Tracks the free space of one page as a set of maximal free rectangles
+
+    Placement uses the best short side fit heuristic. Each image is padded by `padding` on its right and top edges,
+    and the reported rect excludes that padding.
+
+    Parameters
+    ----------
+    width: int
+    height: int
+    padding: int
+    """
+
+    def __init__(self, width: int, height: int, padding: int = 2):
+        self.width = width
+        self.height = height
+        self.padding = padding
+        self.free: list[Rect] = [Rect(0, 0, width, height)]
+        self.used_area = 0
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of the page covered by images, excluding padding"""
+        return self.used_area / (self.width * self.height)
+
+    def _find(self, w: int, h: int) -> Optional[Rect]:
+        best, best_short, best_long = None, math.inf, math.inf
+        for free in self.free:
+            if free.w < w or free.h < h:
+                continue
+            dw, dh = free.w - w, free.h - h
+            short, long = min(dw, dh), max(dw, dh)
+            if short < best_short or (short == best_short and long < best_long):
+                best, best_short, best_long = Rect(free.x, free.y, w, h), short, long
+        return best
+
+    def fits(self, w: int, h: int) -> bool:
+        return self._find(w + self.padding, h + self.padding) is not None
+
+    def insert(self, w: int, h: int) -> Optional[Rect]:
+        """Place a `w` x `h` image. Returns its rect, or None if the page has no room"""
+        found = self._find(w + self.padding, h + self.padding)
+        if found is None:
+            return None
+        self._occupy(found)
+        self.used_area += w * h
+        return Rect(found.x, found.y, w, h)
+
+    def place(self, rect: Sequence[int]):
+        """Mark an existing image as occupying the page"""
+        x, y, w, h = rect
+        self._occupy(Rect(x, y, w + self.padding, h + self.padding))
+        self.used_area += w * h
+
+    def _occupy(self, used: Rect):
+        split = []
+        for free in self.free:
+            if not free.intersects(used):
+                split.append(free)
+                continue
+            if used.x > free.x:
+                split.append(Rect(free.x, free.y, used.x - free.x, free.h))
+            if used.right < free.right:
+                split.append(Rect(used.right, free.y, free.right - used.right, free.h))
+            if used.y > free.y:
+                split.append(Rect(free.x, free.y, free.w, used.y - free.y))
+            if used.top < free.top:
+                split.append(Rect(free.x, used.top, free.w, free.top - used.top))
+        # Drop free rects that another one contains
+        split = [r for r in split if r.w > 0 and r.h > 0]
+        self.free = [
+            r
+            for i, r in enumerate(split)
+            if not any(
+                j != i and o.contains(r) and (o != r or j < i)
+                for j, o in enumerate(split)
+            )
+        ]
+
+
+def page_size_for(sizes: Iterable[tuple[int, int]], padding: int = 2) -> int:
+    """
+    Side of a square page with room for `sizes` and some headroom, rounded up to a multiple of 64
+    """
+    sizes = list(sizes)
+    if not sizes:
+        return 64
+    longest = max(max(w, h) for w, h in sizes) + padding
+    area = sum((w + padding) * (h + padding) for w, h in sizes)
+    side = max(longest, math.ceil(math.sqrt(area * 1.25)))
+    return max(longest, min(MAX_PAGE_SIZE, 64 * math.ceil(side / 64)))
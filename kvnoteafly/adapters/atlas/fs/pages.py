@@ -0,0 +1,78 @@
+"""
+Bounded cache of decoded atlas pages
+"""
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import PIL.Image
+
+PageStamp = tuple[int, int]
+
+
+class PageCache:
+    """
+    Least recently used cache of decoded atlas pages
+
+    Pages are decoded in full and their file closed straight away, so no handle outlives a lookup. An entry is
+    reloaded when its file's modified time or size changes. Evicted pages are closed, releasing their pixel data.
+
+    Callers must not modify a returned page, crop or copy it instead.
+
+    Parameters
+    ----------
+    max_pages: int
+    """
+
+    def __init__(self, max_pages: int = 4):
+        self.max_pages = max_pages
+        self._pages: OrderedDict[
+            Path, tuple[PageStamp, "PIL.Image.Image"]
+        ] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, path: Path | str) -> bool:
+        return Path(path) in self._pages
+
+    def get(self, path: Path | str) -> "PIL.Image.Image":
+        path = Path(path)
+        st = os.stat(path)
+        stamp = st.st_mtime_ns, st.st_size
+        cached = self._pages.get(path)
+        if cached is not None and cached[0] == stamp:
+            self.hits += 1
+            self._pages.move_to_end(path)
+            return cached[1]
+
+        self.misses += 1
+        import PIL.Image
+
+        with PIL.Image.open(path) as img:
+            img.load()
+        self.invalidate(path)
+        self._pages[path] = stamp, img
+        while len(self._pages) > self.max_pages:
+            _, (_, evicted) = self._pages.popitem(last=False)
+            evicted.close()
+        return img
+
+    def invalidate(self, path: Optional[Path | str] = None):
+        """Drop `path`, or every page if not given"""
+        paths = [Path(path)] if path is not None else list(self._pages)
+        for p in paths:
+            if (cached := self._pages.pop(p, None)) is not None:
+                cached[1].close()
+
+    def close(self):
+        self.invalidate()
+
+    def stats(self) -> dict[str, int]:
+        return {"pages": len(self), "hits": self.hits, "misses": self.misses}
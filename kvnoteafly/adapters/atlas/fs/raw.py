@@ -0,0 +1,146 @@
+"""
+Pre-decoded atlas pages
+
+A raw page is a sidecar to an atlas page PNG, `keys-0.png.rgba` next to `keys-0.png`, holding the decoded RGBA
+pixels behind a small header. Loading one maps the file into memory and hands it straight to the texture upload,
+with no PNG decode. Pages can instead be LZ4 compressed, trading some of that for size, which needs the optional
+`lz4` package to read.
+
+The header records the modified time and size of the PNG it was made from. A sidecar that no longer matches its
+PNG is ignored, as is one that can't be read, and the PNG is decoded as usual.
+
+`install` puts `ImageLoaderRawPage` ahead of Kivy's PNG loaders, so `atlas://` uris are unaffected. Sidecars are
+written by running this module, e.g. as a packaging step::
+
+    python -m adapters.atlas.fs.raw [--lz4] [static_dir]
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Union
+
+from kivy import Logger
+from kivy.core.image import ImageData, ImageLoader, ImageLoaderBase
+
+RAW_SUFFIX = ".rgba"
+MAGIC = b"KVRGBA01"
+FLAG_LZ4 = 1
+# magic, width, height, flags, png modified time (ns), png size
+HEADER = struct.Struct("<8sIIIQQ")
+
+
+def raw_path(png_path: Union[Path, str]) -> Path:
+    png_path = Path(png_path)
+    return png_path.with_name(png_path.name + RAW_SUFFIX)
+
+
+def _png_stamp(png_path: Union[Path, str]) -> tuple[int, int]:
+    st = os.stat(png_path)
+    return st.st_mtime_ns, st.st_size
+
+
+def write_raw_page(png_path: Union[Path, str], compress: bool = False) -> Path:
+    """Decode `png_path` and write its raw sidecar"""
+    from PIL import Image
+
+    with Image.open(png_path) as img:
+        img = img.convert("RGBA")
+    pixels = img.tobytes()
+    flags = 0
+    if compress:
+        import lz4.frame
+
+        pixels = lz4.frame.compress(pixels)
+        flags |= FLAG_LZ4
+    mtime_ns, size = _png_stamp(png_path)
+    dst = raw_path(png_path)
+    tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as fp:
+        fp.write(HEADER.pack(MAGIC, img.width, img.height, flags, mtime_ns, size))
+        fp.write(pixels)
+    os.replace(tmp, dst)
+    return dst
+
+
+def read_raw_page(png_path: Union[Path, str]) -> Optional[ImageData]:
+    """Pixels of `png_path` from its sidecar, or None if there is no usable sidecar"""
+    path = raw_path(png_path)
+    try:
+        with open(path, "rb") as fp:
+            magic, width, height, flags, mtime_ns, size = HEADER.unpack(
+                fp.read(HEADER.size)
+            )
+            if magic != MAGIC or (mtime_ns, size) != _png_stamp(png_path):
+                Logger.debug(f"RawPage: {path} is stale")
+                return None
+            if flags & FLAG_LZ4:
+                try:
+                    import lz4.frame
+                except ImportError:
+                    Logger.warning(f"RawPage: lz4 is not installed, ignoring {path}")
+                    return None
+                pixels = lz4.frame.decompress(fp.read())
+            else:
+                # Copy on write, as texture uploads want a writable buffer. Pages are only read, so only touched
+                # pages are ever loaded from disk
+                mapped = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_COPY)
+                pixels = memoryview(mapped)[HEADER.size :]
+    except (FileNotFoundError, struct.error):
+        return None
+    if len(pixels) != width * height * 4:
+        Logger.warning(f"RawPage: {path} is truncated")
+        return None
+    return ImageData(width, height, "rgba", pixels, source=os.fspath(png_path))
+
+
+class ImageLoaderRawPage(ImageLoaderBase):
+    """Loads PNGs from their raw sidecar when there is one, otherwise with the next PNG loader"""
+
+    @staticmethod
+    def extensions():
+        return ("png",)
+
+    def load(self, filename):
+        data = read_raw_page(filename)
+        if data is not None:
+            return [data]
+        fallback = next(
+            loader
+            for loader in ImageLoader.loaders
+            if loader is not ImageLoaderRawPage and "png" in loader.extensions()
+        )
+        return fallback(filename, nocache=True)._data
+
+
+def install():
+    """Load atlas pages, and any other PNG, from raw sidecars where present"""
+    if ImageLoaderRawPage not in ImageLoader.loaders:
+        # Loaders are tried in order, the first supporting the extension wins
+        ImageLoader.loaders.insert(0, ImageLoaderRawPage)
+
+
+def write_raw_pages(static_dir: Union[Path, str], compress: bool = False) -> int:
+    """Write sidecars for every page of every atlas under `static_dir`. Returns the number written"""
+    import json
+
+    count = 0
+    for atlas_path in sorted(Path(static_dir).resolve().rglob("*.atlas")):
+        text = atlas_path.read_text(encoding="utf-8")
+        for page in json.loads(text) if text.strip() else {}:
+            if (atlas_path.parent / page).exists():
+                write_raw_page(atlas_path.parent / page, compress)
+                count += 1
+    return count
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write raw sidecars for atlas pages")
+    parser.add_argument("static_dir", nargs="?", default="static")
+    parser.add_argument("--lz4", action="store_true", help="LZ4 compress the pixels")
+    args = parser.parse_args()
+    print(f"Wrote {write_raw_pages(args.static_dir, args.lz4)} raw pages")
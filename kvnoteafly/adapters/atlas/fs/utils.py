@@ -1,19 +1,90 @@
 from __future__ import annotations
 
 import asyncio
+import struct
 from pathlib import Path
-from typing import Sequence
+from typing import BinaryIO, Optional, Sequence
 
-from PIL import Image
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Start of frame markers carry the dimensions. C4, C8 and CC share the range but are not frames
+JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field
+JPEG_STANDALONE = frozenset(range(0xD0, 0xDA)) | {0x01}
+# Concurrent probes, and so open files
+MAX_OPEN = 32
 
 
-async def _read_img_size(f: Path | str) -> tuple[int, int]:
-    img = Image.open(f)
-    return img.width, img.height
+def _png_size(header: bytes) -> Optional[tuple[int, int]]:
+    if header[:8] == PNG_SIGNATURE and header[12:16] == b"IHDR":
+        return struct.unpack(">II", header[16:24])
+    return None
+
+
+def _gif_size(header: bytes) -> Optional[tuple[int, int]]:
+    if header[:6] in (b"GIF87a", b"GIF89a"):
+        return struct.unpack("<HH", header[6:10])
+    return None
+
+
+def _jpeg_size(fp: BinaryIO) -> Optional[tuple[int, int]]:
+    fp.seek(2)
+    while True:
+        byte = fp.read(1)
+        if not byte:
+            return None
+        if byte != b"\xff":
+            continue
+        marker = fp.read(1)
+        # Fill bytes
+        while marker == b"\xff":
+            marker = fp.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code in JPEG_STANDALONE or code == 0x00:
+            continue
+        length = fp.read(2)
+        if len(length) < 2:
+            return None
+        if code in JPEG_SOF:
+            frame = fp.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack(">xHH", frame)
+            return width, height
+        fp.seek(struct.unpack(">H", length)[0] - 2, 1)
+
+
+def read_img_size(f: Path | str) -> tuple[int, int]:
+    """
+    Width and height of an image, read from its header
+
+    PNG, JPEG and GIF headers are parsed directly. Anything else is identified by PIL, which also only reads
+    the header.
+    """
+    with open(f, "rb") as fp:
+        header = fp.read(24)
+        size = _png_size(header) or _gif_size(header)
+        if size is None and header[:2] == b"\xff\xd8":
+            size = _jpeg_size(fp)
+    if size is not None:
+        return size
+
+    from PIL import Image
+
+    with Image.open(f) as img:
+        return img.size
 
 
 async def read_img_sizes(
-    imgs: Sequence[Path | str],
+    imgs: Sequence[Path | str], max_open: int = MAX_OPEN
 ) -> dict[Path | str, tuple[int, int]]:
-    sizes = await asyncio.gather(*[_read_img_size(f) for f in imgs])
+    """Probe `imgs` concurrently on worker threads, with at most `max_open` files open at once"""
+    limit = asyncio.Semaphore(max_open)
+
+    async def probe(f: Path | str) -> tuple[int, int]:
+        async with limit:
+            return await asyncio.to_thread(read_img_size, f)
+
+    sizes = await asyncio.gather(*[probe(f) for f in imgs])
     return {f: size for f, size in zip(imgs, sizes)}
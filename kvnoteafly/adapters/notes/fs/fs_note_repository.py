@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 from pathlib import Path
 from typing import Optional, cast, TYPE_CHECKING
 
@@ -17,6 +16,8 @@ from adapters.notes.note_repository import (
     NoteIndex,
 )
 from domain.markdown_note import MarkdownNote
+from utils.aio import IOLoop
+from utils.tracing import trace
 
 if TYPE_CHECKING:
     from domain.editable import EditableNote
@@ -53,6 +54,7 @@ class FileSystemNoteRepository(AbstractNoteRepository):
     def storage_path(self, value: Path | str):
         self._storage_path = Path(value)
 
+    @trace("discovery")
     def discover_notes(self, *args) -> list[NoteDiscovery]:
         """
         Read `self.storage_path` looking for children folders and the associated notes within each.
@@ -66,7 +68,7 @@ class FileSystemNoteRepository(AbstractNoteRepository):
 
         List of tuples: (category_name, img_path)
         """
-        note_files_bulk = asyncio.run(
+        note_files_bulk = IOLoop().run(
             get_folder_files(self.storage_path, discover=discover_folder_notes)
         )
 
@@ -74,7 +76,8 @@ class FileSystemNoteRepository(AbstractNoteRepository):
         def is_md(p: Path):
             return p.suffix == ".md"
 
-        self._category_files.clear()
+        # Swapped in whole, as discovery may run off the main thread
+        category_files = {}
         discovery = []
         for category_name, cat_files in note_files_bulk.items():
             ext_file_groups = groupby(is_md, cat_files)
@@ -84,8 +87,9 @@ class FileSystemNoteRepository(AbstractNoteRepository):
             discovery.append(
                 NoteDiscovery(category=category_name, image_path=img, notes=note_files)
             )
-            self._category_files[category_name] = note_files
+            category_files[category_name] = note_files
 
+        self._category_files = category_files
         return discovery
 
     @property
@@ -94,7 +98,7 @@ class FileSystemNoteRepository(AbstractNoteRepository):
 
     def _load_category_meta(self):
         category_files = self._category_files[self.current_category]
-        category_notes = asyncio.run(
+        category_notes = IOLoop().run(
             _load_category_notes(
                 self.current_category, category_files, new_first=self.new_first
             )
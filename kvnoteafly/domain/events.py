@@ -1,8 +1,9 @@
 import abc
 from dataclasses import dataclass, field
-from typing import Callable, Literal, Optional, TYPE_CHECKING
+from typing import Callable, Hashable, Literal, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from domain.editable import EditableNote
     from domain.markdown_note import MarkdownNote
     from adapters.notes.note_repository import NoteDiscovery
 
@@ -15,6 +16,11 @@ class Event(abc.ABC):
     def event_type(self):
         raise NotImplementedError
 
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        """Queued events sharing a key are superseded by the most recent one"""
+        return None
+
 
 @dataclass
 class CancelEditEvent(Event):
@@ -33,6 +39,14 @@ class EditNoteEvent(Event):
     idx: int
 
 
+@dataclass
+class EditableNoteEvent(Event):
+    """An existing note has been loaded for editing"""
+
+    event_type = "editable_note"
+    note: "EditableNote"
+
+
 @dataclass
 class SaveNoteEvent(Event):
     event_type = "save_note"
@@ -46,6 +60,10 @@ class NoteFetchedEvent(Event):
     event_type = "note_fetched"
     note: "MarkdownNote"
 
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        return self.event_type, str(self.note.filepath)
+
 
 @dataclass
 class NotesQueryEvent(Event):
@@ -59,6 +77,10 @@ class RefreshNotesEvent(Event):
     event_type = "refresh_notes"
     on_complete: Callable[[None], None]
 
+    @property
+    def coalesce_key(self) -> Optional[Hashable]:
+        return self.event_type
+
 
 @dataclass
 class BackButtonEvent(Event):
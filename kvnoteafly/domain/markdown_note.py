@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Generator, Optional, Protocol, TYPE_CHECKING, TypedDict
 
 from domain.parser import MarkdownParser
+from utils.tracing import trace
 
 if TYPE_CHECKING:
     from domain.md_parser_types import MD_DOCUMENT, MdHeading, MdBlockCode
@@ -45,13 +46,15 @@ class MarkdownNote:
     has_shortcut: bool
     shortcut_keys: Optional[tuple[str, ...]]
 
+    @trace("to_dict")
     def to_dict(self) -> MarkdownNoteDict:
         return asdict(self, dict_factory=MarkdownNoteDict)
 
     @classmethod
     def from_file(cls, category: str, idx: int, fp: PathLike):
         filepath = Path(fp)
-        text = filepath.read_text(encoding="utf-8")
+        with trace("file_read"):
+            text = filepath.read_text(encoding="utf-8")
         document = cls.parser.parse(text)
         document, doc_title = cls._get_title_from_doc(document)
         shortcut_keys = cls._get_block_code_shortcut(document)
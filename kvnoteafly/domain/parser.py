@@ -1,22 +1,33 @@
-import mistune
-from typing import TYPE_CHECKING
+from typing import Optional, TYPE_CHECKING
 
 from utils import Singleton
+from utils.tracing import trace
 
 if TYPE_CHECKING:
+    import mistune
     from .md_parser_types import MD_DOCUMENT, MD_TYPES
 
 
 class MarkdownParser(metaclass=Singleton):
-    _parser: mistune.Markdown
+    _parser: Optional["mistune.Markdown"]
 
     def __init__(self):
-        self._parser = mistune.create_markdown(
-            renderer=mistune.AstRenderer(), plugins=["table"]
-        )
+        # Built on first parse, keeping mistune out of startup
+        self._parser = None
 
+    @property
+    def parser(self) -> "mistune.Markdown":
+        if self._parser is None:
+            import mistune
+
+            self._parser = mistune.create_markdown(
+                renderer=mistune.AstRenderer(), plugins=["table"]
+            )
+        return self._parser
+
+    @trace("parse")
     def parse(self, text: str) -> "MD_DOCUMENT":
-        result = self._parser(text)
+        result = self.parser(text)
         return result
 
 
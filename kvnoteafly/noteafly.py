@@ -2,7 +2,7 @@ import logging
 import os
 from functools import partial
 from pathlib import Path
-from typing import Callable, Literal
+from typing import Callable, Literal, Optional
 
 from kivy.app import App
 from kivy.clock import Clock
@@ -28,6 +28,8 @@ from domain.events import (
     BackButtonEvent,
     CancelEditEvent,
     EditNoteEvent,
+    EditableNoteEvent,
+    Event,
     NoteFetchedEvent,
     NotesQueryEvent,
     RefreshNotesEvent,
@@ -40,20 +42,39 @@ from domain.settings import (
 )
 from domain.plugin_settings import SETTINGS_PLUGIN_DATA
 from plugins import PluginManager, ScreenSaverPlugin
+from service.dispatcher import RegistryDispatcher
+from service.power import PowerStateService
 from service.registry import Registry
-from utils import sch_cb
+from service.shortcuts import ShortcutStripCache
+from service.textures import TextureRegistry
+from utils.caching.palette import ContrastPalette
+from utils.frame_monitor import FrameMonitor
+from utils.memory_monitor import MemoryMonitor
+from utils.scheduler import (
+    FrameScheduler,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    Task,
+)
+from utils.tracing import trace
 from utils.triggers import trigger_factory
 from widgets.screens import NoteAppScreenManager
 
 
 class NoteAFly(App):
     APP_NAME = "NoteAFly"
-    atlas_service = AtlasService(storage_path=Path("./static").resolve())
+    atlas_service = AtlasService(
+        storage_path=Path("./static").resolve(), compact_threshold=0.5
+    )
     note_service = FileSystemNoteRepository(new_first=True)
     editor_service = FileSystemEditor()
     plugin_manager = PluginManager()
+    power = PowerStateService()
+    scheduler = FrameScheduler(budget=0.008)
 
     registry = Registry(logger=Logger)
+    textures = TextureRegistry(atlas_service, executor=registry.executor)
+    shortcuts = ShortcutStripCache(atlas_service, executor=registry.executor)
 
     note_categories = ListProperty()
     note_category = StringProperty("")
@@ -63,6 +84,9 @@ class NoteAFly(App):
 
     note_category_meta = ListProperty()
     next_note_scheduler = ObjectProperty()
+    _category_task: Optional[Task] = None
+    frame_monitor: Optional[FrameMonitor] = None
+    memory_monitor: Optional[MemoryMonitor] = None
     screen_transitions = OptionProperty(
         "slide", options=["None", "Slide", "Rise-In", "Card", "Fade", "Swap", "Wipe"]
     )
@@ -121,6 +145,20 @@ class NoteAFly(App):
         note_category_meta: ListProperty
             Metadata for notes associated with active Category. Info such as Title, and Shortcuts
         next_note_scheduler: ObjectProperty
+        scheduler: FrameScheduler
+            Runs UI state changes back-to-back within a per-frame budget
+        dispatcher: RegistryDispatcher
+            Handles registry events as they are pushed, on the scheduler
+        frame_monitor: Optional[FrameMonitor]
+            Logs slow frames when `NOTEAFLY_FRAME_LOG` is set
+        power: PowerStateService
+            Idles the app while `ScreenSaverPlugin` has the screen saved
+        textures: TextureRegistry
+            Atlas textures shared by every widget that shows them
+        shortcuts: ShortcutStripCache
+            Keyboard shortcuts composed into single textures
+        memory_monitor: Optional[MemoryMonitor]
+            Logs memory growth across category switches and paginations when `NOTEAFLY_MEMORY_LOG` is set
         display_state: OptionProperty
             One of [Display, Choose]
             Choose:: Display all known categories
@@ -139,13 +177,8 @@ class NoteAFly(App):
     def on_display_state(self, instance, new):
 
         if new in {"edit", "add"}:
+            # editor_note is set by the EditableNoteEvent or AddNoteEvent that led here
             self.play_state_trigger("pause")
-        if new == "edit":
-            self.editor_note = self.editor_service.edit_current_note(self)
-        elif new == "add":
-            self.editor_note = self.editor_service.new_note(
-                category=self.note_category, idx=self.note_service.index_size()
-            )
         if self.next_note_scheduler:
             self.next_note_scheduler.cancel()
 
@@ -158,7 +191,14 @@ class NoteAFly(App):
         pause_state = lambda x: self.play_state_trigger("pause")
         display_state_display = lambda x: self.display_state_trigger("display")
 
-        sch_cb(0, set_index, set_note_data, pause_state, display_state_display)
+        self.scheduler.schedule(
+            set_index,
+            set_note_data,
+            pause_state,
+            display_state_display,
+            priority=PRIORITY_HIGH,
+            name="select_index",
+        )
 
     def paginate(self, value):
         self.next_note_scheduler.cancel()
@@ -166,10 +206,13 @@ class NoteAFly(App):
         if self.play_state == "play":
             self.next_note_scheduler()
 
+    @trace("paginate")
     def paginate_note(self, *args, **kwargs):
         direction = kwargs.get("direction", 1)
         is_initial = kwargs.get("initial", False)
         """Update `self.note_data` from `self.notes_data`"""
+        if self.power.idle and not is_initial:
+            return
         if is_initial:
             self.note_data = self.note_service.current_note().to_dict()
         else:
@@ -177,6 +220,8 @@ class NoteAFly(App):
                 self.note_data = self.note_service.next_note().to_dict()
             else:
                 self.note_data = self.note_service.previous_note().to_dict()
+        if self.memory_monitor:
+            self.memory_monitor.on_paginate()
 
     def on_log_level(self, instance, value):
         Logger.setLevel(int(value))
@@ -193,6 +238,8 @@ class NoteAFly(App):
         Category button pressed
         """
         self.note_service.current_category = value
+        if self.memory_monitor:
+            self.memory_monitor.on_category(value)
 
         def return_to_category(dt):
             self.note_category_meta = []
@@ -213,11 +260,20 @@ class NoteAFly(App):
                     self.next_note_scheduler()
             self.paginate_note(initial=True)
 
+        if self._category_task:
+            self._category_task.cancel()
         if not value:
-            sch_cb(0.1, return_to_category)
+            self._category_task = self.scheduler.schedule(
+                return_to_category, timeout=0.1, name="return_to_category"
+            )
         else:
             func = partial(select_category, category=value)
-            sch_cb(0.1, func, lambda x: self.display_state_trigger("display"))
+            self._category_task = self.scheduler.schedule(
+                func,
+                lambda x: self.display_state_trigger("display"),
+                timeout=0.1,
+                name="select_category",
+            )
 
     """
     Event Handlers for Registry
@@ -226,19 +282,25 @@ class NoteAFly(App):
     def process_cancel_edit_event(self, event: CancelEditEvent):
 
         clear_edit_note = lambda x: setattr(self, "editor_note", None)
-        sch_cb(0, lambda x: self.display_state_trigger("display"), clear_edit_note)
+        self.scheduler.schedule(
+            lambda x: self.display_state_trigger("display"),
+            clear_edit_note,
+            priority=PRIORITY_HIGH,
+        )
 
     def process_edit_note_event(self, event: EditNoteEvent):
-        data_note = self.registry.edit_note(category=event.category, idx=event.idx)
-        update_edit_note = lambda x: setattr(self, "editor_note", data_note)
+        self.registry.edit_note(category=event.category, idx=event.idx)
+
+    def process_editable_note_event(self, event: EditableNoteEvent):
+        update_edit_note = lambda x: setattr(self, "editor_note", event.note)
         update_display_state = lambda x: setattr(self, "display_state", "edit")
-        sch_cb(0, update_edit_note, update_display_state)
+        self.scheduler.schedule(update_edit_note, update_display_state)
 
     def process_add_note_event(self, event: AddNoteEvent):
         data_note = self.registry.new_note(category=self.note_category, idx=None)
         update_edit_note = lambda x: setattr(self, "editor_note", data_note)
         update_display_mode = lambda x: self.display_state_trigger("add")
-        sch_cb(0, update_edit_note, update_display_mode)
+        self.scheduler.schedule(update_edit_note, update_display_mode)
 
     def process_save_note_event(self, event: SaveNoteEvent):
         note_is_new = self.display_state == "add"
@@ -249,36 +311,29 @@ class NoteAFly(App):
         update_edit_note = lambda x: setattr(self, "editor_note", None)
         update_display_state = lambda x: self.display_state_trigger("display")
         persist_note = lambda x: self.registry.save_note(data_note)
-        sch_cb(1, update_display_state, persist_note, update_edit_note)
+        self.scheduler.schedule(
+            update_display_state, persist_note, update_edit_note, timeout=1
+        )
 
     def process_note_fetched_event(self, event: NoteFetchedEvent):
         note_data = event.note.to_dict()
         update_data = lambda x: setattr(self, "note_data", note_data)
-        sch_cb(1, update_data)
+        self.scheduler.schedule(update_data, timeout=1)
 
     def process_refresh_notes_event(self, event: RefreshNotesEvent):
-        clear_categories = lambda x: setattr(self, "note_categories", [])
         run_query = lambda x: self.registry.query_all(on_complete=event.on_complete)
-        sch_cb(0.5, clear_categories, run_query)
+        self.scheduler.schedule(run_query, timeout=0.5)
 
     def process_notes_query_event(self, event: NotesQueryEvent):
-        def append_category_factory(category):
-            def append_category(dt, c):
-                current = [c for c in self.note_categories]
-                current.append(c)
-                self.note_categories = current
-
-            func = partial(append_category, c=category)
-            return func
-
-        steps = [
-            append_category_factory(c) for c in [d["category"] for d in event.result]
-        ]
+        categories = [d["category"] for d in event.result]
+        # Assigned once, the chooser applies the difference in a single redraw
+        update_categories = lambda x: setattr(self, "note_categories", categories)
+        steps = [update_categories]
 
         if event.on_complete is not None:
             steps.append(event.on_complete)
 
-        sch_cb(0, *steps)
+        self.scheduler.schedule(*steps, priority=PRIORITY_LOW, name="notes_query")
 
     def process_back_button_event(self, event: BackButtonEvent):
         # The display state when button was pressed
@@ -288,10 +343,10 @@ class NoteAFly(App):
             App.get_running_app().stop()
         elif ds == "display":
             set_ds_choose = lambda dt: setattr(self, "display_state", "choose")
-            sch_cb(0, set_ds_choose)
+            self.scheduler.schedule(set_ds_choose, priority=PRIORITY_HIGH)
         elif ds == "list":
             set_ds_display = lambda dt: setattr(self, "display_state", "display")
-            sch_cb(0, set_ds_display)
+            self.scheduler.schedule(set_ds_display, priority=PRIORITY_HIGH)
         elif ds == "edit":
             self.registry.push_event(CancelEditEvent())
         elif ds == "add":
@@ -301,14 +356,12 @@ class NoteAFly(App):
                 f"Unknown display state encountered when handling back button: {ds}"
             )
 
-    def process_event(self, dt):
-        if len(self.registry.events) == 0:
-            return
-        event = self.registry.events.popleft()
+    def process_event(self, event: Event):
         Logger.debug(f"Processing Event: {event}")
         event_type = event.event_type
         func = getattr(self, f"process_{event_type}_event")
-        return func(event)
+        with trace(f"event.{event_type}"):
+            return func(event)
 
     def key_input(self, window, key, scancode, codepoint, modifier):
         if key == 27:  # Esc Key
@@ -321,6 +374,11 @@ class NoteAFly(App):
     """Kivy"""
 
     def build(self):
+        from adapters.atlas.fs.raw import install as install_raw_pages
+
+        # Atlas pages with a pre-decoded sidecar skip PNG decoding
+        install_raw_pages()
+        self.atlas_service.invalidate_listeners.append(self.textures.invalidate)
         self.registry.app = self
         self.play_state_trigger = trigger_factory(
             self, "play_state", self.__class__.play_state.options
@@ -329,6 +387,7 @@ class NoteAFly(App):
             self, "display_state", self.__class__.display_state.options
         )
         Window.bind(on_keyboard=self.key_input)
+        ContrastPalette().build(self.colors.values())
         storage_path = (
             np if (np := self.config.get("Storage", "NOTES_PATH")) != "None" else None
         )
@@ -339,20 +398,36 @@ class NoteAFly(App):
             True if self.config.get("Behavior", "NEW_FIRST") == "True" else False
         )
 
+        self.frame_monitor = FrameMonitor.from_environ()
+        if self.frame_monitor:
+            self.frame_monitor.start()
+        self.memory_monitor = MemoryMonitor.from_environ()
+        if self.memory_monitor:
+            self.memory_monitor.start()
         sm = NoteAppScreenManager(self)
         self.screen_manager = sm
         self.play_state = self.config.get("Behavior", "PLAY_STATE")
         self.note_category = self.config.get("Behavior", "CATEGORY_SELECTED")
         self.log_level = self.config.get("Behavior", "LOG_LEVEL")
         self.base_font_size = self.config.get("Display", "BASE_FONT_SIZE")
+        self.dispatcher = RegistryDispatcher(
+            self.registry, handler=self.process_event, scheduler=self.scheduler
+        )
         self.registry.query_all()
-        Clock.schedule_interval(self.process_event, 0.1)
+        self.power.init_app(self)
         self.plugin_manager.init_app(self)
         sm.fbind(
             "on_interact", lambda x: self.plugin_manager.plugin_event("on_interact")
         )
         return sm
 
+    def on_stop(self):
+        self.registry.executor.shutdown(wait=False)
+        if self.frame_monitor:
+            self.frame_monitor.stop()
+        if self.memory_monitor:
+            self.memory_monitor.stop()
+
     def build_settings(self, settings):
         settings.add_json_panel("Storage", self.config, SETTINGS_STORAGE_PATH)
         settings.add_json_panel("Display", self.config, SETTINGS_DISPLAY_PATH)
@@ -383,7 +458,7 @@ class NoteAFly(App):
         if section == "Storage":
             if key == "NOTES_PATH":
                 self.note_service.storage_path = value
-                self.note_categories = self.note_service.categories
+                self.registry.query_all()
         elif section == "Behavior":
             if key == "LOG_LEVEL":
                 self.log_level = value
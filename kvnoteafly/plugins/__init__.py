@@ -17,9 +17,13 @@ class PluginProtocol(Protocol):
 
 class PluginManager(EventDispatcher):
     def __init__(self, *args, **kwargs):
+        self.register_event_type("on_plugin_added")
         super(PluginManager, self).__init__(*args, **kwargs)
         self.plugins: list[PluginProtocol] = []
 
+    def on_plugin_added(self, plugin: PluginProtocol):
+        ...
+
     def plugin_event(self, event):
         for plugin in self.plugins:
             plugin.handle_event(event)
@@ -61,6 +65,7 @@ class PluginManager(EventDispatcher):
         if make:
             pl = plugin_type()
             self.plugins.append(pl)
+            self.dispatch("on_plugin_added", pl)
             return pl
         return None
 
@@ -0,0 +1,142 @@
+"""
+Push-driven delivery of Registry events
+"""
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from time import perf_counter
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+from utils.scheduler import PRIORITY_HIGH
+
+if TYPE_CHECKING:
+    from domain.events import Event
+    from service.registry import Registry
+    from utils.scheduler import FrameScheduler, Task
+
+
+class EventStats:
+    """Running latency figures for a single event type, in seconds"""
+
+    __slots__ = (
+        "handled",
+        "coalesced",
+        "latency_total",
+        "latency_max",
+        "handle_total",
+        "handle_max",
+    )
+
+    def __init__(self):
+        self.handled = 0
+        self.coalesced = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.handle_total = 0.0
+        self.handle_max = 0.0
+
+    def record(self, latency: float, handle_time: float):
+        self.handled += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.handle_total += handle_time
+        self.handle_max = max(self.handle_max, handle_time)
+
+    def as_dict(self) -> dict[str, float]:
+        n = self.handled or 1
+        return {
+            "handled": self.handled,
+            "coalesced": self.coalesced,
+            "latency_mean": self.latency_total / n,
+            "latency_max": self.latency_max,
+            "handle_mean": self.handle_total / n,
+            "handle_max": self.handle_max,
+        }
+
+
+class RegistryDispatcher:
+    """
+    Drains `Registry.events` as soon as they are pushed, rather than polling
+
+    Pushing an event wakes the dispatcher, which queues a high priority task on the `FrameScheduler`.
+    The task handles events until `budget` is spent and re-queues itself if any remain.
+
+    Before handling, queued events that share a `coalesce_key` are collapsed into the most recent one,
+    keeping the earliest push time so that latency reflects what the user waited.
+
+    Parameters
+    ----------
+    registry: Registry
+    handler: Callable[[Event], Any]
+        Called with each event, on the main thread
+    scheduler: FrameScheduler
+    budget: float
+        Seconds of event handling allowed per frame
+    """
+
+    def __init__(
+        self,
+        registry: "Registry",
+        handler: Callable[["Event"], Any],
+        scheduler: "FrameScheduler",
+        budget: float = 0.008,
+        timer: Callable[[], float] = perf_counter,
+    ):
+        self.registry = registry
+        self.handler = handler
+        self.scheduler = scheduler
+        self.budget = budget
+        self.timer = timer
+        self.stats: defaultdict[str, EventStats] = defaultdict(EventStats)
+        self._task: Optional["Task"] = None
+        registry.on_push = self.wake
+        if registry.events:
+            self.wake()
+
+    def wake(self):
+        if self._task is None or self._task.done:
+            self._task = self.scheduler.schedule(
+                self.drain, priority=PRIORITY_HIGH, name="dispatch"
+            )
+
+    def coalesce(self):
+        events = self.registry.events
+        latest = {}
+        for i, (_, event) in enumerate(events):
+            if (key := event.coalesce_key) is not None:
+                latest[key] = i
+        if len(latest) == sum(1 for _, e in events if e.coalesce_key is not None):
+            return
+
+        kept = deque()
+        earliest = {}
+        for i, (pushed_at, event) in enumerate(events):
+            key = event.coalesce_key
+            if key is None:
+                kept.append((pushed_at, event))
+                continue
+            earliest[key] = min(earliest.get(key, pushed_at), pushed_at)
+            if latest[key] == i:
+                kept.append((earliest[key], event))
+            else:
+                self.stats[event.event_type].coalesced += 1
+        events.clear()
+        events.extend(kept)
+
+    def drain(self, dt: float = 0):
+        events = self.registry.events
+        self.coalesce()
+        timer = self.timer
+        deadline = timer() + self.budget
+        while events and timer() < deadline:
+            pushed_at, event = events.popleft()
+            start = timer()
+            self.handler(event)
+            end = timer()
+            self.stats[event.event_type].record(start - pushed_at, end - start)
+        if events:
+            self.wake()
+
+    def metrics(self) -> dict[str, dict[str, float]]:
+        """Latency and coalescing figures keyed by event type"""
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
@@ -0,0 +1,211 @@
+"""
+Background execution of blocking repository calls
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from kivy.clock import Clock
+
+T = TypeVar("T")
+MarshalType = Callable[[Callable[[], None]], None]
+
+
+class OperationCancelled(Exception):
+    """Raised by `CancellationToken.raise_if_cancelled` from inside a running operation"""
+
+
+class CancellationToken:
+    """
+    Shared between a caller and a submitted operation
+
+    Cancelling prevents a queued operation from starting and discards the result of one that is
+    already running. Long operations may also poll `cancelled` to stop early.
+    """
+
+    __slots__ = ("_event",)
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled()
+
+
+def main_thread_marshal(callback: Callable[[], None]):
+    """Run `callback` on the Kivy main loop, on the next frame"""
+    Clock.schedule_once(lambda dt: callback(), 0)
+
+
+class _Job:
+    __slots__ = ("op", "fn", "args", "kwargs", "on_result", "on_error", "token")
+
+    def __init__(self, op, fn, args, kwargs, on_result, on_error, token):
+        self.op = op
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.on_result = on_result
+        self.on_error = on_error
+        self.token = token
+
+
+class BackgroundExecutor:
+    """
+    Runs blocking calls on a thread pool, delivering results on the main thread
+
+    Each operation type has its own concurrency limit. Jobs over the limit wait in a per-type queue
+    instead of occupying a pool thread.
+
+    Parameters
+    ----------
+    max_workers: int
+        Size of the thread pool
+    limits: Optional[dict[str, int]]
+        Maximum concurrent jobs per operation type. Types not listed use `default_limit`
+    default_limit: int
+    marshal: MarshalType
+        Delivers callbacks to the main thread. Defaults to scheduling on the Kivy Clock
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        limits: Optional[dict[str, int]] = None,
+        default_limit: int = 1,
+        marshal: MarshalType = main_thread_marshal,
+    ):
+        self.max_workers = max_workers
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.marshal = marshal
+        self._pool: Optional[ThreadPoolExecutor] = None
+        # Re-entrant, as a job that finishes immediately completes inside `submit`
+        self._lock = threading.RLock()
+        self._running: defaultdict[str, int] = defaultdict(int)
+        self._waiting: defaultdict[str, deque[_Job]] = defaultdict(deque)
+        self._latest: dict[str, CancellationToken] = {}
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="registry"
+            )
+        return self._pool
+
+    def submit(
+        self,
+        op: str,
+        fn: Callable[..., T],
+        *args,
+        on_result: Optional[Callable[[T], Any]] = None,
+        on_error: Optional[Callable[[BaseException], Any]] = None,
+        token: Optional[CancellationToken] = None,
+        supersede: bool = False,
+        **kwargs,
+    ) -> CancellationToken:
+        """
+        Run `fn(*args, **kwargs)` off the main thread
+
+        Parameters
+        ----------
+        op: str
+            Operation type, used for the concurrency limit
+        fn: Callable
+        on_result: Optional[Callable[[T], Any]]
+            Called on the main thread with the return value of `fn`
+        on_error: Optional[Callable[[BaseException], Any]]
+            Called on the main thread if `fn` raises
+        token: Optional[CancellationToken]
+            Passed to `fn` as a keyword argument if given, otherwise one is created
+        supersede: bool
+            Cancel the previous job of the same operation type
+
+        Returns
+        -------
+        CancellationToken for the job
+        """
+        if token is not None:
+            kwargs["token"] = token
+        else:
+            token = CancellationToken()
+        job = _Job(op, fn, args, kwargs, on_result, on_error, token)
+        with self._lock:
+            if supersede and (previous := self._latest.get(op)):
+                previous.cancel()
+            self._latest[op] = token
+            if self._running[op] < self.limits.get(op, self.default_limit):
+                self._start(job)
+            else:
+                self._waiting[op].append(job)
+        return token
+
+    def _start(self, job: _Job):
+        """Must be called holding `self._lock`"""
+        self._running[job.op] += 1
+        future = self.pool.submit(self._run, job)
+        future.add_done_callback(lambda f: self._finished(job, f))
+
+    @staticmethod
+    def _run(job: _Job):
+        if job.token.cancelled:
+            raise OperationCancelled()
+        return job.fn(*job.args, **job.kwargs)
+
+    def _finished(self, job: _Job, future: Future):
+        error = future.exception()
+        if not (isinstance(error, OperationCancelled) or job.token.cancelled):
+            if error is not None:
+                self._deliver(job, job.on_error, error)
+            else:
+                self._deliver(job, job.on_result, future.result())
+
+        with self._lock:
+            self._running[job.op] -= 1
+            waiting = self._waiting[job.op]
+            while waiting:
+                queued = waiting.popleft()
+                if not queued.token.cancelled:
+                    self._start(queued)
+                    break
+            if self._latest.get(job.op) is job.token:
+                del self._latest[job.op]
+
+    def _deliver(self, job: _Job, callback: Optional[Callable], value: Any):
+        if callback is None:
+            return
+
+        def deliver():
+            # Cancelled while waiting for the main thread
+            if not job.token.cancelled:
+                callback(value)
+
+        self.marshal(deliver)
+
+    def pending(self, op: Optional[str] = None) -> int:
+        """Jobs running or waiting, for `op` or all operation types"""
+        with self._lock:
+            ops = [op] if op else set(self._running) | set(self._waiting)
+            return sum(self._running[o] + len(self._waiting[o]) for o in ops)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            for waiting in self._waiting.values():
+                for job in waiting:
+                    job.token.cancel()
+                waiting.clear()
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
@@ -0,0 +1,98 @@
+"""
+Low-power idle while the screen is saved
+"""
+from __future__ import annotations
+
+from typing import Optional, TYPE_CHECKING
+
+from kivy import Logger
+from kivy.clock import Clock
+from kivy.event import EventDispatcher
+from kivy.properties import BooleanProperty, NumericProperty
+
+from plugins import ScreenSaverPlugin
+
+if TYPE_CHECKING:
+    from noteafly import NoteAFly
+    from plugins import PluginManager
+
+
+class PowerStateService(EventDispatcher):
+    """
+    Follows `ScreenSaverPlugin.screen_saved`, idling the app while nobody can see it
+
+    While idle:
+
+    - Automatic pagination is stopped, so no notes are loaded or rendered
+    - Keyboard animations are skipped
+    - The frame monitor is paused
+    - The Clock runs at `idle_fps`
+
+    Leaving idle restores all of these, and restarts pagination if the app is playing. The plugin clears
+    `screen_saved` from `on_interact`, so this happens on the touch that wakes the screen.
+
+    Attributes
+    ----------
+    idle: BooleanProperty
+    idle_fps: NumericProperty
+        Frame rate while idle. Input is only read once per frame, so this bounds wake-up latency
+    """
+
+    idle = BooleanProperty(False)
+    idle_fps = NumericProperty(5)
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.app: Optional["NoteAFly"] = None
+        self._active_fps: Optional[float] = None
+
+    def init_app(self, app: "NoteAFly"):
+        self.app = app
+        app.plugin_manager.fbind("on_plugin_added", self.handle_plugin_added)
+        for plugin in app.plugin_manager.plugins:
+            self.handle_plugin_added(app.plugin_manager, plugin)
+
+    def handle_plugin_added(self, manager: "PluginManager", plugin):
+        if isinstance(plugin, ScreenSaverPlugin):
+            plugin.fbind("screen_saved", self.handle_screen_saved)
+            plugin.fbind("enabled", self.handle_screen_saver_enabled)
+
+    def handle_screen_saved(self, plugin, value: bool):
+        self.idle = value
+
+    def handle_screen_saver_enabled(self, plugin, value: bool):
+        if not value:
+            self.idle = False
+
+    def on_idle(self, instance, value: bool):
+        if not self.app:
+            return
+        if value:
+            self.suspend()
+        else:
+            self.resume()
+
+    def suspend(self):
+        Logger.info("PowerStateService: Idle")
+        app = self.app
+        if app.next_note_scheduler:
+            app.next_note_scheduler.cancel()
+        if app.frame_monitor:
+            app.frame_monitor.pause()
+        self._active_fps = Clock._max_fps
+        Clock._max_fps = float(self.idle_fps)
+
+    def resume(self):
+        Logger.info("PowerStateService: Active")
+        app = self.app
+        if self._active_fps is not None:
+            Clock._max_fps = self._active_fps
+            self._active_fps = None
+        if app.frame_monitor:
+            app.frame_monitor.resume()
+        if (
+            app.play_state == "play"
+            and app.display_state == "display"
+            and app.next_note_scheduler
+        ):
+            app.next_note_scheduler()
@@ -1,7 +1,9 @@
 from collections import deque
 from pathlib import Path
+from time import perf_counter
 from typing import Optional, Type, Callable, TYPE_CHECKING, Protocol
-from domain.events import NoteFetchedEvent, NotesQueryEvent
+from domain.events import EditableNoteEvent, NoteFetchedEvent, NotesQueryEvent
+from service.executor import BackgroundExecutor
 from utils import GenericLoggerMixin, LoggerProtocol
 
 if TYPE_CHECKING:
@@ -23,13 +25,23 @@ class Registry(GenericLoggerMixin):
     """Orchestration"""
 
     _app: Optional["AppServiceProtocol"]
-    events: deque["Event"]
-
-    def __init__(self, logger: Optional[LoggerProtocol]):
+    events: deque[tuple[float, "Event"]]
+    on_push: Optional[Callable[[], None]]
+    executor: BackgroundExecutor
+
+    def __init__(
+        self,
+        logger: Optional[LoggerProtocol],
+        executor: Optional[BackgroundExecutor] = None,
+    ):
         super().__init__()
         self._app = None
         self.logger = logger
         self.events = deque([])
+        self.on_push = None
+        self.executor = executor or BackgroundExecutor(
+            max_workers=2, limits={"query": 1, "edit": 1, "save": 1}
+        )
 
     @property
     def app(self):
@@ -50,18 +62,31 @@ class Registry(GenericLoggerMixin):
         self.app.note_service.storage_path = path
 
     def push_event(self, event: "Event"):
-        self.events.append(event)
+        """Queue `event` with the time it was pushed and wake any listener"""
+        self.events.append((perf_counter(), event))
+        if self.on_push:
+            self.on_push()
+
+    def _report_error(self, op: str):
+        return lambda error: self.log(f"Registry: {op} failed - {error!r}", "error")
 
     def query_all(self, on_complete: Optional[Callable] = None):
         """
         Find available categories, their associated image and associated notes
-        Returns
-        -------
 
+        Discovery runs on a worker thread, superseding any query still in flight.
+        Pushes a `NotesQueryEvent` when done.
         """
         note_repo = self.app.note_service
-        result = note_repo.discover_notes()
-        self.push_event(NotesQueryEvent(result=result, on_complete=on_complete))
+        return self.executor.submit(
+            "query",
+            note_repo.discover_notes,
+            on_result=lambda result: self.push_event(
+                NotesQueryEvent(result=result, on_complete=on_complete)
+            ),
+            on_error=self._report_error("query"),
+            supersede=True,
+        )
 
     def new_note(self, category: Optional[str], idx: Optional[int]) -> "EditableNote":
         category = category if category else self.app.note_category
@@ -69,13 +94,30 @@ class Registry(GenericLoggerMixin):
         note = self.app.editor_service.new_note(category=category, idx=idx)
         return note
 
-    def edit_note(self, category: Optional[str], idx: Optional[int]) -> "EditableNote":
+    def edit_note(self, category: Optional[str], idx: Optional[int]):
+        """Load a note for editing on a worker thread. Pushes an `EditableNoteEvent` when done"""
         category = category if category else self.app.note_category
         idx = idx if idx is not None else self.app.note_service.index.current
-        md_note = self.app.note_service.get_note(category=category, idx=idx)
-        data_note = self.app.editor_service.edit_note(md_note)
-        return data_note
+        note_service, editor_service = self.app.note_service, self.app.editor_service
+
+        def load_editable() -> "EditableNote":
+            md_note = note_service.get_note(category=category, idx=idx)
+            return editor_service.edit_note(md_note)
+
+        return self.executor.submit(
+            "edit",
+            load_editable,
+            on_result=lambda note: self.push_event(EditableNoteEvent(note=note)),
+            on_error=self._report_error("edit"),
+            supersede=True,
+        )
 
     def save_note(self, note: "EditableNote"):
-        md_note = self.app.note_service.save_note(note)
-        self.push_event(NoteFetchedEvent(note=md_note))
+        """Write `note` on a worker thread. Pushes a `NoteFetchedEvent` when done"""
+        return self.executor.submit(
+            "save",
+            self.app.note_service.save_note,
+            note,
+            on_result=lambda md_note: self.push_event(NoteFetchedEvent(note=md_note)),
+            on_error=self._report_error("save"),
+        )
@@ -0,0 +1,363 @@
+"""
+Composed textures of keyboard shortcuts
+
+A shortcut such as ("ctrl", "shift", "p") is drawn as one strip, its key caps scaled to a common height and joined
+by "+" glyphs. A strip is composed once and written to the cache along with the rect of each key, after which
+showing it is a single texture load. Keys missing from the `keys` atlas get a key cap drawn for them, which is
+cached as well.
+
+Cached strips and keys are tied to the stamp of the `keys` atlas, so rewriting the atlas redraws them, and those drawn
+from an older atlas are deleted.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Callable, NamedTuple, Optional, Sequence, TYPE_CHECKING
+from urllib.parse import quote
+
+import kivy
+from kivy import Logger
+
+if TYPE_CHECKING:
+    import PIL.Image
+    from kivy.graphics.texture import Texture
+
+    from adapters.atlas.atlas_repository import AbstractAtlasRepository
+    from adapters.atlas.fs.index import ImgPos
+    from service.executor import BackgroundExecutor
+
+VERSION = 1
+"""Bump when the look of strips or synthesized keys changes, so cached ones are redrawn"""
+KEY_HEIGHT = 236
+"""Height of the key caps in the `keys` atlas"""
+SEPARATOR_COLOR = (238, 238, 238, 255)
+FONT = "Roboto-Regular.ttf"
+
+
+def default_cache_dir() -> Path:
+    return Path(kivy.kivy_home_dir) / "noteafly" / "shortcuts"
+
+
+def _font(size: int):
+    from PIL import ImageFont
+
+    return ImageFont.truetype(os.path.join(kivy.kivy_data_dir, "fonts", FONT), size)
+
+
+def key_label(key: str) -> str:
+    return key.upper() if len(key) == 1 else key.capitalize()
+
+
+def synthesize_key(label: str, height: int = KEY_HEIGHT) -> "PIL.Image.Image":
+    """Draw a key cap showing `label`, in the style of those in the `keys` atlas"""
+    from PIL import Image, ImageDraw
+
+    font = _font(round(height * 0.2))
+    bevel = round(height * 0.08)
+    width = max(height, round(font.getlength(label) + height * 0.6))
+    img = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    radius = round(height * 0.1)
+    draw.rounded_rectangle(
+        (0, 0, width - 1, height - 1), radius=radius, fill=(128, 128, 128, 255)
+    )
+    face = (bevel, bevel // 2, width - 2 * bevel, height - 2 * bevel)
+    draw.rounded_rectangle(face, radius=radius, fill=(196, 196, 196, 255))
+    center = (face[0] + face[2]) / 2, (face[1] + face[3]) / 2
+    draw.text(center, label, fill=(0, 0, 0, 255), font=font, anchor="mm")
+    return img
+
+
+def compose_strip(
+    images: Sequence["PIL.Image.Image"], height: int
+) -> tuple["PIL.Image.Image", list["ImgPos"]]:
+    """
+    Scale `images` to `height` and lay them out left to right, separated by "+"
+
+    Returns
+    -------
+    The strip, and the rect of each image within it
+    """
+    from PIL import Image, ImageDraw
+
+    scaled = [
+        img.resize(
+            (max(1, round(img.width * height / img.height)), height),
+            Image.Resampling.LANCZOS,
+        )
+        for img in images
+    ]
+    separator = round(height * 0.4)
+    width = sum(img.width for img in scaled) + separator * (len(scaled) - 1)
+    strip = Image.new("RGBA", (max(1, width), height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(strip)
+    font = _font(round(height * 0.4))
+    x = 0
+    rects = []
+    for i, img in enumerate(scaled):
+        if i:
+            draw.text(
+                (x + separator / 2, height / 2),
+                "+",
+                fill=SEPARATOR_COLOR,
+                font=font,
+                anchor="mm",
+            )
+            x += separator
+        strip.paste(img, (x, 0))
+        # Every key spans the full height, so rects are the same measured from the top or the bottom
+        rects.append((x, 0, img.width, height))
+        x += img.width
+    return strip, rects
+
+
+class ShortcutStrip(NamedTuple):
+    texture: "Texture"
+    keys: list["Texture"]
+    """Region of `texture` for each key"""
+
+
+class ShortcutStripCache:
+    """
+    Strip textures keyed by the keys of a shortcut
+
+    Parameters
+    ----------
+    atlas_service: AbstractAtlasRepository
+        Provides key caps from `atlas_name`
+    cache_dir: Optional[Path]
+        Where composed strips, synthesized keys and the manifest are kept. Defaults to
+        `<kivy home>/noteafly/shortcuts`
+    height: int
+        Height of a strip, in pixels
+    keep: int
+        Number of strip textures kept in memory
+    atlas_name: str
+    executor: Optional[BackgroundExecutor]
+        Composes strips for `strip_async`. Without one, `strip_async` composes synchronously
+    """
+
+    def __init__(
+        self,
+        atlas_service: "AbstractAtlasRepository",
+        cache_dir: Optional[Path | str] = None,
+        height: int = 96,
+        keep: int = 32,
+        atlas_name: str = "keys",
+        executor: Optional["BackgroundExecutor"] = None,
+    ):
+        self.atlas_service = atlas_service
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.height = height
+        self.keep = keep
+        self.atlas_name = atlas_name
+        self.executor = executor
+        # Only used on the main thread
+        self._strips: OrderedDict[tuple[str, ...], ShortcutStrip] = OrderedDict()
+        self._strips_version: Optional[str] = None
+        self._pending: dict[tuple[str, ...], list[Callable[[ShortcutStrip], None]]] = {}
+        # Guards the manifest and atlas version, which composing on the executor shares
+        self._lock = threading.RLock()
+        self._manifest: Optional[dict[str, dict]] = None
+        self._stamp: Optional[tuple[int, int]] = None
+        self._version = ""
+        self.composed = 0
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.cache_dir / "manifest.json"
+
+    @property
+    def manifest(self) -> dict[str, dict]:
+        if self._manifest is None:
+            try:
+                self._manifest = json.loads(self.manifest_path.read_text("utf-8"))
+            except (FileNotFoundError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    def _store_manifest(self):
+        tmp = self.manifest_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self.manifest), "utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    @staticmethod
+    def _save(img: "PIL.Image.Image", path: Path):
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        img.save(tmp, format="PNG")
+        os.replace(tmp, path)
+
+    def _atlas_version(self) -> str:
+        """Short hash of the atlas stamp. When it changes, strips and keys drawn from an older atlas are deleted"""
+        stamp = self.atlas_service.stamp(self.atlas_name)
+        with self._lock:
+            if not self._version or stamp != self._stamp:
+                self._stamp = stamp
+                self._version = hashlib.sha1(repr(stamp).encode()).hexdigest()[:8]
+                self._prune()
+            return self._version
+
+    def _prune(self):
+        """Delete strips and keys that weren't drawn from the current atlas, by the current `VERSION`"""
+        stale = [
+            strip_id
+            for strip_id, record in self.manifest.items()
+            if record.get("atlas") != self._version or record.get("version") != VERSION
+        ]
+        for strip_id in stale:
+            del self.manifest[strip_id]
+        if stale:
+            Logger.info(f"ShortcutStripCache: Deleting {len(stale)} outdated strips")
+            self._store_manifest()
+        for path in self.cache_dir.glob("*.png"):
+            if path.stem not in self.manifest:
+                path.unlink(missing_ok=True)
+        for path in self.cache_dir.glob("keys/*.png"):
+            if not path.name.endswith(f".{VERSION}.{self._version}.png"):
+                path.unlink(missing_ok=True)
+
+    def key_image(self, key: str) -> "PIL.Image.Image":
+        """Key cap for `key` from the atlas, or drawn for it if the atlas doesn't have one"""
+        try:
+            return self.atlas_service.get_from_atlas(key, self.atlas_name)
+        except KeyError:
+            pass
+        from PIL import Image
+
+        path = (
+            self.cache_dir
+            / "keys"
+            / f"{quote(key, safe='')}.{VERSION}.{self._atlas_version()}.png"
+        )
+        if path.exists():
+            with Image.open(path) as img:
+                img.load()
+                return img
+        Logger.info(f"ShortcutStripCache: Drawing missing key {key}")
+        img = synthesize_key(key_label(key))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._save(img, path)
+        return img
+
+    def strip_image(self, keys: Sequence[str]) -> tuple[Path, list["ImgPos"]]:
+        """
+        Path of the composed strip for `keys`, composing it on first use
+
+        Safe to call from the executor.
+
+        Returns
+        -------
+        Path of the strip, and the rect of each key within it
+        """
+        keys = [key.lower() for key in keys]
+        version = self._atlas_version()
+        strip_id = hashlib.sha1(
+            json.dumps([VERSION, version, self.height, keys]).encode()
+        ).hexdigest()[:16]
+        path = self.cache_dir / f"{strip_id}.png"
+        with self._lock:
+            record = self.manifest.get(strip_id)
+        if record is not None and path.exists():
+            return path, [tuple(rect) for rect in record["rects"]]
+
+        img, rects = compose_strip([self.key_image(key) for key in keys], self.height)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._save(img, path)
+        with self._lock:
+            self.manifest[strip_id] = {
+                "keys": keys,
+                "rects": rects,
+                "version": VERSION,
+                "atlas": version,
+            }
+            self._store_manifest()
+            self.composed += 1
+        return path, rects
+
+    def _load(self, path: Path) -> "Texture":
+        from kivy.core.image import Image as CoreImage
+
+        return CoreImage(os.fspath(path), nocache=True).texture
+
+    def _cached(self, cache_key: tuple[str, ...]) -> Optional[ShortcutStrip]:
+        """Strip texture held in memory, dropping those made from an older atlas"""
+        version = self._atlas_version()
+        if version != self._strips_version:
+            self._strips.clear()
+            self._strips_version = version
+        strip = self._strips.get(cache_key)
+        if strip is not None:
+            self._strips.move_to_end(cache_key)
+        return strip
+
+    def _keep(
+        self, cache_key: tuple[str, ...], path: Path, rects: list["ImgPos"]
+    ) -> ShortcutStrip:
+        """Create the texture of a composed strip. Main thread only"""
+        texture = self._load(path)
+        strip = ShortcutStrip(texture, [texture.get_region(*rect) for rect in rects])
+        self._strips[cache_key] = strip
+        while len(self._strips) > self.keep:
+            self._strips.popitem(last=False)
+        return strip
+
+    def strip(self, keys: Sequence[str]) -> ShortcutStrip:
+        """Texture of the shortcut made of `keys`, and a region of it for each key"""
+        cache_key = tuple(key.lower() for key in keys)
+        strip = self._cached(cache_key)
+        if strip is not None:
+            return strip
+        return self._keep(cache_key, *self.strip_image(cache_key))
+
+    def strip_async(
+        self, keys: Sequence[str], on_strip: Callable[[ShortcutStrip], None]
+    ):
+        """
+        As `strip`, passing the strip to `on_strip` on the main thread once composed
+
+        `on_strip` is not called if the strip can't be composed.
+        """
+        cache_key = tuple(key.lower() for key in keys)
+        strip = self._cached(cache_key)
+        if strip is not None or self.executor is None:
+            try:
+                on_strip(strip or self.strip(cache_key))
+            except Exception as e:
+                Logger.debug(f"ShortcutStripCache: Could not draw {cache_key}, {e}")
+            return
+        waiting = self._pending.get(cache_key)
+        if waiting is not None:
+            waiting.append(on_strip)
+            return
+        self._pending[cache_key] = [on_strip]
+        self.executor.submit(
+            "shortcut",
+            self.strip_image,
+            cache_key,
+            on_result=partial(self._strip_composed, cache_key),
+            on_error=partial(self._strip_failed, cache_key),
+        )
+
+    def _strip_composed(
+        self, cache_key: tuple[str, ...], result: tuple[Path, list["ImgPos"]]
+    ):
+        try:
+            strip = self._cached(cache_key) or self._keep(cache_key, *result)
+        except Exception as e:
+            self._strip_failed(cache_key, e)
+            return
+        for on_strip in self._pending.pop(cache_key, ()):
+            on_strip(strip)
+
+    def _strip_failed(self, cache_key: tuple[str, ...], error: BaseException):
+        self._pending.pop(cache_key, None)
+        Logger.debug(f"ShortcutStripCache: Could not draw {cache_key}, {error}")
+
+    def stats(self) -> dict[str, int]:
+        return {"strips": len(self._strips), "composed": self.composed}
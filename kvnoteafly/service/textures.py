@@ -0,0 +1,244 @@
+"""
+App-wide registry of textures loaded from atlas regions
+"""
+from __future__ import annotations
+
+import os
+import weakref
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional, TYPE_CHECKING
+
+from kivy import Logger
+
+if TYPE_CHECKING:
+    from kivy.core.image import ImageLoaderBase
+    from kivy.graphics.texture import Texture
+
+    from adapters.atlas.atlas_repository import AbstractAtlasRepository
+    from adapters.atlas.fs.index import ImgPos
+    from service.executor import BackgroundExecutor
+
+TextureKey = tuple[str, str]
+OwnerKey = tuple[int, TextureKey]
+PageKey = tuple[str, Path]
+
+
+class TextureRegistry:
+    """
+    Loads each atlas region once and hands the same texture to every widget that shows it
+
+    Each `acquire` takes a reference, given back with `release`. An `owner` holds at most one reference to each
+    texture, released automatically when the owner is garbage collected. Textures nobody references are kept for
+    reuse, up to `keep_unused` of them, oldest dropped first.
+
+    `acquire_async` decodes the atlas page on `executor`, off the main thread, and only creates the texture on
+    the main thread. A decoded page is kept while any texture cut from it is referenced.
+
+    Parameters
+    ----------
+    atlas_service: AbstractAtlasRepository
+        Resolves atlas uris
+    keep_unused: int
+    executor: Optional[BackgroundExecutor]
+        Runs page decodes for `acquire_async`. Without one, `acquire_async` loads synchronously
+    """
+
+    def __init__(
+        self,
+        atlas_service: "AbstractAtlasRepository",
+        keep_unused: int = 16,
+        executor: Optional["BackgroundExecutor"] = None,
+    ):
+        self.atlas_service = atlas_service
+        self.keep_unused = keep_unused
+        self.executor = executor
+        self._textures: dict[TextureKey, "Texture"] = {}
+        self._refs: dict[TextureKey, int] = {}
+        self._unused: OrderedDict[TextureKey, None] = OrderedDict()
+        self._owned: dict[OwnerKey, weakref.finalize] = {}
+        self._pending: dict[TextureKey, list[tuple[Callable, Optional[object]]]] = {}
+        # Decoded atlas pages, keyed by atlas name and page path. Only written on the main thread
+        self._pages: dict[PageKey, "ImageLoaderBase"] = {}
+        self._page_of: dict[TextureKey, PageKey] = {}
+        self.loads = 0
+
+    def __contains__(self, key: TextureKey) -> bool:
+        return key in self._textures
+
+    def refs(self, name: str, atlas_name: str) -> int:
+        return self._refs.get((atlas_name, name), 0)
+
+    def _load(self, name: str, atlas_name: str) -> "Texture":
+        from kivy.core.image import Image as CoreImage
+
+        return CoreImage(self.atlas_service.uri_for(name, atlas_name)).texture
+
+    def acquire(
+        self, name: str, atlas_name: str, owner: Optional[object] = None
+    ) -> "Texture":
+        """
+        Texture for `name` in `atlas_name`, loading it on first use
+
+        Parameters
+        ----------
+        name: str
+        atlas_name: str
+        owner: Optional[object]
+            If given, the reference is released when `owner` is garbage collected
+        """
+        key = atlas_name, name
+        texture = self._textures.get(key)
+        if texture is None:
+            texture = self._textures[key] = self._load(name, atlas_name)
+            self.loads += 1
+        self._take(key, owner)
+        return texture
+
+    def _take(self, key: TextureKey, owner: Optional[object]):
+        if owner is not None:
+            owner_key = id(owner), key
+            if owner_key in self._owned:
+                return
+            self._owned[owner_key] = weakref.finalize(
+                owner, self._owner_collected, owner_key
+            )
+        self._unused.pop(key, None)
+        self._refs[key] = self._refs.get(key, 0) + 1
+
+    def acquire_async(
+        self,
+        name: str,
+        atlas_name: str,
+        on_texture: Callable[["Texture"], None],
+        owner: Optional[object] = None,
+    ):
+        """
+        As `acquire`, passing the texture to `on_texture` on the main thread once loaded
+
+        `on_texture` is not called if `name` can't be loaded.
+        """
+        key = atlas_name, name
+        if key in self._textures or self.executor is None:
+            try:
+                on_texture(self.acquire(name, atlas_name, owner))
+            except Exception as e:
+                Logger.debug(f"TextureRegistry: Could not load {key}, {e}")
+            return
+        waiting = self._pending.get(key)
+        if waiting is not None:
+            waiting.append((on_texture, owner))
+            return
+        self._pending[key] = [(on_texture, owner)]
+        self.executor.submit(
+            "texture",
+            self._decode_page,
+            name,
+            atlas_name,
+            on_result=partial(self._page_decoded, key),
+            on_error=partial(self._page_failed, key),
+        )
+
+    def _decode_page(
+        self, name: str, atlas_name: str
+    ) -> tuple[PageKey, "ImageLoaderBase", "ImgPos"]:
+        """Runs on the executor. Decoding is thread safe, texture creation is not, so it's left to the caller"""
+        from kivy.core.image import ImageLoader
+
+        page_path, rect = self.atlas_service.locate(name, atlas_name)
+        page_key = atlas_name, page_path
+        page = self._pages.get(page_key)
+        if page is None:
+            # Pages are held here, not in Kivy's cache, which would outlive a rewrite of the page
+            page = ImageLoader.load(os.fspath(page_path), nocache=True)
+        return page_key, page, rect
+
+    def _page_decoded(
+        self,
+        key: TextureKey,
+        result: tuple[PageKey, "ImageLoaderBase", "ImgPos"],
+    ):
+        page_key, page, rect = result
+        texture = self._textures.get(key)
+        if texture is None:
+            page = self._pages.setdefault(page_key, page)
+            self._page_of[key] = page_key
+            texture = self._textures[key] = page.texture.get_region(*rect)
+            self.loads += 1
+        for on_texture, owner in self._pending.pop(key, ()):
+            self._take(key, owner)
+            on_texture(texture)
+
+    def _page_failed(self, key: TextureKey, error: BaseException):
+        self._pending.pop(key, None)
+        Logger.debug(f"TextureRegistry: Could not load {key}, {error}")
+
+    def release(self, name: str, atlas_name: str, owner: Optional[object] = None):
+        key = atlas_name, name
+        if owner is not None:
+            finalizer = self._owned.pop((id(owner), key), None)
+            if finalizer is None:
+                return
+            finalizer.detach()
+        self._release(key)
+
+    def _owner_collected(self, owner_key: OwnerKey):
+        if self._owned.pop(owner_key, None) is not None:
+            self._release(owner_key[1])
+
+    def _release(self, key: TextureKey):
+        count = self._refs.get(key, 0) - 1
+        if count > 0:
+            self._refs[key] = count
+            return
+        self._refs.pop(key, None)
+        self._release_page(key)
+        if key in self._textures:
+            self._unused[key] = None
+            while len(self._unused) > self.keep_unused:
+                self._drop(self._unused.popitem(last=False)[0])
+
+    def _release_page(self, key: TextureKey):
+        """Drop the page `key` was cut from, if no other texture from it is referenced"""
+        page_key = self._page_of.get(key)
+        if page_key is None or any(
+            self._refs.get(other) for other, p in self._page_of.items() if p == page_key
+        ):
+            return
+        # Unused textures keep their region, later ones decode the page again
+        self._pages.pop(page_key, None)
+
+    def _drop(self, key: TextureKey):
+        self._textures.pop(key, None)
+        self._refs.pop(key, None)
+        self._unused.pop(key, None)
+        self._page_of.pop(key, None)
+
+    def evict(self):
+        """Drop every texture that isn't referenced"""
+        for key in list(self._unused):
+            self._drop(key)
+
+    def invalidate(self, atlas_name: str):
+        """
+        Forget textures from `atlas_name`, after it has been rewritten
+
+        Widgets holding a texture keep it, and their references, later acquires load the new one.
+        """
+        for key in [k for k in self._textures if k[0] == atlas_name]:
+            self._textures.pop(key)
+            self._unused.pop(key, None)
+            self._page_of.pop(key, None)
+        for page_key in [k for k in self._pages if k[0] == atlas_name]:
+            del self._pages[page_key]
+        Logger.debug(f"TextureRegistry: Invalidated {atlas_name}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "textures": len(self._textures),
+            "unused": len(self._unused),
+            "refs": sum(self._refs.values()),
+            "pages": len(self._pages),
+            "loads": self.loads,
+        }
@@ -1,13 +1,14 @@
 import os
 from datetime import datetime
-from functools import partial, wraps
+from functools import wraps
 from pathlib import Path
 from typing import Any, Callable, Generic, Literal, Optional, Protocol, TypeVar, Union
 
 from kivy import Logger
-from kivy.clock import Clock
 from kivy.lang import Builder
 
+from utils.kv_cache import load_kv_file
+
 
 _LOG_LEVEL = None
 
@@ -17,7 +18,7 @@ def import_kv(path: Union[Path, str]):
     kv_path = base_path.with_suffix(".kv")
     if kv_path.exists() and (sp := str(kv_path)) not in Builder.files:
         Logger.debug(f"Loading {kv_path.name}")
-        Builder.load_file(sp, rulesonly=True)
+        load_kv_file(sp)
 
 
 def get_log_level():
@@ -43,24 +44,6 @@ def log_run_time(func):
     return wrapped_log_run_time
 
 
-def sch_cb(timeout: float = 0, *args):
-    """Chain functions that sequentially call the next"""
-
-    func_pipe = (f for f in args)
-
-    def _scheduled_func(*args, **kwargs):
-        func = kwargs.pop("func")
-        func(*args, **kwargs)
-        next_func = next(func_pipe, None)
-        if next_func:
-            cb = partial(_scheduled_func, func=next_func)
-            Clock.schedule_once(cb, timeout)
-
-    head_func = partial(_scheduled_func, func=next(func_pipe))
-
-    Clock.schedule_once(head_func, timeout=timeout)
-
-
 class EnvironContext:
     def __init__(self, vals: dict[str, str]):
         self.vals = vals
@@ -0,0 +1,86 @@
+"""
+A long-lived asyncio loop on a dedicated thread, shared by the repositories
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import Coroutine, Optional, TypeVar
+
+from utils import Singleton
+
+T = TypeVar("T")
+
+
+class IOLoop(metaclass=Singleton):
+    """
+    Runs coroutines on a background event loop that lives for the whole app run
+
+    Replaces per-call `asyncio.run`, which creates and closes a new loop (and its default executor)
+    every time. The loop thread is started on first use and stopped at exit.
+
+    Attributes
+    ----------
+    loop: Optional[asyncio.AbstractEventLoop]
+        None until the first submission
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    def _ensure_running(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self.loop is None:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="io-loop", daemon=True)
+                self._thread.start()
+                started.wait()
+                self.loop = loop
+            return self.loop
+
+    @property
+    def in_loop_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, coro: Coroutine[object, object, T]) -> Future[T]:
+        """Schedule `coro` on the loop, from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_running())
+
+    def run(
+        self, coro: Coroutine[object, object, T], timeout: Optional[float] = None
+    ) -> T:
+        """
+        Block until `coro` completes, a drop-in for `asyncio.run`
+
+        Raises
+        ------
+        RuntimeError
+            If called from the loop thread itself, which would deadlock
+        """
+        if self.in_loop_thread:
+            coro.close()
+            raise RuntimeError("IOLoop.run called from within the loop, await instead")
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        with self._lock:
+            loop, thread = self.loop, self._thread
+            self.loop, self._thread = None, None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=1)
+        if not loop.is_running():
+            loop.close()
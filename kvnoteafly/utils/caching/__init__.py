@@ -1,5 +1,5 @@
 from functools import wraps
-from typing import Callable, Optional, TypeVar, Hashable, TYPE_CHECKING
+from typing import Callable, TypeVar, Hashable, TYPE_CHECKING
 from kivy.cache import Cache
 
 if TYPE_CHECKING:
@@ -40,30 +40,6 @@ def kivy_cache(cache_name: str, key_func: "KeyedCallable") -> "InnerCallable":
     return dec_kivy_cache
 
 
-def cache_key_text_extents(**kwargs) -> str:
-    """Generate key for 'text_extents' cache"""
-    label = kwargs.get("label")
-    text = kwargs.get("text")
-    opts = label.options
-    return f"{text}-{opts['font_size']}-{opts['font_family']}"
-
-
-def cache_key_text_contrast(*args, **kwargs) -> tuple[tuple, int, Optional[tuple]]:
-    """Generate key for 'text_contrast'"""
-    background_color = kwargs.get("background_color")
-    threshold = kwargs.get("threshold")
-    highlight_color = kwargs.get("highlight_color")
-    return (
-        tuple(background_color),
-        int(threshold),
-        tuple(highlight_color) if highlight_color else None,
-    )
-
-
-def cache_key_color_norm(*args, **kwargs) -> tuple:
-    return tuple(kwargs.get("color"))
-
-
 def cache_key_note(*args, **kwargs) -> str:
     content_data = kwargs.get("content_data")
     parent = kwargs.pop("parent")
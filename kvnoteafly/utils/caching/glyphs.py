@@ -0,0 +1,142 @@
+"""
+Glyph advance tables for measuring text without asking the text provider for every string
+"""
+from __future__ import annotations
+
+import math
+import string
+from typing import NamedTuple, Optional, TYPE_CHECKING
+
+from kivy.core.text import Label as CoreLabel
+
+if TYPE_CHECKING:
+    from kivy.core.text import LabelBase
+
+PRELOAD_CHARSET = "".join(
+    c for c in string.printable if c not in string.whitespace or c == " "
+)
+# Repeating a glyph lets us recover its sub-pixel advance from integer extents
+_ADVANCE_SAMPLES = 8
+
+
+class GlyphKey(NamedTuple):
+    font_name: str
+    font_size: float
+    bold: bool
+    italic: bool
+
+
+class GlyphMetrics:
+    """
+    Advance widths for a single font face at a single size
+
+    Attributes
+    ----------
+    key: GlyphKey
+    line_height: int
+        Height reported by the text provider for a single line
+    advances: dict[str, float]
+        Sub-pixel advance of each glyph that has been measured
+    """
+
+    def __init__(self, key: GlyphKey, charset: str = PRELOAD_CHARSET):
+        self.key = key
+        self._label = CoreLabel(
+            font_name=key.font_name,
+            font_size=key.font_size,
+            bold=key.bold,
+            italic=key.italic,
+        )
+        self.line_height = self._label.get_extents(" ")[1]
+        self.advances = {}
+        self.hits = 0
+        self.misses = 0
+        for char in charset:
+            self.advances[char] = self._measure(char)
+
+    def _measure(self, char: str) -> float:
+        get_extents = self._label.get_extents
+        single = get_extents(char)[0]
+        repeated = get_extents(char * (_ADVANCE_SAMPLES + 1))[0]
+        return (repeated - single) / _ADVANCE_SAMPLES
+
+    def advance(self, char: str) -> float:
+        try:
+            value = self.advances[char]
+            self.hits += 1
+            return value
+        except KeyError:
+            self.misses += 1
+            value = self._measure(char)
+            self.advances[char] = value
+            return value
+
+    def extents(self, text: str) -> tuple[int, int]:
+        """Width and height of `text` as a single line, as `get_extents` would report"""
+        advance = self.advance
+        return math.ceil(sum(advance(c) for c in text)), self.line_height
+
+
+_TABLES: dict[GlyphKey, GlyphMetrics] = {}
+
+
+def glyph_key(
+    font_name: str, font_size: float, bold: bool = False, italic: bool = False
+) -> GlyphKey:
+    return GlyphKey(str(font_name), float(font_size), bool(bold), bool(italic))
+
+
+def glyph_key_for_label(label: "LabelBase") -> GlyphKey:
+    opts = label.options
+    return glyph_key(opts["font_name"], opts["font_size"], opts["bold"], opts["italic"])
+
+
+def get_glyph_metrics(key: GlyphKey) -> GlyphMetrics:
+    """Fetch the advance table for `key`, building it on first use"""
+    table = _TABLES.get(key)
+    if table is None:
+        table = GlyphMetrics(key)
+        _TABLES[key] = table
+    return table
+
+
+def measure_text(
+    text: str,
+    *,
+    label: Optional["LabelBase"] = None,
+    key: Optional[GlyphKey] = None,
+) -> tuple[int, int]:
+    """
+    Measure `text` by summing glyph advances
+
+    Parameters
+    ----------
+    text: str
+    label: Optional[LabelBase]
+        Core label whose font options are used
+    key: Optional[GlyphKey]
+        Font options, if no label is available
+    """
+    if key is None:
+        if label is None:
+            raise ValueError("Expected one of label or key")
+        key = glyph_key_for_label(label)
+    return get_glyph_metrics(key).extents(text)
+
+
+def glyph_cache_stats() -> dict[str, float]:
+    """Hit-rate stats across all advance tables"""
+    hits = sum(t.hits for t in _TABLES.values())
+    misses = sum(t.misses for t in _TABLES.values())
+    total = hits + misses
+    return {
+        "tables": len(_TABLES),
+        "glyphs": sum(len(t.advances) for t in _TABLES.values()),
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": (hits / total) if total else 0.0,
+    }
+
+
+def clear_glyph_cache():
+    _TABLES.clear()
@@ -0,0 +1,143 @@
+"""
+Precomputed color normalization and text contrast for the app color scheme
+"""
+from __future__ import annotations
+
+from itertools import product
+from typing import Hashable, Iterable, Optional, Sequence, Union
+
+from utils import Singleton
+
+RGBA = tuple[float, float, float, float]
+ColorLike = Union[str, Sequence[float]]
+
+DEFAULT_THRESHOLDS = (186, 170)
+TEXT_DARK = "#000000"
+TEXT_LIGHT = "#ffffff"
+
+
+def color_key(color: Optional[ColorLike]) -> Optional[Hashable]:
+    if color is None or isinstance(color, str):
+        return color
+    key = tuple(color)
+    # Opacity is implied when omitted
+    return key if len(key) == 4 else (*key, 1.0)
+
+
+def normalize_color(color: ColorLike) -> RGBA:
+    """Return r, g, b, opacity as floats (0-1) from a hex string or float components"""
+    if isinstance(color, str):
+        s = color.removeprefix("#")
+        # Groups of two
+        components = [int(s[i : i + 2], 16) / 255 for i in range(0, len(s), 2)]
+    else:
+        components = list(color)
+    if len(components) < 4:
+        components.append(1.0)
+    r, g, b, opacity, *_ = components
+    return r, g, b, opacity
+
+
+def blend_brightness(bg: RGBA, hl: Optional[RGBA]) -> float:
+    """Perceived brightness (0-255) of `hl` drawn over `bg`"""
+    if not hl:
+        r, g, b, opacity = bg
+    else:
+        r_hl, g_hl, b_hl, opacity_hl = hl
+        r_bg, g_bg, b_bg, opacity_bg = bg
+
+        # https://stackoverflow.com/questions/726549/algorithm-for-additive-color-mixing-for-rgb-values
+        opacity = 1 - (1 - opacity_hl) * (1 - opacity_bg)
+        r = r_hl * opacity_hl / opacity + r_bg * opacity_bg * (1 - opacity_hl) / opacity
+        g = g_hl * opacity_hl / opacity + g_bg * opacity_bg * (1 - opacity_hl) / opacity
+        b = b_hl * opacity_hl / opacity + b_bg * opacity_bg * (1 - opacity_hl) / opacity
+
+    # https://stackoverflow.com/questions/3942878/how-to-decide-font-color-in-white-or-black-depending-on-background-color
+    return (r * 0.299 + g * 0.587 + b * 0.114 + (1 - opacity)) * 255
+
+
+class ContrastPalette(metaclass=Singleton):
+    """
+    Lookup tables for normalized colors and text contrast
+
+    `build` precomputes every (background, highlight, threshold) combination of the given colors,
+    so that label creation is a dictionary lookup. Colors may be given as hex strings or float
+    components, either finds the same entry. Colors outside the table are computed on demand
+    and added to it.
+
+    Attributes
+    ----------
+    norms: dict[Hashable, RGBA]
+    contrast: dict[tuple[RGBA, int, Optional[RGBA]], str]
+    """
+
+    def __init__(self):
+        self.norms = {}
+        self.contrast = {}
+        self.misses = 0
+
+    def build(
+        self,
+        colors: Iterable[ColorLike],
+        thresholds: Iterable[int] = DEFAULT_THRESHOLDS,
+    ):
+        for color in colors:
+            norm = normalize_color(color)
+            self.norms[color_key(color)] = norm
+            # Widgets look colors up by their ColorProperty value, which is already float components
+            self.norms[norm] = norm
+
+        all_norms = list(dict.fromkeys(self.norms.values()))
+        pairs = list(product(range(len(all_norms)), [None, *range(len(all_norms))]))
+        brightness = [
+            blend_brightness(all_norms[bg], all_norms[hl] if hl is not None else None)
+            for bg, hl in pairs
+        ]
+        for threshold in thresholds:
+            threshold = int(threshold)
+            self.contrast.update(
+                (
+                    (
+                        all_norms[bg],
+                        threshold,
+                        all_norms[hl] if hl is not None else None,
+                    ),
+                    TEXT_DARK if value > threshold else TEXT_LIGHT,
+                )
+                for (bg, hl), value in zip(pairs, brightness)
+            )
+        return self
+
+    def color_norm(self, color: ColorLike) -> RGBA:
+        key = color_key(color)
+        try:
+            return self.norms[key]
+        except KeyError:
+            self.misses += 1
+            value = normalize_color(color)
+            self.norms[key] = value
+            return value
+
+    def text_contrast(
+        self,
+        background_color: ColorLike,
+        threshold: int,
+        highlight_color: Optional[ColorLike] = None,
+    ) -> str:
+        bg = self.color_norm(background_color)
+        hl = self.color_norm(highlight_color) if highlight_color else None
+        key = bg, int(threshold), hl
+        try:
+            return self.contrast[key]
+        except KeyError:
+            self.misses += 1
+            value = TEXT_DARK if blend_brightness(bg, hl) > threshold else TEXT_LIGHT
+            self.contrast[key] = value
+            return value
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "colors": len(self.norms),
+            "contrast": len(self.contrast),
+            "misses": self.misses,
+        }
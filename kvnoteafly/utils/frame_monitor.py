@@ -0,0 +1,145 @@
+"""
+Frame-time monitoring that attributes slow frames to the app work running at the time
+
+Enabled by setting `NOTEAFLY_FRAME_LOG` to the path of a log file. `NOTEAFLY_FRAME_BUDGET_MS` overrides the
+default budget.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, Optional, Union
+
+from kivy.clock import Clock
+
+from utils.tracing import Span, TRACER, Tracer
+
+FRAME_LOG_ENV = "NOTEAFLY_FRAME_LOG"
+FRAME_BUDGET_ENV = "NOTEAFLY_FRAME_BUDGET_MS"
+# A frame that misses a 30fps deadline is visible as a stutter
+DEFAULT_BUDGET_MS = 1000 / 30
+
+
+class FrameMonitor:
+    """
+    Measures the time between consecutive frames and logs those over budget
+
+    Each slow frame is reported with the traced spans that overlapped it, longest first. Spans come from
+    `utils.tracing`, which is enabled while the monitor runs.
+
+    Parameters
+    ----------
+    log_path: Union[str, Path]
+        Rotated at `max_bytes`, keeping `backup_count` old files
+    budget_ms: float
+    top_n: int
+        Number of spans listed per slow frame
+    tracer: Tracer
+    timer: Callable[[], int]
+        Nanosecond clock, sharing an epoch with the tracer
+    """
+
+    def __init__(
+        self,
+        log_path: Union[str, Path],
+        budget_ms: float = DEFAULT_BUDGET_MS,
+        top_n: int = 3,
+        max_bytes: int = 1_000_000,
+        backup_count: int = 3,
+        tracer: Tracer = TRACER,
+        timer: Callable[[], int] = perf_counter_ns,
+    ):
+        self.budget_ns = int(budget_ms * 1_000_000)
+        self.top_n = top_n
+        self.tracer = tracer
+        self.timer = timer
+        self.frames = 0
+        self.slow_frames = 0
+        self.worst_ns = 0
+        self._last_ns: Optional[int] = None
+        self._event = None
+        self._tracer_was_enabled = tracer.enabled
+
+        self.logger = logging.getLogger(f"noteafly.frames.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self.handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.logger.addHandler(self.handler)
+
+    @classmethod
+    def from_environ(cls) -> Optional["FrameMonitor"]:
+        """Build a monitor if `NOTEAFLY_FRAME_LOG` is set"""
+        log_path = os.environ.get(FRAME_LOG_ENV)
+        if not log_path:
+            return None
+        budget_ms = float(os.environ.get(FRAME_BUDGET_ENV, DEFAULT_BUDGET_MS))
+        return cls(log_path, budget_ms=budget_ms)
+
+    def start(self):
+        self.tracer.enabled = True
+        self._last_ns = None
+        self._event = Clock.schedule_interval(self.on_frame, 0)
+        self.logger.info(f"Monitoring frames, budget {self.budget_ns / 1e6:.1f}ms")
+
+    def stop(self):
+        if self._event:
+            self._event.cancel()
+            self._event = None
+        self.tracer.enabled = self._tracer_was_enabled
+        self.logger.info(f"Summary {self.stats()}")
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+    def pause(self):
+        """Stop measuring, keeping the log open. For when frames are slowed on purpose"""
+        if self._event:
+            self._event.cancel()
+            self._event = None
+
+    def resume(self):
+        if self._event is None:
+            self._last_ns = None
+            self._event = Clock.schedule_interval(self.on_frame, 0)
+
+    def on_frame(self, dt: float = 0):
+        now = self.timer()
+        last, self._last_ns = self._last_ns, now
+        if last is None:
+            return
+        self.frames += 1
+        elapsed = now - last
+        self.worst_ns = max(self.worst_ns, elapsed)
+        if elapsed > self.budget_ns:
+            self.slow_frames += 1
+            self.report(last, now)
+
+    def attribute(self, start_ns: int, end_ns: int) -> list[Span]:
+        """Spans overlapping the frame, longest first"""
+        spans = self.tracer.spans_between(start_ns, end_ns)
+        return sorted(spans, key=lambda s: s.duration_ns, reverse=True)[: self.top_n]
+
+    def report(self, start_ns: int, end_ns: int):
+        spans = self.attribute(start_ns, end_ns)
+        culprits = (
+            ", ".join(f"{s.stage} {s.duration_ns / 1e6:.1f}ms" for s in spans)
+            if spans
+            else "unattributed"
+        )
+        self.logger.warning(
+            f"Slow frame {(end_ns - start_ns) / 1e6:.1f}ms "
+            f"(budget {self.budget_ns / 1e6:.1f}ms): {culprits}"
+        )
+
+    def stats(self) -> dict[str, float]:
+        return {
+            "frames": self.frames,
+            "slow_frames": self.slow_frames,
+            "slow_ratio": (self.slow_frames / self.frames) if self.frames else 0.0,
+            "worst_ms": self.worst_ns / 1e6,
+        }
@@ -0,0 +1,164 @@
+"""
+On-disk cache of parsed kv files
+
+`Builder.load_file` tokenizes, parses and compiles every rule in a kv file on each launch. Here the resulting
+`Parser` is pickled, with its compiled expressions, keyed by the file's contents, the Kivy version and the
+interpreter's bytecode version. Later launches unpickle it and only re-run the file's `#:` directives.
+
+The cache lives in `<kivy home>/noteafly/kv`, or the directory named by `NOTEAFLY_KV_CACHE`. Setting
+`NOTEAFLY_KV_CACHE=off` disables it.
+
+Running this module precompiles every kv file in the app, e.g. as a packaging step::
+
+    python -m utils.kv_cache
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import marshal
+import os
+import pickle
+from functools import partial
+from importlib.util import MAGIC_NUMBER
+from pathlib import Path
+from types import CodeType
+from typing import Optional, Union
+
+import kivy
+from kivy import Logger
+from kivy.factory import Factory
+from kivy.lang import Builder, Parser
+
+KV_CACHE_ENV = "NOTEAFLY_KV_CACHE"
+_SUFFIX = ".kvc"
+
+
+def cache_dir() -> Optional[Path]:
+    """Cache directory, or None when disabled"""
+    configured = os.environ.get(KV_CACHE_ENV)
+    if configured and configured.lower() == "off":
+        return None
+    if configured:
+        return Path(configured)
+    return Path(kivy.kivy_home_dir) / "noteafly" / "kv"
+
+
+class _KvPickler(pickle.Pickler):
+    """Pickles code objects through `marshal`, which is stable for a given bytecode version"""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, CodeType):
+            return marshal.loads, (marshal.dumps(obj),)
+        return NotImplemented
+
+
+def _entry_path(directory: Path, kv_path: str, content: bytes) -> Path:
+    # Code objects embed the filename they were compiled with, so the path is part of the key
+    path_key = hashlib.sha256(kv_path.encode("utf-8")).hexdigest()[:12]
+    content_key = hashlib.sha256(
+        content + kivy.__version__.encode() + MAGIC_NUMBER
+    ).hexdigest()[:24]
+    return directory / f"{Path(kv_path).stem}.{path_key}.{content_key}{_SUFFIX}"
+
+
+def _read_entry(entry: Path) -> Optional[Parser]:
+    try:
+        with entry.open("rb") as fp:
+            parser = pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        Logger.warning(f"kv cache: discarding {entry.name}: {e}")
+        entry.unlink(missing_ok=True)
+        return None
+    return parser if isinstance(parser, Parser) else None
+
+
+def _write_entry(entry: Path, parser: Parser):
+    buf = io.BytesIO()
+    try:
+        _KvPickler(buf, protocol=pickle.HIGHEST_PROTOCOL).dump(parser)
+    except Exception as e:
+        # A constant that cannot be pickled; the file is parsed on every launch instead
+        Logger.debug(f"kv cache: not caching {entry.name}: {e}")
+        return
+    try:
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Entries from earlier versions of this file
+        for stale in entry.parent.glob(f"{entry.name.rsplit('.', 2)[0]}.*{_SUFFIX}"):
+            stale.unlink(missing_ok=True)
+        tmp = entry.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(buf.getvalue())
+        os.replace(tmp, entry)
+    except OSError as e:
+        Logger.warning(f"kv cache: unable to write {entry}: {e}")
+
+
+def parse_kv(kv_path: Union[Path, str]) -> tuple[Parser, bool]:
+    """
+    Parse a kv file, reading and populating the cache
+
+    Returns
+    -------
+    parser: Parser
+    cached: bool
+        True if the parser came from the cache
+    """
+    kv_path = str(kv_path)
+    content = Path(kv_path).read_bytes()
+    directory = cache_dir()
+    entry = _entry_path(directory, kv_path, content) if directory else None
+
+    if entry and (parser := _read_entry(entry)) is not None:
+        # Imports and `#:set` populate Builder's globals as a side effect of parsing
+        parser.execute_directives()
+        return parser, True
+
+    parser = Parser(content=content.decode("utf-8"), filename=kv_path)
+    if entry:
+        _write_entry(entry, parser)
+    return parser, False
+
+
+def load_kv_file(kv_path: Union[Path, str]):
+    """
+    Equivalent of `Builder.load_file(kv_path, rulesonly=True)` using `parse_kv`
+
+    Raises
+    ------
+    ValueError
+        If the file defines a root widget
+    """
+    fn = str(kv_path)
+    parser, cached = parse_kv(fn)
+    if parser.root:
+        raise ValueError(f"{fn} contains a root widget, only rules can be cached")
+    Logger.debug(f"kv cache: {'hit' if cached else 'miss'} {Path(fn).name}")
+
+    # Mirrors Builder.load_string
+    Builder.rules.extend(parser.rules)
+    Builder._clear_matchcache()
+    for name, cls, template in parser.templates:
+        Builder.templates[name] = (cls, template, fn)
+        Factory.register(
+            name, cls=partial(Builder.template, name), is_template=True, warn=True
+        )
+    for name, baseclasses in parser.dynamic_classes.items():
+        Factory.register(name, baseclasses=baseclasses, filename=fn, warn=True)
+    if parser.templates or parser.dynamic_classes or parser.rules:
+        Builder.files.append(fn)
+
+
+def precompile(root: Union[Path, str]) -> int:
+    """Parse and cache every kv file under `root`. Returns the number of files parsed"""
+    count = 0
+    for kv_path in sorted(Path(root).resolve().rglob("*.kv")):
+        _, cached = parse_kv(kv_path)
+        count += not cached
+    return count
+
+
+if __name__ == "__main__":
+    app_dir = Path(__file__).resolve().parents[1]
+    print(f"Parsed {precompile(app_dir)} kv files into {cache_dir()}")
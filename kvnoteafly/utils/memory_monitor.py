@@ -0,0 +1,151 @@
+"""
+Memory accounting across app state transitions
+
+Enabled by setting `NOTEAFLY_MEMORY_LOG` to the path of a log file. A tracemalloc snapshot is taken on each category
+switch and every `NOTEAFLY_MEMORY_EVERY` paginations, and compared with the one before it.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tracemalloc
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional, Union
+
+from kivy.cache import Cache
+
+MEMORY_LOG_ENV = "NOTEAFLY_MEMORY_LOG"
+MEMORY_EVERY_ENV = "NOTEAFLY_MEMORY_EVERY"
+DEFAULT_EVERY = 20
+
+# Allocations made by the accounting itself
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def cache_sizes() -> dict[str, int]:
+    """
+    Entries held by each Kivy `Cache` category, and by the app's own text caches
+    """
+    sizes = {
+        category: len(Cache._objects.get(category, ()))
+        for category in sorted(Cache._categories)
+    }
+    from utils.caching.glyphs import glyph_cache_stats
+    from utils.caching.palette import ContrastPalette
+
+    sizes["glyph_advances"] = glyph_cache_stats()["glyphs"]
+    palette = ContrastPalette().stats()
+    sizes["palette_colors"] = palette["colors"]
+    sizes["palette_contrast"] = palette["contrast"]
+    return sizes
+
+
+class MemoryMonitor:
+    """
+    Logs the allocation sites that grew the most between snapshots
+
+    Parameters
+    ----------
+    log_path: Union[str, Path]
+        Rotated at `max_bytes`, keeping `backup_count` old files
+    every: int
+        Paginations between snapshots
+    top_n: int
+        Allocation sites listed per snapshot
+    frames: int
+        Stack depth tracemalloc records per allocation. More is slower, but groups sites by caller
+    """
+
+    def __init__(
+        self,
+        log_path: Union[str, Path],
+        every: int = DEFAULT_EVERY,
+        top_n: int = 10,
+        frames: int = 1,
+        max_bytes: int = 1_000_000,
+        backup_count: int = 3,
+    ):
+        self.every = max(1, every)
+        self.top_n = top_n
+        self.frames = frames
+        self.paginations = 0
+        self.snapshots = 0
+        self._last: Optional[tracemalloc.Snapshot] = None
+        self._started_tracing = False
+
+        self.logger = logging.getLogger(f"noteafly.memory.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self.handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.logger.addHandler(self.handler)
+
+    @classmethod
+    def from_environ(cls) -> Optional["MemoryMonitor"]:
+        """Build a monitor if `NOTEAFLY_MEMORY_LOG` is set"""
+        log_path = os.environ.get(MEMORY_LOG_ENV)
+        if not log_path:
+            return None
+        every = int(os.environ.get(MEMORY_EVERY_ENV, DEFAULT_EVERY))
+        return cls(log_path, every=every)
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.logger.info(f"Monitoring memory, snapshot every {self.every} paginations")
+        self.snapshot("start")
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            self.snapshot("stop")
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._last = None
+        self.logger.removeHandler(self.handler)
+        self.handler.close()
+
+    def on_category(self, category: str):
+        self.snapshot(f"category {category or '<none>'}")
+
+    def on_paginate(self):
+        self.paginations += 1
+        if self.paginations % self.every == 0:
+            self.snapshot(f"{self.paginations} paginations")
+
+    def snapshot(self, reason: str) -> list[tracemalloc.StatisticDiff]:
+        """
+        Take a snapshot and log what grew since the last one
+
+        Returns
+        -------
+        Growing allocation sites, largest first
+        """
+        current = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+        self.snapshots += 1
+        traced, peak = tracemalloc.get_traced_memory()
+        self.logger.info(
+            f"Snapshot {self.snapshots} ({reason}): traced {traced / 1024:.0f}KiB, "
+            f"peak {peak / 1024:.0f}KiB, caches {cache_sizes()}"
+        )
+        growth = []
+        if self._last is not None:
+            diffs = current.compare_to(self._last, "lineno")
+            growth = [d for d in diffs if d.size_diff > 0][: self.top_n]
+            for diff in growth:
+                frame = diff.traceback[0]
+                self.logger.info(
+                    f"  +{diff.size_diff / 1024:.1f}KiB "
+                    f"(+{diff.count_diff} blocks) {frame.filename}:{frame.lineno}"
+                )
+        self._last = current
+        return growth
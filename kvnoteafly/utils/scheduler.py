@@ -0,0 +1,153 @@
+"""
+Cooperative scheduling of UI work within a per-frame time budget
+"""
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from itertools import count
+from time import perf_counter
+from typing import Callable, Optional
+
+from kivy import Logger
+from kivy.clock import Clock
+
+from utils.tracing import TRACER, trace
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 10
+PRIORITY_LOW = 20
+
+StepType = Callable[[float], None]
+
+
+class Task:
+    """
+    Ordered steps that run back-to-back, sharing the frame with other tasks
+
+    Attributes
+    ----------
+    priority: int
+        Lower values run first
+    name: Optional[str]
+    cancelled: bool
+    """
+
+    __slots__ = ("priority", "name", "steps", "cancelled", "_delay")
+
+    def __init__(self, steps: tuple[StepType, ...], priority: int, name: Optional[str]):
+        self.priority = priority
+        self.name = name
+        self.steps = deque(steps)
+        self.cancelled = False
+        self._delay = None
+
+    @property
+    def done(self) -> bool:
+        return self.cancelled or not self.steps
+
+    def cancel(self):
+        self.cancelled = True
+        self.steps.clear()
+        if self._delay:
+            self._delay.cancel()
+            self._delay = None
+
+    def __repr__(self):
+        return f"Task({self.name or 'anonymous'}, priority={self.priority}, steps={len(self.steps)})"
+
+
+class FrameScheduler:
+    """
+    Runs queued tasks back-to-back until `budget` seconds of the frame are used, then yields to
+    the next frame.
+
+    Steps receive `dt` like a Clock callback. A chain of steps that previously took one frame per step
+    now completes within a single frame, unless the budget runs out.
+
+    Parameters
+    ----------
+    budget: float
+        Seconds of work allowed per frame
+    timer: Callable[[], float]
+        Monotonic clock used to measure the budget
+    """
+
+    def __init__(
+        self, budget: float = 0.008, timer: Callable[[], float] = perf_counter
+    ):
+        self.budget = budget
+        self.timer = timer
+        self._queue: list[tuple[int, int, Task]] = []
+        self._seq = count()
+        self._trigger = Clock.create_trigger(self.run_frame)
+
+    def __len__(self):
+        return sum(1 for *_, task in self._queue if not task.done)
+
+    def schedule(
+        self,
+        *steps: StepType,
+        priority: int = PRIORITY_NORMAL,
+        timeout: float = 0,
+        name: Optional[str] = None,
+    ) -> Task:
+        """
+        Queue `steps` to run in order
+
+        Parameters
+        ----------
+        steps
+        priority
+            One of PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW (or any int, lower runs first)
+        timeout
+            Seconds to wait before the task is queued
+        name
+            Shown in logs
+
+        Returns
+        -------
+        Task that can be cancelled
+        """
+        task = Task(steps, priority, name)
+        if timeout > 0:
+            task._delay = Clock.schedule_once(lambda dt: self._enqueue(task), timeout)
+        else:
+            self._enqueue(task)
+        return task
+
+    def _enqueue(self, task: Task):
+        task._delay = None
+        if task.done:
+            return
+        heapq.heappush(self._queue, (task.priority, next(self._seq), task))
+        self._trigger()
+
+    def run_frame(self, dt: float = 0):
+        """Run queued steps until the queue is empty or the frame budget is spent"""
+        queue = self._queue
+        deadline = self.timer() + self.budget
+        while queue:
+            *_, task = queue[0]
+            if task.done:
+                heapq.heappop(queue)
+                continue
+            if self.timer() >= deadline:
+                break
+            step = task.steps.popleft()
+            if not task.steps:
+                heapq.heappop(queue)
+            if TRACER.enabled:
+                with trace(f"task.{task.name or 'anonymous'}"):
+                    step(dt)
+            else:
+                step(dt)
+
+        if len(self):
+            Logger.debug(f"FrameScheduler: Yielding with {len(self)} tasks queued")
+            self._trigger()
+
+    def cancel_all(self):
+        for *_, task in self._queue:
+            task.cancel()
+        self._queue.clear()
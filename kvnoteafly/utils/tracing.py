@@ -0,0 +1,224 @@
+"""
+Per-stage latency histograms for hot paths
+
+Tracing is off unless the `NOTEAFLY_TRACE` environment variable is set. When set, it names the JSON file
+that the histograms are written to when the app exits.
+
+The most recent spans are also kept, so that other monitors can see what was running at a given time.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import math
+import os
+import threading
+from collections import deque
+from functools import wraps
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Callable, NamedTuple, Optional, TypeVar, Union
+
+F = TypeVar("F", bound=Callable)
+
+TRACE_ENV = "NOTEAFLY_TRACE"
+
+# Log-spaced buckets from 1µs, each ~5% wider than the last
+_BUCKET_GROWTH = 1.05
+_LOG_GROWTH = math.log(_BUCKET_GROWTH)
+_MIN_NS = 1_000
+_N_BUCKETS = 500  # Tops out past 10 minutes
+
+
+def _bucket_for(ns: int) -> int:
+    if ns <= _MIN_NS:
+        return 0
+    return min(int(math.log(ns / _MIN_NS) / _LOG_GROWTH) + 1, _N_BUCKETS - 1)
+
+
+def _bucket_upper_ns(i: int) -> float:
+    return _MIN_NS * _BUCKET_GROWTH**i
+
+
+class Histogram:
+    """
+    Fixed-size, log-bucketed latency histogram
+
+    Percentiles are reported as the upper bound of the bucket they fall in, so they are within ~5% of
+    the true value while memory stays constant.
+    """
+
+    __slots__ = ("buckets", "count", "total_ns", "min_ns", "max_ns")
+
+    def __init__(self):
+        self.buckets = [0] * _N_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        self.buckets[_bucket_for(ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, p: float) -> float:
+        """Value in nanoseconds below which `p` percent of samples fall"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(self.count * p / 100)
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank:
+                # Never report beyond what was observed
+                return min(_bucket_upper_ns(i), self.max_ns)
+        return float(self.max_ns)
+
+    def summary(self) -> dict[str, float]:
+        """Figures in milliseconds"""
+        ms = 1e-6
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns * ms,
+            "mean_ms": (self.total_ns / self.count * ms) if self.count else 0.0,
+            "min_ms": (self.min_ns or 0) * ms,
+            "max_ms": self.max_ns * ms,
+            "p50_ms": self.percentile(50) * ms,
+            "p95_ms": self.percentile(95) * ms,
+            "p99_ms": self.percentile(99) * ms,
+        }
+
+
+class Span(NamedTuple):
+    stage: str
+    start_ns: int
+    end_ns: int
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+class Tracer:
+    """
+    Collects a `Histogram` per stage
+
+    Attributes
+    ----------
+    enabled: bool
+        When False, `trace` records nothing
+    histograms: dict[str, Histogram]
+    spans: deque[Span]
+        Most recent spans, oldest first. Timestamps are from `perf_counter_ns`
+    """
+
+    def __init__(self, enabled: bool = False, max_spans: int = 512):
+        self.enabled = enabled
+        self.histograms: dict[str, Histogram] = {}
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, start_ns: int, end_ns: int):
+        with self._lock:
+            hist = self.histograms.get(stage)
+            if hist is None:
+                hist = self.histograms[stage] = Histogram()
+            hist.record(end_ns - start_ns)
+            self.spans.append(Span(stage, start_ns, end_ns))
+
+    def spans_between(self, start_ns: int, end_ns: int) -> list[Span]:
+        """Recent spans that overlap `start_ns` to `end_ns`"""
+        with self._lock:
+            return [
+                s for s in self.spans if s.end_ns >= start_ns and s.start_ns <= end_ns
+            ]
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                stage: hist.summary() for stage, hist in sorted(self.histograms.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.spans.clear()
+
+    def dump(self, path: Union[str, Path]) -> dict[str, dict[str, float]]:
+        """Write the current snapshot to `path` as JSON"""
+        data = self.snapshot()
+        Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+        return data
+
+
+TRACER = Tracer(enabled=bool(os.environ.get(TRACE_ENV)))
+
+
+class trace:
+    """
+    Time a stage, as a context manager or decorator
+
+    Examples
+    --------
+    >>> with trace("parse"):
+    ...     ...
+
+    >>> @trace("discovery")
+    ... def discover_notes(self): ...
+    """
+
+    __slots__ = ("stage", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = 0
+
+    def __enter__(self):
+        if TRACER.enabled:
+            self._start = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if TRACER.enabled and self._start:
+            TRACER.record(self.stage, self._start, perf_counter_ns())
+        return False
+
+    def __call__(self, func: F) -> F:
+        stage = self.stage
+
+        @wraps(func)
+        def traced(*args, **kwargs):
+            if not TRACER.enabled:
+                return func(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                TRACER.record(stage, start, perf_counter_ns())
+
+        return traced
+
+
+def trace_snapshot() -> dict[str, dict[str, float]]:
+    return TRACER.snapshot()
+
+
+def dump_traces(path: Optional[Union[str, Path]] = None) -> dict[str, dict[str, float]]:
+    """Write histograms as JSON to `path`, or the path named by `NOTEAFLY_TRACE`"""
+    path = path or os.environ.get(TRACE_ENV)
+    if not path:
+        raise ValueError(f"No path given and {TRACE_ENV} is not set")
+    return TRACER.dump(path)
+
+
+def _dump_at_exit():
+    if TRACER.enabled and TRACER.histograms and os.environ.get(TRACE_ENV):
+        dump_traces()
+
+
+atexit.register(_dump_at_exit)
@@ -0,0 +1,50 @@
+"""
+Widgets referenced from kv rules are registered with the Factory by module, rather than imported up front.
+
+The module, and with it the module's kv file, is imported the first time the widget is created. Screens that are not
+shown at startup therefore cost nothing until they are used.
+
+Classes declared only in kv, as `<Name@Base>`, can't be registered by module without shadowing their declaration. Their
+kv files are small and loaded here instead, before anything refers to them.
+"""
+from pathlib import Path
+
+from kivy.factory import Factory
+
+from utils import import_kv
+
+KV_CLASSES: dict[str, tuple[str, ...]] = {
+    "separator.kv": ("HSeparator", "VSeparator"),
+    "style.kv": ("BaseLabel", "LargeLabel", "SmallLabel"),
+}
+
+LAZY_WIDGETS: dict[str, tuple[str, ...]] = {
+    "widgets.behavior.inline_behavior": ("LabelHighlightInline",),
+    "widgets.behavior.label_behavior": ("LabelAutoContrast", "LabelHighlight"),
+    "widgets.buttons.button_bar": ("ControllerButtonBar", "NoteActionButtonBar"),
+    "widgets.buttons.buttons": (
+        "AddButton",
+        "BackButton",
+        "CancelButton",
+        "EditButton",
+        "ForwardButton",
+        "ListViewButton",
+        "PlayStateButton",
+        "ReturnButton",
+        "SaveButton",
+    ),
+    "widgets.categories": ("CategoryScreenScrollWrapper", "NoteCategories"),
+    "widgets.editor.editor": ("NoteEditor",),
+    "widgets.note": ("Note", "NoteContent", "NoteTags", "NoteTitle"),
+    "widgets.scroller": ("ListItemKeyboardContainer", "ScrollingListView"),
+    "widgets.separator": ("Separator",),
+    "widgets.style": ("TitleInput",),
+    "widgets.toolbar": ("Toolbar",),
+}
+
+for _kv in KV_CLASSES:
+    import_kv(Path(__file__).with_name(_kv))
+
+for _module, _names in LAZY_WIDGETS.items():
+    for _name in _names:
+        Factory.register(_name, module=_module)
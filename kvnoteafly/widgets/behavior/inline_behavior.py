@@ -13,6 +13,7 @@ from kivy.uix.label import Label
 from kivy.utils import escape_markup
 
 from utils import import_kv
+from utils.tracing import trace
 from widgets.behavior.label_behavior import get_cached_text_contrast
 
 import_kv(__file__)
@@ -83,6 +84,10 @@ class LabelHighlightInline(Label):
             funbind("size", self.draw_ref_spans_trigger)
             funbind("pos", self.draw_ref_spans_trigger)
 
+    @trace("texture")
+    def texture_update(self, *largs):
+        super().texture_update(*largs)
+
     def add_snippet(self, snippet: TextSnippet):
         self.snippets.append(snippet)
 
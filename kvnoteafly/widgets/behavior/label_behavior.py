@@ -3,18 +3,14 @@ from __future__ import annotations
 from kivy.utils import escape_markup
 
 from utils import import_kv
-from utils.caching import (
-    cache_key_color_norm,
-    cache_key_text_contrast,
-    cache_key_text_extents,
-    kivy_cache,
-)
+from utils.caching.glyphs import measure_text
+from utils.caching.palette import ContrastPalette
+from utils.tracing import trace
 
 import_kv(__file__)
 
 from typing import Any, Optional
 from kivy.clock import Clock
-from kivy.cache import Cache
 from kivy.graphics import Color, RoundedRectangle
 from kivy.properties import (
     BooleanProperty,
@@ -25,84 +21,23 @@ from kivy.properties import (
 )
 from kivy.uix.label import Label
 
-Cache.register("color_norm", limit=1000)
-Cache.register("text_contrast", limit=1000)
-Cache.register("text_extents", limit=1000)
-
 
-@kivy_cache(cache_name="text_extents", key_func=cache_key_text_extents)
 def get_cached_extents(*, label, text: str):
-    return label.get_extents(text)
+    """Measure `text` with the glyph advance table for `label`'s font"""
+    return measure_text(text, label=label)
 
 
-@kivy_cache(cache_name="text_contrast", key_func=cache_key_text_contrast)
 def get_cached_text_contrast(
     *, background_color, threshold, highlight_color: Optional[Any] = None
 ):
     """
     Set text as white or black depending on bg
     """
-    if not highlight_color:
-        r, g, b, opacity = get_cached_color_norm(color=background_color)
-        brightness = (r * 0.299 + g * 0.587 + b * 0.114 + (1 - opacity)) * 255
-    else:
-        hl_norm = get_cached_color_norm(color=highlight_color)
-        bg_norm = get_cached_color_norm(color=background_color)
-
-        r_hl, g_hl, b_hl, opacity_hl = hl_norm
-        r_bg, g_bg, b_bg, opacity_bg = bg_norm
-
-        # https://stackoverflow.com/questions/726549/algorithm-for-additive-color-mixing-for-rgb-values
-        opacity = 1 - (1 - opacity_hl) * (1 - opacity_bg)
-        r = r_hl * opacity_hl / opacity + r_bg * opacity_bg * (1 - opacity_hl) / opacity
-        g = g_hl * opacity_hl / opacity + g_bg * opacity_bg * (1 - opacity_hl) / opacity
-        b = b_hl * opacity_hl / opacity + b_bg * opacity_bg * (1 - opacity_hl) / opacity
-
-        # https://stackoverflow.com/questions/3942878/how-to-decide-font-color-in-white-or-black-depending-on-background-color
-        brightness = (r * 0.299 + g * 0.587 + b * 0.114 + (1 - opacity)) * 255
-    if brightness > threshold:
-        return "#000000"
-    else:
-        return "#ffffff"
-
-
-@kivy_cache(cache_name="color_norm", key_func=cache_key_color_norm)
+    return ContrastPalette().text_contrast(background_color, threshold, highlight_color)
+
+
 def get_cached_color_norm(color) -> tuple[float, float, float, float]:
-    def color_str_components(s: str) -> tuple[float, float, float, float]:
-        """Return hex as 1.0 * 4"""
-        s = s.removeprefix("#")
-        # Groups of two
-        components_hex = zip(*[iter(s)] * 2)
-        has_opacity = False
-        for i, comp in enumerate(components_hex):
-            if i == 3:
-                has_opacity = True
-                yield int("".join(comp), 16) / 255
-                continue
-            yield int("".join(comp), 16) / 255
-        if not has_opacity:
-            yield 1.0
-
-    def color_float_components(
-        s: tuple[int] | tuple[float],
-    ) -> tuple[float, float, float, float]:
-        """Return r, g, b (0.0-1.0) as (0-1) and opacity as (0-1)"""
-        has_opacity = False
-        for i, comp in enumerate(s):
-            if i == 3:
-                has_opacity = True
-                yield comp
-                continue
-            yield comp
-        if not has_opacity:
-            yield 1.0
-
-    if isinstance(color, str):
-        components = color_str_components(color)
-    else:
-        components = color_float_components(color)
-
-    return tuple(components)
+    return ContrastPalette().color_norm(color)
 
 
 class LabelAutoContrast(Label):
@@ -154,6 +89,10 @@ class LabelAutoContrast(Label):
         self.text = f"[color={self.text_color}]{escape_markup(value)}[/color]"
         return True
 
+    @trace("texture")
+    def texture_update(self, *largs):
+        super().texture_update(*largs)
+
 
 class LabelHighlight(LabelAutoContrast):
     """
@@ -2,10 +2,10 @@ from functools import partial
 
 from kivy.app import App
 from kivy.clock import Clock
-from kivy.core.image import Image
 from kivy.properties import (
     BooleanProperty,
     ListProperty,
+    NumericProperty,
     ObjectProperty,
     StringProperty,
 )
@@ -20,20 +20,42 @@ import_kv(__file__)
 
 
 class CategoryScreenScrollWrapper(ScrollView):
-    """Screen With Buttons for Categories"""
+    """
+    Screen With Buttons for Categories
+
+    Category images are loaded as buttons come within `preload` viewport heights of the visible area
+
+    Attributes
+    ----------
+    preload: NumericProperty
+    """
 
     screen = ObjectProperty()
     chooser = ObjectProperty()
     categories = ListProperty()
     refresh_triggered = BooleanProperty(False)
+    preload = NumericProperty(0.5)
 
     effect_cls = RefreshOverscrollEffect
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.viewport_trigger = Clock.create_trigger(self.update_viewport)
+        fbind = self.fbind
+        fbind("scroll_y", self.viewport_trigger)
+        fbind("size", self.viewport_trigger)
 
     def on_chooser(self, instance, value):
         self.chooser.bind(minimum_height=self.chooser.setter("height"))
+        # Height changes once buttons have been laid out
+        self.chooser.fbind("height", self.viewport_trigger)
+
+    def update_viewport(self, *args):
+        if not self.chooser or not self.get_root_window():
+            return
+        _, bottom = self.to_window(*self.pos)
+        margin = self.height * self.preload
+        self.chooser.update_viewport(bottom - margin, bottom + self.height + margin)
 
     def on_screen(self, instance, value):
         self.bind(refresh_triggered=self.screen.setter("refresh_triggered"))
@@ -43,11 +65,26 @@ class CategoryScreenScrollWrapper(ScrollView):
 
 
 class NoteCategories(BoxLayout):
+    """
+    Buttons for each category
+
+    Changes to `categories` are applied as a diff on the next frame. Buttons for categories that remain
+    are kept, so a refresh only creates buttons for new categories and removes stale ones. Removed buttons
+    are recycled for new categories.
+
+    Buttons start as placeholders. `update_viewport` loads images for those near the visible area and, with
+    more than `recycle_after` categories, unloads images for those far from it.
+    """
+
     category_container = ObjectProperty()
     categories = ListProperty()
+    recycle_after = NumericProperty(48)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        self.buttons: dict[str, NoteCategoryButton] = {}
+        self.spare: list[NoteCategoryButton] = []
+        self.draw_trigger = Clock.create_trigger(self.draw_categories)
         fbind = self.fbind
         fbind("categories", self.handle_categories)
 
@@ -55,40 +92,107 @@ class NoteCategories(BoxLayout):
         self.parent.category_selected(instance)
 
     def handle_categories(self, instance, value):
-        Clock.schedule_once(
-            partial(self.clear_categories, callback=self.draw_categories)
-        )
-
-    def clear_categories(self, dt, callback):
-        self.category_container.clear_widgets()
-        if callback:
-            Clock.schedule_once(callback)
+        # Several assignments within a frame redraw once
+        self.draw_trigger()
 
     def draw_categories(self, dt):
-        for category in self.categories:
-            cat_btn = NoteCategoryButton(text=category)
-            cat_btn.bind(on_release=self.category_callback)
-            self.category_container.add_widget(cat_btn)
+        container = self.category_container
+        buttons = self.buttons
+        wanted = list(dict.fromkeys(self.categories))
+
+        for category in buttons.keys() - set(wanted):
+            cat_btn = buttons.pop(category)
+            container.remove_widget(cat_btn)
+            cat_btn.unload_image()
+            self.spare.append(cat_btn)
+
+        ordered = []
+        for category in wanted:
+            if (cat_btn := buttons.get(category)) is None:
+                if self.spare:
+                    cat_btn = self.spare.pop()
+                    cat_btn.text = category
+                else:
+                    cat_btn = NoteCategoryButton(text=category)
+                    cat_btn.bind(on_release=self.category_callback)
+                buttons[category] = cat_btn
+            ordered.append(cat_btn)
+
+        # Children are stored last-added first
+        current = container.children[::-1]
+        if current != ordered[: len(current)]:
+            # Reordered, re-add existing buttons in order
+            container.clear_widgets()
+            current = []
+        for cat_btn in ordered[len(current) :]:
+            container.add_widget(cat_btn)
+        if isinstance(self.parent, CategoryScreenScrollWrapper):
+            self.parent.viewport_trigger()
+
+    def update_viewport(self, low: float, high: float):
+        """Load images for buttons between window heights `low` and `high`"""
+        recycle = len(self.buttons) > self.recycle_after
+        for cat_btn in self.buttons.values():
+            _, y = cat_btn.to_window(*cat_btn.pos)
+            if y + cat_btn.height >= low and y <= high:
+                cat_btn.load_image()
+            elif recycle:
+                cat_btn.unload_image()
 
 
 class NoteCategoryButton(ButtonBehavior, BoxLayout):
-    source = StringProperty()
+    """
+    Starts as a placeholder, showing its category image only once `load_image` is called
+
+    Attributes
+    ----------
+    image_texture: ObjectProperty
+        The category image, None until loaded
+    image_name: StringProperty
+        Name of the category image in the atlas, or empty if none is loaded or requested
+    """
+
     text = StringProperty()
     image = ObjectProperty()
+    image_texture = ObjectProperty(allownone=True)
+    image_name = StringProperty()
     tx_bg_normal = ObjectProperty()
     tx_bg_down = ObjectProperty()
 
     def __init__(self, text, **kwargs):
         super().__init__(**kwargs)
-        self.source = App.get_running_app().atlas_service.uri_for(
-            text.lower(), "category_img"
-        )
         self.text = text
         self.load_texture("bg_normal")
         self.load_texture("bg_down")
 
+    def on_text(self, instance, value):
+        # Recycled for another category
+        self.unload_image()
+
+    def load_image(self):
+        if self.image_name:
+            return
+        self.image_name = name = self.text.lower()
+        textures = App.get_running_app().textures
+        textures.acquire_async(
+            name, "category_img", partial(self.handle_image, name), owner=self
+        )
+
+    def handle_image(self, name: str, texture):
+        if name == self.image_name:
+            self.image_texture = texture
+        else:
+            # Unloaded or recycled while loading
+            App.get_running_app().textures.release(name, "category_img", owner=self)
+
+    def unload_image(self):
+        if not self.image_name:
+            return
+        name, self.image_name = self.image_name, ""
+        self.image_texture = None
+        App.get_running_app().textures.release(name, "category_img", owner=self)
+
     def load_texture(self, name):
-        get_uri = App.get_running_app().atlas_service.uri_for
-        img = Image(get_uri(name.lower(), "textures"))
-        tx = img.texture
+        textures = App.get_running_app().textures
+        tx = textures.acquire(name.lower(), "textures", owner=self)
         setattr(self, f"tx_{name}", tx)
@@ -18,6 +18,7 @@ from kivy.app import App
 
 if TYPE_CHECKING:
     from domain.markdown_note import MarkdownNoteDict
+    from service.shortcuts import ShortcutStrip
 
 from utils import import_kv
 
@@ -41,12 +42,14 @@ class KeyboardLabelSeparatorInner(Label):
 
 
 class KeyboardImage(Image):
+    """A single key, given as a region of its shortcut's strip"""
+
     pressed = BooleanProperty(False)
 
     def __init__(self, **kwargs):
-        text = kwargs.pop("text")
-        src = App.get_running_app().atlas_service.uri_for(text.lower(), "keys")
-        super().__init__(source=src, **kwargs)
+        texture = kwargs.pop("texture")
+        super().__init__(**kwargs)
+        self.texture = texture
 
     def on_pressed(self, obj, value):
         if value:
@@ -56,6 +59,18 @@ class KeyboardImage(Image):
         animation_press.start(self)
 
 
+class KeyboardStrip(Image):
+    """Every key of a shortcut, drawn as one texture"""
+
+    def __init__(self, **kwargs):
+        keys = kwargs.pop("keys")
+        super().__init__(**kwargs)
+        App.get_running_app().shortcuts.strip_async(keys, self.handle_strip)
+
+    def handle_strip(self, strip: "ShortcutStrip"):
+        self.texture = strip.texture
+
+
 class KeyboardLabel(Label):
     background_color = get_color_from_hex("#eeeeee")
     FONT_COLOR = "#0e0e0e"
@@ -109,6 +124,8 @@ class ContentKeyboard(BoxLayout):
                 pass
 
     def _schedule_animations(self, *args, **kwargs):
+        if App.get_running_app().power.idle:
+            return
         animation_interval = self.ANIMATION_WINDOW / len(self.keyboard_animated_widgets)
 
         for i, btn in enumerate(self.keyboard_animated_widgets, start=1):
@@ -122,8 +139,19 @@ class ContentKeyboard(BoxLayout):
 
     def on_keyboard_buttons(self, *args, **kwargs):
         self.key_container.clear_widgets()
+        App.get_running_app().shortcuts.strip_async(
+            self.keyboard_buttons,
+            partial(self.handle_strip, list(self.keyboard_buttons)),
+        )
+
+    def handle_strip(self, keyboard_buttons: list[str], strip: "ShortcutStrip"):
+        if keyboard_buttons != self.keyboard_buttons:
+            # Changed while the strip was composed
+            return
         n_btns = len(self.keyboard_buttons)
         last_btn = n_btns - 1
+        # Keys are regions of one strip texture
+        key_textures = strip.keys
 
         # Multiple Keyboard buttons should take up 50% of horizontal Space
         # Inner spacers take 20% of 50%
@@ -137,7 +165,7 @@ class ContentKeyboard(BoxLayout):
                 KeyboardLabelSeparatorOuter(size_hint=(outer_sep_size, 1))
             )
             kb_img = KeyboardImage(
-                text=self.keyboard_buttons[0], size_hint=(self.HSPACE_SINGLE, 1)
+                texture=key_textures[0], size_hint=(self.HSPACE_SINGLE, 1)
             )
             self.keyboard_animated_widgets.append(kb_img.proxy_ref)
             self.key_container.add_widget(kb_img)
@@ -150,7 +178,7 @@ class ContentKeyboard(BoxLayout):
             inner_sep_size = (inner_size * self.HSPACE_MULTI_INNER_SEP) / (n_btns - 1)
             inner_size_img = (inner_size - inner_sep_size) / n_btns
 
-            for i, btn in enumerate(self.keyboard_buttons):
+            for i in range(n_btns):
                 if i == 0:
                     self.key_container.add_widget(
                         KeyboardLabelSeparatorOuter(size_hint=(outer_sep_size, 1))
@@ -159,7 +187,9 @@ class ContentKeyboard(BoxLayout):
                     self.key_container.add_widget(
                         KeyboardLabelSeparatorInner(size_hint=(inner_sep_size, 1))
                     )
-                kb_img = KeyboardImage(text=btn, size_hint=(inner_size_img, 1))
+                kb_img = KeyboardImage(
+                    texture=key_textures[i], size_hint=(inner_size_img, 1)
+                )
                 self.keyboard_animated_widgets.append(kb_img.proxy_ref)
                 self.key_container.add_widget(kb_img)
                 if i == last_btn:
@@ -2,6 +2,7 @@ from typing import Optional
 
 from kivy import Logger
 from kivy.properties import AliasProperty, ObjectProperty, StringProperty
+from kivy.uix.codeinput import CodeInput
 from kivy.uix.gridlayout import GridLayout
 from pygments import lexers, styles
 from pygments.formatters.bbcode import BBCodeFormatter
@@ -9,10 +10,19 @@ from pygments.lexers import PythonLexer
 from pygments.util import ClassNotFound
 
 from utils import import_kv
+from utils.tracing import trace
 
 import_kv(__file__)
 
 
+class MarkdownCodeInput(CodeInput):
+    """Read-only code view, with syntax highlighting traced"""
+
+    @trace("highlight")
+    def _get_bbcode(self, ntext):
+        return super()._get_bbcode(ntext)
+
+
 class MarkdownCode(GridLayout):
     _text_content = StringProperty()
     content = ObjectProperty()
@@ -5,9 +5,11 @@ from kivy.properties import (
     ObjectProperty,
     StringProperty,
 )
+from kivy.uix.gridlayout import GridLayout
 from kivy.uix.scrollview import ScrollView
 
 from utils import import_kv
+from utils.tracing import trace
 from widgets.markdown.markdown_visitor import MarkdownVisitor
 
 if TYPE_CHECKING:
@@ -16,6 +18,14 @@ if TYPE_CHECKING:
 import_kv(__file__)
 
 
+class MarkdownContent(GridLayout):
+    """Top level container for a document's blocks"""
+
+    @trace("layout")
+    def do_layout(self, *largs):
+        super().do_layout(*largs)
+
+
 class MarkdownDocument(ScrollView, MarkdownVisitor):
     text = StringProperty()
     title = StringProperty()
@@ -34,6 +44,7 @@ class MarkdownDocument(ScrollView, MarkdownVisitor):
         self.do_scroll_x = False
         self.do_scroll_y = True
 
+    @trace("visitor_build")
     def on_document(self, instance, value: "MarkdownNoteDict"):
         self.content.clear_widgets()
         for child in self.document:
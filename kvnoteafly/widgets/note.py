@@ -2,11 +2,12 @@ from copy import deepcopy
 from typing import TYPE_CHECKING
 
 from kivy import Logger
+from kivy.app import App
 from kivy.cache import Cache
 from kivy.properties import ObjectProperty, StringProperty
 from kivy.uix.boxlayout import BoxLayout
 
-from utils import import_kv, sch_cb
+from utils import import_kv
 from utils.caching import cache_key_note, kivy_cache
 
 import_kv(__file__)
@@ -43,13 +44,17 @@ class Note(BoxLayout):
         set_title = lambda x: self.note_title.set({"title": title})
         data = deepcopy(note_data)
         set_content = lambda x: self.note_content.set(data)
-        sch_cb(0, set_title, set_content)
+        App.get_running_app().scheduler.schedule(
+            set_title, set_content, name="set_note_content"
+        )
 
     def clear_note_content(self):
         clear_title = lambda x: self.note_title.set({"title": ""})
         self.note_title.set({"title": ""})
         clear_content = lambda x: self.note_content.clear()
-        sch_cb(0, clear_title, clear_content)
+        App.get_running_app().scheduler.schedule(
+            clear_title, clear_content, name="clear_note_content"
+        )
 
 
 class NoteContent(BoxLayout):
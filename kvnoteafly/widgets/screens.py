@@ -26,13 +26,15 @@ from kivy.uix.screenmanager import (
 from toolz import sliding_window
 
 from domain.events import CancelEditEvent, RefreshNotesEvent, SaveNoteEvent
-from utils import DottedDict, import_kv, sch_cb
+from utils import DottedDict, import_kv
+from utils.scheduler import PRIORITY_HIGH
+from utils.tracing import trace
 from utils.triggers import trigger_factory
-from widgets.app_menu import AppMenu
 from widgets.behavior.interact_behavior import InteractBehavior
 from widgets.effects.scrolling import RefreshSymbol
 
 TR_OPTS = Literal["None", "Slide", "Rise-In", "Card", "Fade", "Swap", "Wipe"]
+LAZY_SCREEN_NAMES = Literal["list_view_screen", "note_edit_screen"]
 
 if TYPE_CHECKING:
     from widgets.categories import NoteCategoryButton
@@ -86,6 +88,8 @@ class NoteAppScreenManager(InteractBehavior, ScreenManager):
 
         Logger.debug(f"Menu Open {menu_open}")
         if menu_open:
+            from widgets.app_menu import AppMenu
+
             view = AppMenu()
             self.menu = view
             temp_pause = self.play_state == "play"
@@ -115,6 +119,20 @@ class NoteAppScreenManager(InteractBehavior, ScreenManager):
     def category_selected(self, category: "NoteCategoryButton"):
         self.app.note_category = category.text
 
+    def ensure_screen(self, name: LAZY_SCREEN_NAMES) -> Screen:
+        """Get a screen that is only created on first use"""
+        if self.has_screen(name):
+            return self.get_screen(name)
+        Logger.debug(f"ScreenManager: Creating {name}")
+        screen_cls = {
+            "list_view_screen": NoteListViewScreen,
+            "note_edit_screen": NoteEditScreen,
+        }[name]
+        screen = screen_cls(name=name)
+        self.add_widget(screen)
+        self.screen_triggers = trigger_factory(self, "current", self.screen_names)
+        return screen
+
     def handle_screen_transitions(self, instance, value: TR_OPTS):
         if value == "None":
             self.n_screens = 1
@@ -165,6 +183,7 @@ class NoteAppScreenManager(InteractBehavior, ScreenManager):
     def handle_app_play_state(self, instance, value):
         self.play_state = value
 
+    @trace("handle_notes")
     def handle_notes(self, *args, **kwargs):
         if not self.note_screen_cycler:
             self.handle_n_screens(self, self.n_screens)
@@ -189,21 +208,29 @@ class NoteAppScreenManager(InteractBehavior, ScreenManager):
         # Clear note data from last screen
         clear_data = lambda dt: current_screen.set_note_content(None)
 
-        sch_cb(0, set_data, update_current_screen, clear_data)
+        self.app.scheduler.schedule(
+            set_data,
+            update_current_screen,
+            clear_data,
+            priority=PRIORITY_HIGH,
+            name="render_note",
+        )
 
     def handle_notes_list_view(self, *args, **kwargs):
-        self.ids["list_view_screen"].set_note_list_view()
+        self.ensure_screen("list_view_screen").set_note_list_view()
         self.current = "list_view_screen"
 
     def handle_notes_edit_view(self, *args, **kwargs):
         Logger.debug("Switching to edit view")
+        self.ensure_screen("note_edit_screen")
         update_screen = lambda x: setattr(self, "current", "note_edit_screen")
-        sch_cb(0, update_screen)
+        self.app.scheduler.schedule(update_screen, priority=PRIORITY_HIGH)
 
     def handle_notes_add_view(self, *args, **kwargs):
         Logger.debug("Switching to add view")
+        self.ensure_screen("note_edit_screen")
         update_screen = lambda x: setattr(self, "current", "note_edit_screen")
-        sch_cb(0, update_screen)
+        self.app.scheduler.schedule(update_screen, priority=PRIORITY_HIGH)
 
 
 class NoteCategoryChooserScreen(InteractScreen):
@@ -220,6 +247,11 @@ class NoteCategoryChooserScreen(InteractScreen):
     def category_selected(self, category_btn: "NoteCategoryButton"):
         self.manager.category_selected(category_btn)
 
+    def on_enter(self, *args):
+        # Images are only loaded while the chooser is on screen
+        if self.chooser:
+            self.chooser.viewport_trigger()
+
     def handle_refresh_icon(self, dt):
         """
         Child can notify us to display refresh icon but we want to handle it's clearing
@@ -293,6 +325,9 @@ class NoteEditScreen(InteractScreen):
         app = App.get_running_app()
         app.bind(editor_note=self.handle_app_editor_note)
         app.bind(display_state=self.handle_app_display_state)
+        # Created on first use, so catch up with the app
+        self.handle_app_display_state(app, app.display_state)
+        self.handle_app_editor_note(app, app.editor_note)
 
     def handle_app_display_state(self, instance, value):
         if value in {"add", "edit"}:
@@ -319,10 +354,10 @@ class NoteEditScreen(InteractScreen):
         Logger.debug("Cancel Edit")
 
         app = App.get_running_app()
-        app.registry.push_event(CancelEditEvent)
+        app.registry.push_event(CancelEditEvent())
         clear_self_text = lambda x: setattr(self, "init_text", "")
 
-        sch_cb(0, clear_self_text)
+        app.scheduler.schedule(clear_self_text)
 
     def handle_save(self, *args, **kwargs):
         app = App.get_running_app()
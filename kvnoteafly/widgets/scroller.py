@@ -11,7 +11,7 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.gridlayout import GridLayout
 from kivy.uix.scrollview import ScrollView
 
-from widgets.keyboard import KeyboardImage
+from widgets.keyboard import KeyboardStrip
 from utils import import_kv
 
 if TYPE_CHECKING:
@@ -61,9 +61,7 @@ class ListItemKeyboardContainer(BoxLayout):
         super().__init__(**kwargs)
 
     def set(self, btns: list[str]):
-        for btn in btns:
-            kbd_widget = KeyboardImage(text=btn, size_hint_x=1)
-            self.add_widget(kbd_widget)
+        self.add_widget(KeyboardStrip(keys=btns))
 
 
 class ListView(GridLayout):
@@ -0,0 +1,290 @@
+"""
+Headless render benchmark for note widgets
+
+Starts NoteAFly against a synthetic library (see tests/benchmarks/corpus.py), then builds the widget for a sample of
+notes and the list view for each category. Reported per note type:
+
+- construction time, from creating the widget until it is attached
+- widget count of the resulting tree
+- layout passes run while it settles
+- peak Python memory allocated while building it, from a separate pass under tracemalloc
+
+Usage
+-----
+    python scripts/render_benchmark.py --categories 4 --notes 25 --json render.json
+
+Runs with an offscreen SDL window and the mock GL backend unless SDL_VIDEODRIVER / KIVY_GL_BACKEND are already set,
+so no display is needed.
+"""
+import argparse
+import gc
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import tracemalloc
+from collections import defaultdict
+from functools import wraps
+from pathlib import Path
+from time import perf_counter_ns
+
+ROOT = Path(__file__).resolve().parents[1]
+APP_DIR = ROOT / "kvnoteafly"
+sys.path[:0] = [str(APP_DIR), str(ROOT / "tests" / "benchmarks")]
+
+
+def headless_environ():
+    os.environ.setdefault("SDL_VIDEODRIVER", "offscreen")
+    os.environ.setdefault("KIVY_GL_BACKEND", "mock")
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+
+
+def note_type(note: dict) -> str:
+    """Classify by the most expensive block the note contains"""
+    if note["has_shortcut"]:
+        return "shortcut"
+    kinds = {node["type"] for node in note["document"]}
+    for kind, label in (("table", "table"), ("block_code", "code"), ("list", "list")):
+        if kind in kinds:
+            return label
+    return "text"
+
+
+def count_widgets(widget) -> int:
+    return 1 + sum(count_widgets(child) for child in widget.children)
+
+
+class LayoutCounter:
+    """Counts `do_layout` calls on Kivy's layouts while installed"""
+
+    def __init__(self):
+        from kivy.uix.anchorlayout import AnchorLayout
+        from kivy.uix.boxlayout import BoxLayout
+        from kivy.uix.floatlayout import FloatLayout
+        from kivy.uix.gridlayout import GridLayout
+        from kivy.uix.relativelayout import RelativeLayout
+        from kivy.uix.stacklayout import StackLayout
+
+        self.classes = (
+            AnchorLayout,
+            BoxLayout,
+            FloatLayout,
+            GridLayout,
+            RelativeLayout,
+            StackLayout,
+        )
+        self.count = 0
+        self._originals = {}
+
+    def install(self):
+        for cls in self.classes:
+            original = self._originals[cls] = cls.__dict__["do_layout"]
+
+            # Keeps the name, layout triggers look the method up again by it
+            @wraps(original)
+            def counted(widget, *args, _original=original):
+                self.count += 1
+                return _original(widget, *args)
+
+            cls.do_layout = counted
+
+    def uninstall(self):
+        for cls, original in self._originals.items():
+            cls.do_layout = original
+        self._originals.clear()
+
+
+class RenderBenchmark:
+    """
+    Steps through the sample one frame at a time, so layout triggers run as they would in the app
+
+    Parameters
+    ----------
+    notes: list[dict]
+        `MarkdownNoteDict`s to build
+    categories: dict[str, list[dict]]
+        Category metas for `ListView.set`
+    repeat: int
+        Timed builds per note
+    settle_frames: int
+        Frames to wait after attaching a widget before measuring it
+    """
+
+    def __init__(self, notes, categories, repeat: int = 3, settle_frames: int = 2):
+        self.notes = notes
+        self.categories = categories
+        self.repeat = repeat
+        self.settle_frames = settle_frames
+        self.samples = defaultdict(lambda: defaultdict(list))
+        self.layouts = LayoutCounter()
+        self.host = None
+
+    def build_note(self, note: dict):
+        from widgets.keyboard import ContentKeyboard
+        from widgets.markdown.markdown_document import MarkdownDocument
+
+        if note["has_shortcut"]:
+            return ContentKeyboard(content_data=note)
+        return MarkdownDocument(content_data=note)
+
+    def build_list(self, metas: list[dict]):
+        from widgets.scroller import ScrollingListView
+
+        view = ScrollingListView()
+        view.set(metas)
+        return view
+
+    def jobs(self):
+        for note in self.notes:
+            yield note_type(note), lambda note=note: self.build_note(note)
+        for metas in self.categories.values():
+            yield "list_view", lambda metas=metas: self.build_list(metas)
+
+    def run(self):
+        """Generator, advanced once per frame"""
+        from kivy.core.window import Window
+        from kivy.uix.boxlayout import BoxLayout
+
+        self.host = BoxLayout(size=Window.size)
+        Window.add_widget(self.host)
+        yield
+
+        self.layouts.install()
+        try:
+            for _ in range(self.repeat):
+                for kind, build in self.jobs():
+                    gc.collect()
+                    self.layouts.count = 0
+                    start = perf_counter_ns()
+                    widget = build()
+                    self.host.add_widget(widget)
+                    built_ns = perf_counter_ns() - start
+                    for _ in range(self.settle_frames):
+                        yield
+                    sample = self.samples[kind]
+                    sample["construct_ms"].append(built_ns / 1e6)
+                    sample["layout_passes"].append(self.layouts.count)
+                    sample["widgets"].append(count_widgets(widget))
+                    self.host.remove_widget(widget)
+        finally:
+            self.layouts.uninstall()
+
+        tracemalloc.start()
+        try:
+            for kind, build in self.jobs():
+                gc.collect()
+                tracemalloc.reset_peak()
+                baseline, _ = tracemalloc.get_traced_memory()
+                widget = build()
+                self.host.add_widget(widget)
+                for _ in range(self.settle_frames):
+                    yield
+                _, peak = tracemalloc.get_traced_memory()
+                self.samples[kind]["peak_kib"].append((peak - baseline) / 1024)
+                self.host.remove_widget(widget)
+        finally:
+            tracemalloc.stop()
+        Window.remove_widget(self.host)
+
+    def report(self) -> dict[str, dict[str, float]]:
+        results = {}
+        for kind, sample in sorted(self.samples.items()):
+            results[kind] = {
+                "notes": len(sample["peak_kib"]),
+                "construct_ms_median": statistics.median(sample["construct_ms"]),
+                "construct_ms_max": max(sample["construct_ms"]),
+                "widgets_mean": statistics.mean(sample["widgets"]),
+                "layout_passes_mean": statistics.mean(sample["layout_passes"]),
+                "peak_kib_max": max(sample["peak_kib"]),
+            }
+        return results
+
+
+def load_sample(library: Path, per_category: int):
+    from adapters.notes.fs.fs_note_repository import FileSystemNoteRepository
+
+    repo = FileSystemNoteRepository(new_first=True)
+    repo.storage_path = library
+    repo.discover_notes()
+    notes, categories = [], {}
+    for category in repo.categories:
+        repo.current_category = category
+        metas = repo.category_meta
+        categories[category] = metas
+        notes.extend(metas[:per_category])
+    return notes, categories
+
+
+def print_table(results: dict[str, dict[str, float]]):
+    columns = list(next(iter(results.values())).keys())
+    print(f"{'type':<10}" + "".join(f"{c:>22}" for c in columns))
+    for kind, row in results.items():
+        print(f"{kind:<10}" + "".join(f"{row[c]:>22.2f}" for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--categories", type=int, default=4)
+    parser.add_argument("--notes", type=int, default=25, help="Notes per category")
+    parser.add_argument(
+        "--sample", type=int, default=10, help="Notes built per category"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", help="Also write results here")
+    args = parser.parse_args()
+
+    headless_environ()
+    with tempfile.TemporaryDirectory() as tmp:
+        from corpus import CorpusGenerator
+
+        library = CorpusGenerator(seed=args.seed).write(
+            Path(tmp) / "notes", args.categories, args.notes
+        )
+        os.environ["NOTES_PATH"] = str(library)
+        os.chdir(APP_DIR)
+
+        from kivy.clock import Clock
+        from kivy.core.text import LabelBase
+        from noteafly import NoteAFly
+
+        # As main.py does
+        LabelBase.register(
+            name="RobotoMono",
+            fn_regular=str(APP_DIR / "assets" / "RobotoMono-Regular.ttf"),
+        )
+
+        app = NoteAFly()
+        # Keep the benchmark's settings out of the app directory
+        config_path = str(Path(tmp) / "noteafly.ini")
+        app.get_application_config = lambda *args: config_path
+        # The app creates missing atlases, write those to a copy
+        static = shutil.copytree(APP_DIR / "static", Path(tmp) / "static")
+        app.atlas_service.storage_path = static
+        notes, categories = load_sample(library, args.sample)
+        bench = RenderBenchmark(notes, categories, repeat=args.repeat)
+        steps = bench.run()
+
+        def advance(dt):
+            try:
+                next(steps)
+            except StopIteration:
+                app.stop()
+                return
+            Clock.schedule_once(advance, 0)
+
+        # Start once startup work has drained
+        Clock.schedule_once(advance, 1)
+        app.run()
+
+    results = bench.report()
+    print_table(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Measure NoteAFly startup: module import cost and time to the first painted frame
+
+Usage
+-----
+    python scripts/startup_benchmark.py --notes /path/to/notes --runs 5
+
+Each run is a fresh interpreter. Set SDL_VIDEODRIVER=offscreen (and KIVY_GL_BACKEND=mock) to run without a display.
+
+With --raw-pages, first frame times are also measured against a copy of the app whose atlas pages have raw
+sidecars (see `adapters.atlas.fs.raw`), and --lz4 compresses them.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1] / "kvnoteafly"
+
+FIRST_FRAME_SCRIPT = """
+import os, time
+from kivy.core.window import Window
+from kivy.clock import Clock
+from kivy.core.text import LabelBase
+import noteafly
+
+LabelBase.register(name="RobotoMono", fn_regular=os.path.join("assets", "RobotoMono-Regular.ttf"))
+
+def on_flip(*args):
+    Window.unbind(on_flip=on_flip)
+    print("FIRST_FRAME", time.time(), flush=True)
+    Clock.schedule_once(lambda dt: noteafly.NoteAFly.get_running_app().stop(), 0)
+
+Window.bind(on_flip=on_flip)
+app = noteafly.NoteAFly()
+app.get_application_config = lambda *args: os.path.join(os.environ["HOME"], "noteafly.ini")
+app.run()
+"""
+
+
+def child_env(notes: str, home: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("KIVY_NO_ARGS", "1")
+    env.setdefault("KIVY_NO_CONSOLELOG", "1")
+    env["NOTES_PATH"] = notes
+    # Keep Kivy's config and logs out of the user's home
+    env["HOME"] = home
+    env["KIVY_HOME"] = str(Path(home) / ".kivy")
+    return env
+
+
+def import_times(env: dict[str, str], top: int) -> dict:
+    """Parse `python -X importtime -c "import noteafly"`"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import noteafly"],
+        cwd=APP_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # import time:  self [us] | cumulative | imported package
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    total = next((c for n, _, c in rows if n == "noteafly"), 0)
+    heaviest = sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+    return {
+        "noteafly_cumulative_ms": total / 1000,
+        "heaviest_self_ms": {n: s / 1000 for n, s, _ in heaviest},
+    }
+
+
+def first_frame(env: dict[str, str], timeout: float, app_dir: Path = APP_DIR) -> float:
+    """Seconds from launching the interpreter to the first flipped frame"""
+    launched = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-c", FIRST_FRAME_SCRIPT],
+        cwd=app_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    for line in proc.stdout.splitlines():
+        if line.startswith("FIRST_FRAME"):
+            return float(line.split()[1]) - launched
+    raise RuntimeError(f"No frame was drawn\n{proc.stderr[-2000:]}")
+
+
+def raw_page_app(env: dict[str, str], root: str, lz4: bool) -> Path:
+    """Copy of the app with raw sidecars written for its atlas pages"""
+    app_dir = Path(root) / "kvnoteafly"
+    shutil.copytree(
+        APP_DIR, app_dir, ignore=shutil.ignore_patterns("__pycache__", "*.rgba")
+    )
+    cmd = [sys.executable, "-m", "adapters.atlas.fs.raw", "static"]
+    subprocess.run(cmd + ["--lz4"] * lz4, cwd=app_dir, env=env, check=True)
+    return app_dir
+
+
+def frame_stats(frames: list[float]) -> dict:
+    return {"runs": frames, "median": statistics.median(frames), "min": min(frames)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--notes", default=os.environ.get("NOTES_PATH"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--json", dest="json_path", help="Also write results here")
+    parser.add_argument("--raw-pages", action="store_true")
+    parser.add_argument("--lz4", action="store_true")
+    args = parser.parse_args()
+    if not args.notes:
+        parser.error("--notes or NOTES_PATH is required")
+
+    with tempfile.TemporaryDirectory() as home:
+        env = child_env(args.notes, home)
+        imports = import_times(env, args.top)
+        frames = [first_frame(env, args.timeout) for _ in range(args.runs)]
+        results = {"imports": imports, "first_frame_s": frame_stats(frames)}
+        if args.raw_pages:
+            with tempfile.TemporaryDirectory() as root:
+                app_dir = raw_page_app(env, root, args.lz4)
+                raw_frames = [
+                    first_frame(env, args.timeout, app_dir) for _ in range(args.runs)
+                ]
+            results["first_frame_raw_pages_s"] = frame_stats(raw_frames)
+
+    print(json.dumps(results, indent=2))
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmarks for the note pipeline, run with pytest-benchmark
+
+These are marked `benchmarks` and left out of a plain run. pytest.ini compares them against the baseline in
+benchmarks/baselines and fails the run when any is 50% slower (by its fastest round) than recorded::
+
+    pytest -m benchmarks benchmarks
+
+Baselines are specific to the machine they were recorded on, and are looked up by its platform and Python
+version. Where none matches, record one with the comparison turned off::
+
+    pytest -o addopts="" -m benchmarks benchmarks --benchmark-storage=benchmarks/baselines \
+        --benchmark-save=baseline
+"""
+from pathlib import Path
+
+import pytest
+
+from corpus import CORPUS_SIZES, CorpusGenerator
+
+
+@pytest.fixture(scope="session")
+def corpus(tmp_path_factory):
+    """Library root for a size in `CORPUS_SIZES`"""
+    built = {}
+
+    def _corpus(size: str) -> Path:
+        if size not in built:
+            root = tmp_path_factory.mktemp(f"corpus_{size}")
+            built[size] = CorpusGenerator(seed=0).write(root, *CORPUS_SIZES[size])
+        return built[size]
+
+    return _corpus
+
+
+@pytest.fixture
+def note_repository(corpus):
+    from adapters.notes.fs.fs_note_repository import FileSystemNoteRepository
+
+    repo = FileSystemNoteRepository(new_first=True)
+    repo.storage_path = corpus("small")
+    repo.discover_notes()
+    return repo
@@ -0,0 +1,127 @@
+"""
+Deterministic generator for synthetic note libraries
+
+The same `seed` and sizes always produce byte-identical files, so timings are comparable across runs.
+"""
+import os
+import random
+from pathlib import Path
+
+WORDS = (
+    "array buffer cache commit config context cursor decorator dict event file frame function generator "
+    "index iterator kernel layout merge module object offset parser pointer process queue render request "
+    "screen shell socket stack stream string task texture thread token value widget window"
+).split()
+
+LANGUAGES = ("python", "bash", "javascript", "sql", "")
+
+# (categories, notes per category)
+CORPUS_SIZES = {"small": (4, 25), "large": (16, 100)}
+
+KEYS = (
+    "Ctrl",
+    "Shift",
+    "Alt",
+    "Tab",
+    "Enter",
+    "Esc",
+    "F5",
+    "Delete",
+    "A",
+    "C",
+    "V",
+    "Z",
+)
+
+
+class CorpusGenerator:
+    """
+    Builds `n_categories` folders of `n_notes` markdown notes each
+
+    Each note has a title and a mix of sections drawn from headings, paragraphs with inline markup, lists,
+    tables and code blocks. Only markup the markdown widgets render is used. `shortcut_ratio` of the notes are shortcut notes.
+    """
+
+    def __init__(self, seed: int = 0, shortcut_ratio: float = 0.25):
+        self.seed = seed
+        self.shortcut_ratio = shortcut_ratio
+
+    def words(self, rng: random.Random, lo: int, hi: int) -> str:
+        return " ".join(rng.choices(WORDS, k=rng.randint(lo, hi)))
+
+    def paragraph(self, rng: random.Random) -> str:
+        sentences = []
+        for _ in range(rng.randint(1, 4)):
+            sentence = self.words(rng, 6, 16).capitalize()
+            roll = rng.random()
+            if roll < 0.3:
+                sentence += f" `{rng.choice(WORDS)}()`"
+            elif roll < 0.5:
+                sentence += f" **{rng.choice(WORDS)}**"
+            elif roll < 0.6:
+                sentence += f" *{rng.choice(WORDS)}*"
+            sentences.append(sentence + ".")
+        return " ".join(sentences)
+
+    def bullet_list(self, rng: random.Random) -> str:
+        ordered = rng.random() < 0.3
+        items = (self.words(rng, 2, 8) for _ in range(rng.randint(2, 6)))
+        return "\n".join(
+            f"{i + 1}. {item}" if ordered else f"- {item}"
+            for i, item in enumerate(items)
+        )
+
+    def table(self, rng: random.Random) -> str:
+        cols = rng.randint(2, 4)
+        header = [rng.choice(WORDS).title() for _ in range(cols)]
+        rows = [
+            "| " + " | ".join(header) + " |",
+            "|" + "---|" * cols,
+        ]
+        for _ in range(rng.randint(2, 8)):
+            rows.append(
+                "| " + " | ".join(self.words(rng, 1, 3) for _ in range(cols)) + " |"
+            )
+        return "\n".join(rows)
+
+    def code(self, rng: random.Random) -> str:
+        lines = []
+        indent = 0
+        for _ in range(rng.randint(3, 20)):
+            name, arg = rng.sample(WORDS, 2)
+            lines.append("    " * indent + f"{name} = {arg}({rng.randint(0, 99)})")
+            if rng.random() < 0.2:
+                lines.append("    " * indent + f"def {name}_{arg}(self):")
+                indent = min(indent + 1, 3)
+        return f"```{rng.choice(LANGUAGES)}\n" + "\n".join(lines) + "\n```"
+
+    def shortcut(self, rng: random.Random) -> str:
+        keys = rng.sample(KEYS, rng.randint(1, 3))
+        return "```shortcut\n" + ",".join(keys) + "\n```"
+
+    def note(self, rng: random.Random, title: str) -> str:
+        sections = [f"# {title}"]
+        if rng.random() < self.shortcut_ratio:
+            sections += [self.paragraph(rng), self.shortcut(rng)]
+            return "\n\n".join(sections) + "\n"
+        blocks = (self.paragraph, self.bullet_list, self.table, self.code)
+        for _ in range(rng.randint(1, 4)):
+            sections.append(f"## {self.words(rng, 1, 4).title()}")
+            for block in rng.choices(blocks, weights=(4, 2, 1, 2), k=rng.randint(1, 3)):
+                sections.append(block(rng))
+        return "\n\n".join(sections) + "\n"
+
+    def write(self, root: Path, n_categories: int, n_notes: int) -> Path:
+        """Write the library under `root`, returning `root`"""
+        rng = random.Random(self.seed)
+        root.mkdir(parents=True, exist_ok=True)
+        for c in range(n_categories):
+            category = root / f"Category {c:03d}"
+            category.mkdir(exist_ok=True)
+            for n in range(n_notes):
+                title = f"{self.words(rng, 1, 3).title()} {n}"
+                note_path = category / f"note_{n:04d}.md"
+                note_path.write_text(self.note(rng, title), encoding="utf-8")
+                # Stable modified times, notes are ordered by them
+                os.utime(note_path, ns=(n * 1_000_000_000, n * 1_000_000_000))
+        return root
@@ -0,0 +1,72 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+pytestmark = pytest.mark.benchmarks
+
+from adapters.notes.fs.fs_note_repository import FileSystemNoteRepository
+from adapters.notes.note_repository import NoteIndex
+from domain.markdown_note import MarkdownNote
+
+from corpus import CORPUS_SIZES
+
+
+@pytest.mark.parametrize("size", ["small", "large"])
+def test_discover_notes(benchmark, corpus, size):
+    repo = FileSystemNoteRepository(new_first=True)
+    repo.storage_path = corpus(size)
+    discovery = benchmark(repo.discover_notes)
+    n_categories, n_notes = CORPUS_SIZES[size]
+    assert len(discovery) == n_categories
+    assert sum(len(d["notes"]) for d in discovery) == n_categories * n_notes
+
+
+def test_from_file(benchmark, note_repository):
+    category = note_repository.categories[0]
+    files = note_repository._category_files[category]
+
+    def load_category():
+        return [
+            MarkdownNote.from_file(category=category, idx=i, fp=f)
+            for i, f in enumerate(files)
+        ]
+
+    notes = benchmark(load_category)
+    assert len(notes) == len(files)
+
+
+def test_category_meta(benchmark, note_repository):
+    note_repository.current_category = note_repository.categories[0]
+    metas = benchmark(lambda: note_repository.category_meta)
+    assert all(m["category"] == note_repository.current_category for m in metas)
+
+
+def test_index_pagination(benchmark):
+    index = NoteIndex(size=1000)
+
+    def page_through():
+        for _ in range(1000):
+            index.next()
+        for _ in range(1000):
+            index.previous()
+
+    benchmark(page_through)
+    assert index.current == 0
+
+
+def test_paginate_notes(benchmark, note_repository):
+    """Next note, as shown by the app: read, parse and convert"""
+    note_repository.current_category = note_repository.categories[0]
+    note = benchmark(lambda: note_repository.next_note().to_dict())
+    assert note["title"]
+
+
+def test_to_dict(benchmark, note_repository):
+    category = note_repository.categories[0]
+    notes = [
+        note_repository.get_note(category, i)
+        for i in range(len(note_repository._category_files[category]))
+    ]
+
+    dicts = benchmark(lambda: [n.to_dict() for n in notes])
+    assert len(dicts) == len(notes)
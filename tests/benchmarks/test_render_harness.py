@@ -0,0 +1,33 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+HARNESS = Path(__file__).resolve().parents[2] / "scripts" / "render_benchmark.py"
+
+
+def test_render_harness_headless(tmp_path):
+    """
+    Given a small corpus and no display
+    Check that the render harness reports every measurement for each note type it built
+    """
+    out = tmp_path / "render.json"
+    subprocess.run(
+        [
+            sys.executable,
+            str(HARNESS),
+            "--categories=1",
+            "--notes=8",
+            "--sample=8",
+            "--repeat=1",
+            f"--json={out}",
+        ],
+        check=True,
+        timeout=300,
+    )
+    results = json.loads(out.read_text())
+    assert "list_view" in results
+    for row in results.values():
+        assert row["widgets_mean"] >= 1
+        assert row["construct_ms_median"] > 0
+        assert row["peak_kib_max"] > 0
@@ -15,6 +15,16 @@ def storage_directory():
     temp_dir.cleanup()
 
 
+@pytest.fixture()
+def window():
+    """Kivy's window, which textures need"""
+    from kivy.core.window import Window
+
+    if Window is None:
+        pytest.skip("No window to create textures with")
+    return Window
+
+
 @pytest.fixture()
 def img_maker():
     def _img_maker(width, height):
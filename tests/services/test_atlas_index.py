@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from adapters.atlas.fs.fs_atlas_repository import AtlasService
+from adapters.atlas.fs.index import AtlasIndex
+
+
+@pytest.fixture
+def atlas_file(tmp_path):
+    path = tmp_path / "icons.atlas"
+    path.write_text(json.dumps({"icons-0.png": {"add": [0, 0, 8, 8]}}))
+    return path
+
+
+@pytest.mark.atlas
+def test_lookup(atlas_file):
+    index = AtlasIndex(atlas_file)
+    assert "add" in index
+    entry = index.get("add")
+    assert entry.page == "icons-0.png"
+    assert entry.rect == (0, 0, 8, 8)
+    assert index.get("missing") is None
+
+
+@pytest.mark.atlas
+def test_reads_file_once(atlas_file, monkeypatch):
+    index = AtlasIndex(atlas_file)
+    assert index.refresh()
+    assert not index.refresh()
+    assert "add" in index and len(index) == 1
+    assert not index.refresh()
+
+
+@pytest.mark.atlas
+def test_reloads_on_external_change(atlas_file):
+    index = AtlasIndex(atlas_file)
+    assert "add" in index
+    atlas_file.write_text(
+        json.dumps({"icons-0.png": {"add": [0, 0, 8, 8], "back": [8, 0, 8, 8]}})
+    )
+    assert index.get("back").rect == (8, 0, 8, 8)
+
+
+@pytest.mark.atlas
+def test_store_updates_index(atlas_file):
+    index = AtlasIndex(atlas_file)
+    data = index.data()
+    data["icons-1.png"] = {"edit": [0, 0, 4, 4]}
+    assert "edit" not in index
+    index.store(data)
+    assert index.get("edit").page == "icons-1.png"
+    assert json.loads(atlas_file.read_text()) == data
+    assert not index.refresh()
+
+
+@pytest.mark.atlas
+def test_service_membership(stored_atlas):
+    atlas_folder, image_names = stored_atlas("test_atlas", "multi", 5)
+    service = AtlasService(storage_path=atlas_folder.parent)
+    for img in image_names:
+        assert f"test_atlas.{img}" in service
+        assert service.get_from_atlas(img, "test_atlas").size == (10, 10)
+    assert "test_atlas.not_there" not in service
+    with pytest.raises(KeyError):
+        service.get_from_atlas("not_there", "test_atlas")
@@ -0,0 +1,121 @@
+import json
+import random
+
+import pytest
+
+from adapters.atlas.fs.fs_atlas_repository import AtlasService
+from adapters.atlas.fs.packing import MaxRectsBin, Rect, page_size_for
+
+
+@pytest.mark.atlas
+def test_packed_rects_are_disjoint_and_in_bounds():
+    rng = random.Random(7)
+    page = MaxRectsBin(256, 256, padding=2)
+    placed = []
+    for _ in range(200):
+        rect = page.insert(rng.randint(4, 40), rng.randint(4, 40))
+        if rect is not None:
+            placed.append(Rect(*rect))
+    assert len(placed) > 20
+    for i, a in enumerate(placed):
+        assert a.x >= 0 and a.y >= 0 and a.right <= 256 and a.top <= 256
+        assert not any(a.intersects(b) for b in placed[i + 1 :])
+    assert page.utilization == sum(r.area for r in placed) / 256**2
+
+
+@pytest.mark.atlas
+def test_page_size_for():
+    assert page_size_for([(10, 10)]) == 64
+    assert page_size_for([(300, 20)]) >= 302
+    assert page_size_for([(1000, 1000)] * 16) == 2048
+
+
+@pytest.fixture
+def image_files(tmp_path, img_maker):
+    def _image_files(names, size):
+        folder = tmp_path / "images"
+        folder.mkdir(exist_ok=True)
+        paths = []
+        for name in names:
+            path = folder / f"{name}.png"
+            img_maker(*size).save(path)
+            paths.append(path)
+        return paths
+
+    return _image_files
+
+
+@pytest.mark.atlas
+def test_append_fills_existing_page(stored_atlas, image_files):
+    """
+    Given a mono atlas with free space
+    Check that new images are placed in the existing page and old members are untouched
+    """
+    atlas_folder, image_names = stored_atlas("test_atlas", "mono", 5)
+    atlas_file = atlas_folder / "test_atlas.atlas"
+    before = json.loads(atlas_file.read_text())
+    service = AtlasService(storage_path=atlas_folder.parent)
+    old_imgs = {
+        name: service.get_from_atlas(name, "test_atlas").tobytes()
+        for name in image_names
+    }
+
+    names = ["alpha", "beta"]
+    service.save_to_atlas(image_files(names, (8, 8)), names, atlas_name="test_atlas")
+
+    after = json.loads(atlas_file.read_text())
+    assert list(after) == list(before)
+    (page,) = after
+    assert all(after[page][k] == v for k, v in before[page].items())
+    for name in names:
+        assert service.get_from_atlas(name, "test_atlas").size == (8, 8)
+    for name, data in old_imgs.items():
+        assert service.get_from_atlas(name, "test_atlas").tobytes() == data
+    assert service.page_utilization("test_atlas")[page] > 0
+
+
+@pytest.mark.atlas
+def test_compaction_reduces_pages(stored_atlas, image_files):
+    """
+    Given an atlas spread over one page per image
+    Check that compaction packs it into one page and keeps every member
+    """
+    atlas_folder, image_names = stored_atlas("test_atlas", "multi", 5)
+    service = AtlasService(storage_path=atlas_folder.parent, compact_threshold=0.9)
+    assert len(service.page_utilization("test_atlas")) == 5
+    old_imgs = {
+        name: service.get_from_atlas(name, "test_atlas").tobytes()
+        for name in image_names
+    }
+
+    service.save_to_atlas(
+        image_files(["gamma"], (10, 10)), ["gamma"], atlas_name="test_atlas"
+    )
+
+    utilization = service.page_utilization("test_atlas")
+    assert len(utilization) == 1
+    assert len(list(atlas_folder.glob("*.png"))) == 1
+    for name, data in old_imgs.items():
+        assert service.get_from_atlas(name, "test_atlas").tobytes() == data
+    assert service.get_from_atlas("gamma", "test_atlas").size == (10, 10)
+
+
+@pytest.mark.atlas
+def test_rewritten_page_is_reloaded(stored_atlas, window, tmp_path):
+    """
+    Given a page that Kivy has loaded
+    Check that after the page is rewritten, Kivy loads regions from the new page
+    """
+    from kivy.core.image import Image as CoreImage
+    from PIL import Image
+
+    atlas_folder, image_names = stored_atlas("test_atlas", "mono", 2)
+    service = AtlasService(storage_path=atlas_folder.parent)
+    assert CoreImage(service.uri_for(image_names[0], "test_atlas")).texture
+
+    red = tmp_path / "red.png"
+    Image.new("RGBA", (10, 10), (255, 0, 0, 255)).save(red)
+    service.save_to_atlas([red], ["red"], atlas_name="test_atlas")
+
+    texture = CoreImage(service.uri_for("red", "test_atlas")).texture
+    assert texture.pixels == bytes((255, 0, 0, 255)) * 100
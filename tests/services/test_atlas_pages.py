@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from adapters.atlas.fs.fs_atlas_repository import AtlasService
+from adapters.atlas.fs.pages import PageCache
+
+
+@pytest.fixture
+def page_files(tmp_path, img_maker):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"page-{i}.png"
+        img_maker(16, 16).save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.atlas
+def test_least_recently_used_page_is_evicted(page_files):
+    cache = PageCache(max_pages=2)
+    first = cache.get(page_files[0])
+    cache.get(page_files[1])
+    assert cache.get(page_files[0]) is first
+    cache.get(page_files[2])
+    assert page_files[0] in cache
+    assert page_files[1] not in cache
+    assert cache.stats() == {"pages": 2, "hits": 1, "misses": 3}
+
+
+@pytest.mark.atlas
+def test_changed_page_is_reloaded(page_files, img_maker):
+    cache = PageCache()
+    assert cache.get(page_files[0]).size == (16, 16)
+    img_maker(32, 16).save(page_files[0])
+    assert cache.get(page_files[0]).size == (32, 16)
+    cache.close()
+    assert len(cache) == 0
+
+
+@pytest.mark.atlas
+def test_lookups_share_one_decode(stored_atlas):
+    atlas_folder, image_names = stored_atlas("test_atlas", "mono", 5)
+    service = AtlasService(storage_path=atlas_folder.parent)
+
+    found = service.get_many_from_atlas(image_names, "test_atlas")
+    assert set(found) == set(image_names)
+    assert all(img.size == (10, 10) for img in found.values())
+    for name in image_names:
+        assert (
+            service.get_from_atlas(name, "test_atlas").tobytes()
+            == found[name].tobytes()
+        )
+    assert service.pages.misses == 1
+
+    with pytest.raises(KeyError):
+        service.get_many_from_atlas([*image_names, "not_there"], "test_atlas")
+
+
+@pytest.mark.atlas
+def test_pages_are_dropped_on_write(stored_atlas, img_maker, tmp_path):
+    atlas_folder, image_names = stored_atlas("test_atlas", "mono", 2)
+    service = AtlasService(storage_path=atlas_folder.parent)
+    service.get_from_atlas(image_names[0], "test_atlas")
+    (page,) = service.pages._pages
+
+    new_img = tmp_path / "new.png"
+    img_maker(4, 4).save(new_img)
+    service.save_to_atlas([new_img], ["new"], "test_atlas")
+    assert page not in service.pages
+    assert service.get_from_atlas("new", "test_atlas").size == (4, 4)
+    assert os.path.exists(page)
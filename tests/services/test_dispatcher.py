@@ -0,0 +1,108 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from domain.events import CancelEditEvent, NoteFetchedEvent, RefreshNotesEvent
+from service.dispatcher import RegistryDispatcher
+from service.registry import Registry
+from utils.scheduler import FrameScheduler
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def registry():
+    return Registry(logger=None)
+
+
+@pytest.fixture
+def handled():
+    return []
+
+
+@pytest.fixture
+def dispatcher(registry, timer, handled):
+    scheduler = FrameScheduler(budget=0.008, timer=timer)
+    return RegistryDispatcher(
+        registry, handler=handled.append, scheduler=scheduler, timer=timer
+    )
+
+
+def test_push_wakes_dispatcher(registry, dispatcher, handled):
+    """
+    Given a pushed event
+    Check that the dispatcher queues a drain without polling, and handles the event
+    """
+    registry.push_event(CancelEditEvent())
+    assert len(dispatcher.scheduler) == 1
+    dispatcher.scheduler.run_frame(0)
+    assert handled == [CancelEditEvent()]
+    assert len(registry.events) == 0
+
+
+def test_coalesces_superseded_events(registry, dispatcher, handled, timer):
+    """
+    Given repeated refresh events interleaved with other events
+    Check that only the latest refresh is handled, order is otherwise kept and latency
+    is measured from the earliest push
+    """
+    # Stamp events with the fake timer rather than perf_counter
+    registry.events.extend(
+        [
+            (0.0, RefreshNotesEvent(on_complete=None)),
+            (0.5, CancelEditEvent()),
+            (0.5, RefreshNotesEvent(on_complete=None)),
+        ]
+    )
+    timer.now = 1.0
+    dispatcher.drain()
+
+    assert [e.event_type for e in handled] == ["cancel_edit", "refresh_notes"]
+    metrics = dispatcher.metrics()
+    assert metrics["refresh_notes"]["coalesced"] == 1
+    assert metrics["refresh_notes"]["handled"] == 1
+    assert metrics["refresh_notes"]["latency_max"] == pytest.approx(1.0)
+
+
+def test_fetched_notes_coalesce_per_file(registry, dispatcher, handled):
+    """
+    Given fetched events for two files, one of them fetched twice
+    Check that one event per file is handled
+    """
+    a, b = Path("a.md"), Path("b.md")
+    for path in (a, b, a):
+        registry.push_event(NoteFetchedEvent(note=SimpleNamespace(filepath=path)))
+    dispatcher.drain()
+    assert [e.note.filepath for e in handled] == [b, a]
+
+
+def test_drain_yields_over_budget(registry, dispatcher, handled, timer):
+    """
+    Given handlers that exhaust the frame budget
+    Check that remaining events are handled on a later frame
+    """
+
+    def slow(event):
+        handled.append(event)
+        timer.now += 0.01
+
+    dispatcher.handler = slow
+    registry.push_event(CancelEditEvent())
+    registry.push_event(CancelEditEvent())
+    dispatcher.scheduler.run_frame(0)
+    assert len(handled) == 1
+    assert len(dispatcher.scheduler) == 1
+    dispatcher.scheduler.run_frame(0)
+    assert len(handled) == 2
@@ -0,0 +1,156 @@
+import threading
+import time
+
+import pytest
+
+from service.executor import BackgroundExecutor, CancellationToken
+
+
+class QueueMarshal:
+    """Collects callbacks instead of posting them to the Kivy Clock"""
+
+    def __init__(self):
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def __call__(self, callback):
+        with self.lock:
+            self.callbacks.append(callback)
+
+    def run(self):
+        with self.lock:
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def wait_idle(executor, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while executor.pending() and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert executor.pending() == 0
+
+
+@pytest.fixture
+def marshal():
+    return QueueMarshal()
+
+
+@pytest.fixture
+def executor(marshal):
+    ex = BackgroundExecutor(max_workers=4, limits={"save": 1}, marshal=marshal)
+    yield ex
+    ex.shutdown()
+
+
+def test_results_are_marshalled(executor, marshal):
+    """
+    Given a submitted job
+    Check that its result is only delivered through the marshal, and not from the worker thread
+    """
+    results = []
+    worker_thread = []
+
+    def work():
+        worker_thread.append(threading.current_thread())
+        return 42
+
+    executor.submit("query", work, on_result=results.append)
+    executor.shutdown()
+    assert worker_thread[0] is not threading.main_thread()
+    assert results == []
+    marshal.run()
+    assert results == [42]
+
+
+def test_errors_are_marshalled(executor, marshal):
+    errors = []
+
+    def fail():
+        raise ValueError("boom")
+
+    executor.submit("query", fail, on_error=errors.append)
+    executor.shutdown()
+    marshal.run()
+    assert isinstance(errors[0], ValueError)
+
+
+def test_limit_per_operation(executor, marshal):
+    """
+    Given several jobs of an operation type limited to one at a time
+    Check that they never overlap, and run in submission order
+    """
+    active, peak, order = [0], [0], []
+    lock = threading.Lock()
+    release = threading.Event()
+
+    def save(i):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        release.wait(1)
+        order.append(i)
+        with lock:
+            active[0] -= 1
+
+    for i in range(4):
+        executor.submit("save", save, i)
+    assert executor.pending("save") == 4
+    release.set()
+    wait_idle(executor)
+    assert peak[0] == 1
+    assert order == [0, 1, 2, 3]
+
+
+def test_cancelled_result_is_discarded(executor, marshal):
+    """
+    Given a job cancelled after it finished, but before the main thread ran its callback
+    Check that the callback is not called
+    """
+    results = []
+    token = executor.submit("query", lambda: 1, on_result=results.append)
+    executor.shutdown()
+    token.cancel()
+    marshal.run()
+    assert results == []
+
+
+def test_supersede_cancels_previous(executor, marshal):
+    """
+    Given a running job that is superseded
+    Check that only the newest result is delivered
+    """
+    started, release = threading.Event(), threading.Event()
+    results = []
+
+    def slow():
+        started.set()
+        release.wait(1)
+        return "old"
+
+    first = executor.submit("query", slow, on_result=results.append)
+    started.wait(1)
+    executor.submit("query", lambda: "new", on_result=results.append, supersede=True)
+    release.set()
+    wait_idle(executor)
+    marshal.run()
+    assert first.cancelled
+    assert results == ["new"]
+
+
+def test_token_passed_to_operation(executor, marshal):
+    """
+    Given a caller supplied token
+    Check that the operation receives it, and can stop early
+    """
+    token = CancellationToken()
+    token.cancel()
+    seen = []
+
+    def work(token: CancellationToken):
+        seen.append(token)
+
+    executor.submit("query", work, token=token)
+    executor.shutdown()
+    # Cancelled before starting, so never runs
+    assert seen == []
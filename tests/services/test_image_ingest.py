@@ -0,0 +1,65 @@
+import pytest
+from PIL import Image
+
+from adapters.atlas.fs.fs_atlas_repository import AtlasService
+from adapters.atlas.fs.ingest import ImageIngest
+
+
+@pytest.fixture
+def sources(tmp_path, img_maker):
+    folder = tmp_path / "notes"
+    folder.mkdir()
+    photo = folder / "photo.jpg"
+    img_maker(1600, 1200).save(photo)
+    icon = folder / "icon.png"
+    img_maker(64, 32).save(icon)
+    return [("photo", photo), ("icon", icon)]
+
+
+@pytest.fixture
+def ingest(tmp_path):
+    return ImageIngest(tmp_path / "cache", size=100, max_workers=2)
+
+
+@pytest.mark.atlas
+def test_images_are_normalized(ingest, sources):
+    normalized = ingest.ingest(sources)
+    with Image.open(normalized["photo"]) as img:
+        assert img.size == (100, 75)
+        assert img.mode == "RGBA"
+    # Never upscaled
+    with Image.open(normalized["icon"]) as img:
+        assert img.size == (64, 32)
+    assert set(ingest.manifest) == {"photo", "icon"}
+
+
+@pytest.mark.atlas
+def test_unchanged_images_are_not_reprocessed(ingest, sources, img_maker, monkeypatch):
+    first = ingest.ingest(sources)
+
+    reloaded = ImageIngest(ingest.cache_dir, size=100)
+    ran = []
+    monkeypatch.setattr(
+        reloaded, "_run", lambda pending: ran.extend(pending) or ingest._run(pending)
+    )
+    assert reloaded.ingest(sources) == first
+    assert not ran
+
+    # A changed source is reprocessed and replaces its earlier output
+    img_maker(300, 600).save(sources[1][1])
+    second = reloaded.ingest(sources)
+    assert [name for name, *_ in ran] == ["icon"]
+    assert not first["icon"].exists()
+    with Image.open(second["icon"]) as img:
+        assert img.size == (50, 100)
+
+
+@pytest.mark.atlas
+def test_listener_packs_normalized_images(storage_directory, ingest, sources):
+    service = AtlasService(storage_path=storage_directory, ingest=ingest)
+    service.category_image_listener([(name.title(), path) for name, path in sources])
+    assert "category_img.photo" in service
+    assert service.get_from_atlas("photo", "category_img").size == (100, 75)
+    for page_name in service.page_utilization("category_img"):
+        with Image.open(storage_directory / "category_img" / page_name) as page:
+            assert max(page.size) <= 256
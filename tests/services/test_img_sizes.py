@@ -0,0 +1,43 @@
+import pytest
+from PIL import Image
+
+from adapters.atlas.fs.utils import read_img_size, read_img_sizes
+from utils.aio import IOLoop
+
+FORMATS = [
+    ("png", {}),
+    ("jpg", {}),
+    ("jpg", {"progressive": True}),
+    ("jpg", {"exif": Image.Exif()}),
+    ("gif", {}),
+    ("bmp", {}),
+    ("webp", {}),
+]
+
+
+@pytest.mark.parametrize("ext, save_kwargs", FORMATS)
+@pytest.mark.atlas
+def test_read_img_size(tmp_path, img_maker, ext, save_kwargs):
+    path = tmp_path / f"img.{ext}"
+    img_maker(37, 21).save(path, **save_kwargs)
+    assert read_img_size(path) == (37, 21)
+
+
+@pytest.mark.atlas
+def test_read_img_sizes(tmp_path, img_maker):
+    paths = []
+    for i in range(1, 101):
+        path = tmp_path / f"{i}.{'png' if i % 2 else 'jpg'}"
+        img_maker(i, 101 - i).save(path)
+        paths.append(path)
+    sizes = IOLoop().run(read_img_sizes(paths, max_open=4))
+    assert list(sizes) == paths
+    assert all(sizes[p] == (i, 101 - i) for i, p in enumerate(paths, start=1))
+
+
+@pytest.mark.atlas
+def test_unreadable_image(tmp_path):
+    path = tmp_path / "img.png"
+    path.write_bytes(b"not an image")
+    with pytest.raises(Exception):
+        read_img_size(path)
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+from kivy.clock import Clock
+
+from plugins import PluginManager, ScreenSaverPlugin
+from service.power import PowerStateService
+
+
+class FakeInterval:
+    def __init__(self):
+        self.running = True
+
+    def cancel(self):
+        self.running = False
+
+    def __call__(self):
+        self.running = True
+
+
+@pytest.fixture
+def app():
+    return SimpleNamespace(
+        plugin_manager=PluginManager(),
+        next_note_scheduler=FakeInterval(),
+        frame_monitor=None,
+        play_state="play",
+        display_state="display",
+    )
+
+
+@pytest.fixture
+def power(app):
+    fps = Clock._max_fps
+    service = PowerStateService(idle_fps=2)
+    service.init_app(app)
+    yield service
+    Clock._max_fps = fps
+
+
+@pytest.fixture
+def screen_saver(app):
+    return app.plugin_manager.ensure_plugin(ScreenSaverPlugin, make=True)
+
+
+def test_idle_while_screen_saved(app, power, screen_saver):
+    """
+    Given a screen saver added after the service started
+    Check that saving the screen idles the app and an interaction wakes it
+    """
+    active_fps = Clock._max_fps
+    screen_saver.screen_saved = True
+    assert power.idle
+    assert not app.next_note_scheduler.running
+    assert Clock._max_fps == 2
+
+    app.plugin_manager.plugin_event("on_interact")
+    assert not power.idle
+    assert app.next_note_scheduler.running
+    assert Clock._max_fps == active_fps
+
+
+def test_paused_app_stays_paused(app, power, screen_saver):
+    app.play_state = "pause"
+    screen_saver.screen_saved = True
+    screen_saver.handle_event("on_interact")
+    assert not app.next_note_scheduler.running
+
+
+def test_disabling_screen_saver_wakes(power, screen_saver):
+    screen_saver.screen_saved = True
+    screen_saver.enabled = True
+    screen_saver.enabled = False
+    assert not power.idle
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+from kivy.core.image import ImageLoader
+
+from adapters.atlas.fs.raw import (
+    ImageLoaderRawPage,
+    install,
+    raw_path,
+    read_raw_page,
+    write_raw_page,
+)
+
+
+@pytest.fixture
+def page(tmp_path, img_maker):
+    path = tmp_path / "keys-0.png"
+    img_maker(33, 17).save(path)
+    return path
+
+
+@pytest.mark.atlas
+def test_raw_page_roundtrip(page):
+    from PIL import Image
+
+    assert read_raw_page(page) is None
+    assert write_raw_page(page) == raw_path(page)
+    data = read_raw_page(page)
+    assert (data.width, data.height, data.fmt) == (33, 17, "rgba")
+    with Image.open(page) as img:
+        assert bytes(data.data) == img.convert("RGBA").tobytes()
+
+
+@pytest.mark.atlas
+def test_stale_raw_page_is_ignored(page, img_maker):
+    write_raw_page(page)
+    img_maker(33, 17).save(page)
+    st = page.stat()
+    os.utime(page, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+    assert read_raw_page(page) is None
+
+
+@pytest.mark.atlas
+def test_truncated_raw_page_is_ignored(page):
+    sidecar = write_raw_page(page)
+    sidecar.write_bytes(sidecar.read_bytes()[:-4])
+    assert read_raw_page(page) is None
+    sidecar.write_bytes(b"KV")
+    assert read_raw_page(page) is None
+
+
+@pytest.mark.atlas
+def test_lz4_raw_page(page):
+    pytest.importorskip("lz4")
+    from PIL import Image
+
+    write_raw_page(page, compress=True)
+    data = read_raw_page(page)
+    with Image.open(page) as img:
+        assert bytes(data.data) == img.convert("RGBA").tobytes()
+
+
+def test_install():
+    install()
+    install()
+    assert ImageLoader.loaders.count(ImageLoaderRawPage) == 1
+    assert ImageLoader.loaders[0] is ImageLoaderRawPage
@@ -0,0 +1,155 @@
+import pytest
+from PIL import Image
+
+from service.shortcuts import ShortcutStripCache, key_label
+
+
+class FakeAtlas:
+    def __init__(self):
+        self.keys = {
+            "ctrl": Image.new("RGBA", (284, 236), (195, 195, 195, 255)),
+            "a": Image.new("RGBA", (236, 236), (196, 196, 196, 255)),
+        }
+        self.gets = []
+        self.version = (1, 100)
+
+    def get_from_atlas(self, name, atlas_name):
+        assert atlas_name == "keys"
+        self.gets.append(name)
+        try:
+            return self.keys[name]
+        except KeyError:
+            raise KeyError(f"{name} not found in atlas {atlas_name}")
+
+    def stamp(self, atlas_name):
+        return self.version
+
+
+class FakeTexture:
+    @staticmethod
+    def get_region(x, y, w, h):
+        return ("region", x, y, w, h)
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(ShortcutStripCache, "_load", lambda self, path: FakeTexture)
+    return ShortcutStripCache(FakeAtlas(), cache_dir=tmp_path, height=48)
+
+
+def test_strip_is_composed_once(cache, tmp_path):
+    path, rects = cache.strip_image(("Ctrl", "A"))
+    with Image.open(path) as img:
+        assert img.height == 48
+        assert img.width > sum(w for _, _, w, _ in rects)
+    assert [w for _, _, w, _ in rects] == [58, 48]
+    assert rects[0][0] == 0 and rects[1][0] > rects[0][2]
+
+    # Persisted, so a new cache reuses it
+    reloaded = ShortcutStripCache(FakeAtlas(), cache_dir=tmp_path, height=48)
+    assert reloaded.strip_image(["ctrl", "a"]) == (path, rects)
+    assert reloaded.composed == 0
+    assert reloaded.atlas_service.gets == []
+
+
+def test_missing_keys_are_synthesized(cache, tmp_path):
+    path, rects = cache.strip_image(["ctrl", "f13"])
+    assert (tmp_path / "keys").is_dir()
+    (synthesized,) = (tmp_path / "keys").glob("f13.*.png")
+    with Image.open(synthesized) as img:
+        assert img.mode == "RGBA"
+        assert img.height == 236
+
+    cache.strip_image(["f13"])
+    assert cache.composed == 2
+    assert len(list((tmp_path / "keys").iterdir())) == 1
+
+
+def test_strip_textures(cache):
+    strip = cache.strip(["Ctrl", "a"])
+    assert strip.texture is FakeTexture
+    assert strip.keys[1] == ("region", *cache.strip_image(["ctrl", "a"])[1][1])
+    assert cache.strip(("ctrl", "A")) is strip
+    cache.keep = 1
+    cache.strip(["a"])
+    assert cache.stats() == {"strips": 1, "composed": 2}
+
+
+def test_rewritten_atlas_redraws(cache, tmp_path):
+    strip = cache.strip(["ctrl", "f13"])
+    path, _ = cache.strip_image(["ctrl", "f13"])
+
+    # A real F13 cap is added to the atlas
+    cache.atlas_service.keys["f13"] = Image.new("RGBA", (236, 236), (1, 2, 3, 255))
+    cache.atlas_service.version = (2, 120)
+    assert cache.strip(["ctrl", "f13"]) is not strip
+    new_path, rects = cache.strip_image(["ctrl", "f13"])
+    assert new_path != path
+    assert cache.composed == 2
+    with Image.open(new_path) as img:
+        x, _, w, h = rects[1]
+        assert img.getpixel((x + w // 2, h // 2)) == (1, 2, 3, 255)
+
+    # Synthesized keys are redrawn too, if still missing
+    cache.strip_image(["f14"])
+    cache.atlas_service.version = (3, 130)
+    cache.strip_image(["f14"])
+    assert cache.composed == 4
+
+
+def test_outdated_strips_are_deleted(cache, tmp_path):
+    old_path, _ = cache.strip_image(["ctrl", "f13"])
+    cache.atlas_service.version = (2, 120)
+    new_path, _ = cache.strip_image(["ctrl", "f13"])
+    assert not old_path.exists()
+    assert list(tmp_path.glob("*.png")) == [new_path]
+    assert len(list((tmp_path / "keys").glob("f13.*.png"))) == 1
+
+    reloaded = ShortcutStripCache(FakeAtlas(), cache_dir=tmp_path, height=48)
+    reloaded.atlas_service.version = (2, 120)
+    assert list(reloaded.manifest) == [new_path.stem]
+    # Drawn from another atlas than the current one
+    reloaded.atlas_service.version = (3, 130)
+    reloaded.strip_image(["a"])
+    assert new_path.stem not in reloaded.manifest
+    assert not new_path.exists()
+    assert not list((tmp_path / "keys").glob("f13.*.png"))
+
+
+def test_strip_async(tmp_path, monkeypatch):
+    import threading
+    from queue import Queue
+
+    from service.executor import BackgroundExecutor
+
+    loads = []
+    monkeypatch.setattr(
+        ShortcutStripCache,
+        "_load",
+        lambda self, path: loads.append(threading.get_ident()) or FakeTexture,
+    )
+    delivered = Queue()
+    executor = BackgroundExecutor(max_workers=1, marshal=delivered.put)
+    cache = ShortcutStripCache(
+        FakeAtlas(), cache_dir=tmp_path, height=48, executor=executor
+    )
+    received = []
+    cache.strip_async(["ctrl", "a"], received.append)
+    cache.strip_async(["Ctrl", "A"], received.append)
+    assert not received
+    delivered.get(timeout=5)()
+    assert len(received) == 2 and received[0] is received[1]
+    assert received[0] is cache.strip(["ctrl", "a"])
+    # Composed once, on the executor, with the texture created on this thread
+    assert cache.composed == 1
+    assert loads == [threading.get_ident()]
+
+    # Held, so delivered immediately
+    cache.strip_async(["ctrl", "a"], received.append)
+    assert len(received) == 3
+    executor.shutdown(wait=True)
+
+
+def test_key_label():
+    assert key_label("a") == "A"
+    assert key_label("pgup") == "Pgup"
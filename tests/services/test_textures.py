@@ -0,0 +1,192 @@
+import gc
+
+import pytest
+
+from service.textures import TextureRegistry
+
+
+class Owner:
+    pass
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = TextureRegistry(atlas_service=None, keep_unused=1)
+    monkeypatch.setattr(registry, "_load", lambda name, atlas_name: object())
+    return registry
+
+
+def test_textures_are_shared(registry):
+    first = registry.acquire("bg_normal", "textures")
+    assert registry.acquire("bg_normal", "textures") is first
+    assert registry.acquire("bg_down", "textures") is not first
+    assert registry.refs("bg_normal", "textures") == 2
+    assert registry.stats() == {
+        "textures": 2,
+        "unused": 0,
+        "refs": 3,
+        "pages": 0,
+        "loads": 2,
+    }
+
+
+def test_unreferenced_textures_are_evicted(registry):
+    normal = registry.acquire("bg_normal", "textures")
+    registry.acquire("bg_down", "textures")
+    registry.release("bg_normal", "textures")
+    # Kept for reuse
+    assert registry.acquire("bg_normal", "textures") is normal
+    registry.release("bg_normal", "textures")
+    registry.release("bg_down", "textures")
+    # Over `keep_unused`, the oldest goes
+    assert ("textures", "bg_normal") not in registry
+    assert ("textures", "bg_down") in registry
+    registry.evict()
+    assert registry.stats()["textures"] == 0
+
+
+def test_owner_collection_releases(registry):
+    owners = [Owner() for _ in range(3)]
+    for owner in owners:
+        registry.acquire("a", "keys", owner=owner)
+    assert registry.refs("a", "keys") == 3
+    del owner
+    owners.clear()
+    gc.collect()
+    assert registry.refs("a", "keys") == 0
+    assert registry.stats()["unused"] == 1
+
+
+def test_invalidate(registry):
+    old = registry.acquire("a", "keys")
+    registry.invalidate("keys")
+    assert registry.acquire("a", "keys") is not old
+    assert registry.refs("a", "keys") == 2
+
+
+class FakePage:
+    class texture:
+        @staticmethod
+        def get_region(x, y, w, h):
+            return ("region", x, y, w, h)
+
+
+@pytest.fixture
+def async_registry():
+    from service.executor import BackgroundExecutor
+
+    executor = BackgroundExecutor(max_workers=1, marshal=lambda callback: callback())
+    decodes = []
+
+    class Atlas:
+        def locate(self, name, atlas_name):
+            if name == "missing":
+                raise KeyError(name)
+            return f"{atlas_name}-0.png", (0, 0, 4, 4)
+
+    registry = TextureRegistry(Atlas(), executor=executor)
+
+    def decode(name, atlas_name):
+        decodes.append(name)
+        page_path, rect = registry.atlas_service.locate(name, atlas_name)
+        return (atlas_name, page_path), FakePage, rect
+
+    registry._decode_page = decode
+    registry.decodes = decodes
+    yield registry
+    executor.shutdown(wait=True)
+
+
+def test_acquire_async(async_registry):
+    from threading import Event
+
+    received = []
+    done = Event()
+    owners = [Owner(), Owner()]
+
+    def on_texture(texture):
+        received.append(texture)
+        if len(received) == 2:
+            done.set()
+
+    for owner in owners:
+        async_registry.acquire_async("python", "category_img", on_texture, owner=owner)
+    assert done.wait(5)
+    assert received[0] == received[1] == ("region", 0, 0, 4, 4)
+    assert async_registry.decodes == ["python"]
+    assert async_registry.refs("python", "category_img") == 2
+
+    # Loaded, so delivered immediately
+    async_registry.acquire_async("python", "category_img", received.append)
+    assert len(received) == 3
+
+    async_registry.release("python", "category_img", owner=owners[0])
+    async_registry.release("python", "category_img", owner=owners[0])
+    assert async_registry.refs("python", "category_img") == 2
+
+
+def test_acquire_async_missing(async_registry):
+    received = []
+    async_registry.acquire_async("missing", "category_img", received.append)
+    async_registry.executor.shutdown(wait=True)
+    assert not received
+    assert not async_registry._pending
+
+
+def test_pages_follow_refs(async_registry):
+    owner = Owner()
+    async_registry.acquire_async("python", "category_img", lambda t: None, owner)
+    async_registry.acquire_async("git", "category_img", lambda t: None, owner)
+    async_registry.executor.shutdown(wait=True)
+    assert async_registry.stats()["pages"] == 1
+
+    # The page stays while any region cut from it is referenced
+    async_registry.release("python", "category_img", owner=owner)
+    assert async_registry.stats()["pages"] == 1
+    async_registry.release("git", "category_img", owner=owner)
+    assert async_registry.stats()["pages"] == 0
+    assert ("category_img", "git") in async_registry
+
+
+@pytest.mark.atlas
+def test_rewritten_atlas_is_reloaded(stored_atlas, window, tmp_path):
+    """
+    Given textures cut from a page, loaded and decoded
+    Check that after the page is rewritten, new textures are cut from the new page
+    """
+    from queue import Queue
+
+    from PIL import Image
+
+    from adapters.atlas.fs.fs_atlas_repository import AtlasService
+    from service.executor import BackgroundExecutor
+
+    atlas_folder, image_names = stored_atlas("test_atlas", "mono", 2)
+    service = AtlasService(storage_path=atlas_folder.parent)
+    # Textures are created on this thread, as they would be on the main thread
+    delivered = Queue()
+    executor = BackgroundExecutor(max_workers=1, marshal=delivered.put)
+    registry = TextureRegistry(service, executor=executor)
+    service.invalidate_listeners.append(registry.invalidate)
+
+    def acquire_async(name):
+        received = []
+        registry.acquire_async(name, "test_atlas", received.append)
+        delivered.get(timeout=5)()
+        return received[0]
+
+    registry.acquire(image_names[0], "test_atlas")
+    acquire_async(image_names[1])
+    assert registry.stats()["pages"] == 1
+
+    red = tmp_path / "red.png"
+    Image.new("RGBA", (10, 10), (255, 0, 0, 255)).save(red)
+    service.save_to_atlas([red], ["red"], atlas_name="test_atlas")
+    assert registry.stats()["pages"] == 0
+
+    expected = bytes((255, 0, 0, 255)) * 100
+    assert registry.acquire("red", "test_atlas").pixels == expected
+    registry.release("red", "test_atlas")
+    registry.evict()
+    assert acquire_async("red").pixels == expected
+    executor.shutdown(wait=True)
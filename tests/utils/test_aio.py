@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+import pytest
+
+from utils.aio import IOLoop
+
+
+async def loop_identity():
+    await asyncio.sleep(0)
+    return asyncio.get_running_loop(), threading.current_thread()
+
+
+def test_loop_is_reused():
+    """
+    Given repeated blocking runs
+    Check that every run shares one loop, on a thread other than the caller's
+    """
+    io = IOLoop()
+    first_loop, first_thread = io.run(loop_identity())
+    second_loop, second_thread = io.run(loop_identity())
+    assert first_loop is second_loop
+    assert first_thread is second_thread is not threading.current_thread()
+
+
+def test_submit_from_threads():
+    """
+    Given coroutines submitted from several threads at once
+    Check that each returns its own result
+    """
+
+    async def double(n):
+        await asyncio.sleep(0)
+        return n * 2
+
+    results = {}
+
+    def worker(n):
+        results[n] = IOLoop().submit(double(n)).result(timeout=1)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {n: n * 2 for n in range(8)}
+
+
+def test_run_within_loop_raises():
+    async def nested():
+        IOLoop().run(loop_identity())
+
+    with pytest.raises(RuntimeError):
+        IOLoop().run(nested())
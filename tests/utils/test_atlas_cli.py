@@ -0,0 +1,97 @@
+import json
+import random
+
+import pytest
+from click.testing import CliRunner
+from PIL import Image
+
+from atlas_utils.atlas import atlas_cli, cropbox
+
+
+@pytest.fixture
+def images(tmp_path):
+    folder = tmp_path / "images"
+    folder.mkdir()
+    return folder
+
+
+@pytest.fixture
+def make_image(images):
+    rng = random.Random(3)
+
+    def _make_image(name, size=None):
+        size = size or (rng.randint(8, 40), rng.randint(8, 40))
+        color = tuple(rng.randint(0, 255) for _ in range(3)) + (255,)
+        Image.new("RGBA", size, color).save(images / f"{name}.png")
+
+    for i in range(12):
+        _make_image(f"key{i}")
+    return _make_image
+
+
+def pack(images, atlas_fp, *args):
+    result = CliRunner().invoke(
+        atlas_cli,
+        [
+            "pack",
+            "-i",
+            str(images / "*.png"),
+            "-o",
+            str(atlas_fp),
+            "--incremental",
+            *args,
+        ],
+    )
+    assert result.exit_code == 0, result.output
+    return json.loads(atlas_fp.read_text())
+
+
+def assert_atlas_matches(images, atlas_fp, atlas_data):
+    names = set()
+    for page, members in atlas_data.items():
+        with Image.open(atlas_fp.parent / page) as page_img:
+            for name, rect in members.items():
+                names.add(name)
+                with Image.open(images / f"{name}.png") as src:
+                    assert (
+                        page_img.crop(cropbox(rect, page_img)).tobytes()
+                        == src.tobytes()
+                    )
+    assert names == {p.stem for p in images.glob("*.png")}
+
+
+def test_incremental_pack(images, make_image, tmp_path):
+    atlas_fp = tmp_path / "atlas" / "keys.atlas"
+    atlas_fp.parent.mkdir()
+    first = pack(images, atlas_fp, "-s", "64")
+    assert len(first) > 1
+    assert_atlas_matches(images, atlas_fp, first)
+
+    # An added image only touches the page it lands on
+    mtimes = {p: (atlas_fp.parent / p).stat().st_mtime_ns for p in first}
+    make_image("new", (6, 6))
+    second = pack(images, atlas_fp)
+    assert_atlas_matches(images, atlas_fp, second)
+    (touched,) = [
+        p for p in mtimes if (atlas_fp.parent / p).stat().st_mtime_ns != mtimes[p]
+    ]
+    for page, members in first.items():
+        for name, rect in members.items():
+            assert second[page][name] == rect
+    assert "new" in second[touched]
+
+
+def test_changed_and_removed_images_repack_their_pages(images, make_image, tmp_path):
+    atlas_fp = tmp_path / "keys.atlas"
+    first = pack(images, atlas_fp, "-s", "64")
+    (images / "key0.png").unlink()
+    make_image("key1", (20, 20))
+    second = pack(images, atlas_fp)
+    assert_atlas_matches(images, atlas_fp, second)
+    assert set(tmp_path.glob("keys-*.png")) == {tmp_path / p for p in second}
+
+    untouched = [
+        page for page, members in first.items() if not {"key0", "key1"} & set(members)
+    ]
+    for page in untouched:
+        assert second[page] == first[page]
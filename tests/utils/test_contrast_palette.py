@@ -0,0 +1,70 @@
+import pytest
+from kivy.parser import parse_color
+
+from utils.caching.palette import ContrastPalette
+
+COLORS = {
+    "White": (1, 1, 1),
+    "Codespan": (0, 0, 0, 0.15),
+    "Primary": parse_color("#37464f"),
+    "Accent-Two": parse_color("#56e39f"),
+}
+
+
+@pytest.fixture
+def palette():
+    p = ContrastPalette()
+    p.norms.clear()
+    p.contrast.clear()
+    p.misses = 0
+    return p.build([*COLORS.values(), "#2f1e2e"])
+
+
+def test_palette_precomputed(palette):
+    """
+    Given a palette built from app colors
+    Check that lookups are served from the table
+    """
+    assert palette.text_contrast(COLORS["Primary"], 186) == "#ffffff"
+    assert palette.text_contrast(COLORS["White"], 186) == "#000000"
+    assert palette.text_contrast(COLORS["Accent-Two"], 170) == "#000000"
+    assert (
+        palette.text_contrast(COLORS["Primary"], 186, COLORS["Codespan"]) == "#ffffff"
+    )
+    assert palette.color_norm(COLORS["White"]) == (1, 1, 1, 1.0)
+    assert palette.color_norm("#2f1e2e") == pytest.approx(
+        (0x2F / 255, 0x1E / 255, 0x2E / 255, 1.0)
+    )
+    assert palette.misses == 0
+
+
+def test_palette_miss(palette):
+    """
+    Given a color outside the palette
+    Check that it is computed once and then cached
+    """
+    color = [0.9, 0.9, 0.9, 1]
+    assert palette.text_contrast(color, 186) == "#000000"
+    misses = palette.misses
+    assert misses > 0
+    assert palette.text_contrast(color, 186) == "#000000"
+    assert palette.misses == misses
+
+
+def test_palette_color_property(palette):
+    """
+    Given a palette built from hex strings
+    Check that lookups with a ColorProperty value are served from the table
+    """
+    from kivy.event import EventDispatcher
+    from kivy.properties import ColorProperty
+
+    class Widget(EventDispatcher):
+        bg_color = ColorProperty("#2f1e2e")
+        hl_color = ColorProperty(COLORS["Codespan"])
+
+    widget = Widget()
+    assert palette.color_norm(widget.bg_color) == palette.color_norm("#2f1e2e")
+    assert palette.text_contrast(widget.bg_color, 186) == "#ffffff"
+    assert palette.text_contrast(widget.bg_color, 186, widget.hl_color) == "#ffffff"
+    assert palette.misses == 0
@@ -0,0 +1,74 @@
+import pytest
+
+from utils.frame_monitor import FrameMonitor
+from utils.tracing import Tracer
+
+MS = 1_000_000
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def tracer():
+    return Tracer(enabled=True)
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / "frames.log"
+
+
+@pytest.fixture
+def monitor(log_path, tracer, timer):
+    mon = FrameMonitor(log_path, budget_ms=20, tracer=tracer, timer=timer)
+    yield mon
+    mon.handler.close()
+
+
+def run_frames(monitor, timer, durations_ms):
+    monitor.on_frame()
+    for ms in durations_ms:
+        timer.now += ms * MS
+        monitor.on_frame()
+
+
+def test_counts_slow_frames(monitor, timer):
+    run_frames(monitor, timer, [16, 17, 45, 16])
+    stats = monitor.stats()
+    assert stats["frames"] == 4
+    assert stats["slow_frames"] == 1
+    assert stats["worst_ms"] == pytest.approx(45)
+
+
+def test_slow_frame_attributed_to_overlapping_spans(monitor, timer, tracer, log_path):
+    """
+    Given spans recorded during a slow frame, and one recorded long before it
+    Check that the report names the overlapping spans, longest first, and omits the old one
+    """
+    tracer.record("event.note_fetched", 0, 2 * MS)
+    run_frames(monitor, timer, [16])
+    start = timer.now
+    tracer.record("task.render_note", start + 1 * MS, start + 40 * MS)
+    tracer.record("paginate", start + 41 * MS, start + 44 * MS)
+    run_frames(monitor, timer, [50])
+
+    report = log_path.read_text()
+    assert "Slow frame 50.0ms" in report
+    assert report.index("task.render_note") < report.index("paginate")
+    assert "event.note_fetched" not in report
+
+
+def test_unattributed(monitor, timer, log_path):
+    run_frames(monitor, timer, [30])
+    assert "unattributed" in log_path.read_text()
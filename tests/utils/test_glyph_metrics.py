@@ -0,0 +1,54 @@
+import pytest
+from kivy.core.text import Label as CoreLabel
+
+from utils.caching.glyphs import (
+    clear_glyph_cache,
+    glyph_cache_stats,
+    glyph_key,
+    measure_text,
+)
+
+SAMPLES = [
+    "The Zen of Python, by Tim Peters",
+    "Pattern Matching Operators",
+    "x = [i for i in range(10)]",
+    "Accept suggestion, with syntax fixing",
+    "Ctrl + Shift + Alt",
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_tables():
+    clear_glyph_cache()
+    yield
+    clear_glyph_cache()
+
+
+@pytest.mark.parametrize("font_size", [12, 16, 31])
+@pytest.mark.parametrize("text", SAMPLES)
+def test_measure_matches_extents(font_size, text):
+    """
+    Given a string and font size
+    Check that summed glyph advances agree with the text provider
+    """
+    label = CoreLabel(font_size=font_size)
+    expected_w, expected_h = label.get_extents(text)
+    w, h = measure_text(text, label=label)
+    assert h == expected_h
+    # Kerning is not modelled, allow a small drift
+    assert abs(w - expected_w) <= max(2, expected_w * 0.02)
+
+
+def test_glyph_stats():
+    key = glyph_key("Roboto", 16)
+    measure_text("abc", key=key)
+    stats = glyph_cache_stats()
+    assert stats["tables"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 0
+
+    # Glyphs outside the preloaded charset are measured once, then cached
+    measure_text("\u00e9\u00e9", key=key)
+    stats = glyph_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 4
@@ -0,0 +1,76 @@
+import pytest
+from kivy.factory import Factory
+from kivy.lang import Builder
+
+from utils.kv_cache import KV_CACHE_ENV, load_kv_file, parse_kv
+
+KV = """
+#:set kv_cache_test_width 120
+
+<KvCacheTestLabel@Label>:
+    text: "cached " + str(self.width)
+    width: kv_cache_test_width
+    size_hint_x: None
+"""
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    path = tmp_path / "cache"
+    monkeypatch.setenv(KV_CACHE_ENV, str(path))
+    return path
+
+
+@pytest.fixture
+def kv_file(tmp_path):
+    path = tmp_path / "kv_cache_test.kv"
+    path.write_text(KV)
+    return path
+
+
+def test_second_parse_is_cached(cache, kv_file):
+    parser, cached = parse_kv(kv_file)
+    assert not cached
+    parser2, cached = parse_kv(kv_file)
+    assert cached
+    assert parser2.dynamic_classes == parser.dynamic_classes
+    assert len(parser2.rules) == len(parser.rules)
+
+
+def test_changed_file_replaces_entry(cache, kv_file):
+    parse_kv(kv_file)
+    kv_file.write_text(KV.replace("120", "80"))
+    _, cached = parse_kv(kv_file)
+    assert not cached
+    assert len(list(cache.iterdir())) == 1
+
+
+def test_disabled(monkeypatch, tmp_path, kv_file):
+    monkeypatch.setenv(KV_CACHE_ENV, "off")
+    parse_kv(kv_file)
+    _, cached = parse_kv(kv_file)
+    assert not cached
+
+
+def test_corrupt_entry_is_reparsed(cache, kv_file):
+    parse_kv(kv_file)
+    entry = next(cache.iterdir())
+    entry.write_bytes(b"not a pickle")
+    _, cached = parse_kv(kv_file)
+    assert not cached
+
+
+def test_cached_rules_apply(cache, kv_file):
+    """
+    Given a kv file loaded from the cache
+    Check that its dynamic class is registered and its rules, including compiled expressions, apply
+    """
+    parse_kv(kv_file)
+    load_kv_file(kv_file)
+    try:
+        widget = Factory.KvCacheTestLabel()
+        assert widget.width == 120
+        assert widget.text == "cached 120"
+    finally:
+        Builder.unload_file(str(kv_file))
+        Factory.unregister("KvCacheTestLabel")
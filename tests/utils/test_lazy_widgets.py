@@ -0,0 +1,32 @@
+import pytest
+from kivy.app import App
+from kivy.factory import Factory
+from kivy.metrics import sp
+from kivy.properties import DictProperty, NumericProperty
+
+
+class StyleApp(App):
+    base_font_size = NumericProperty(20)
+    fonts = DictProperty({"default": "Roboto", "mono": "RobotoMono"})
+    colors = DictProperty({"Dark": (0, 0, 0, 1)})
+
+
+@pytest.fixture
+def app():
+    import widgets  # noqa: F401, registers the lazy widgets
+
+    app = StyleApp()
+    yield app
+    App._running_app = None
+
+
+def test_kv_classes_keep_their_base(app):
+    """
+    Given the lazy widget registration
+    Check that kv-only classes resolve to their kv declaration, styled by their kv base class
+    """
+    label = Factory.SmallLabel()
+    assert isinstance(label, Factory.BaseLabel)
+    assert label.font_size == 20 - sp(2)
+    assert label.font_family == "Roboto"
+    assert isinstance(Factory.HSeparator(), Factory.Separator)
@@ -0,0 +1,62 @@
+import tracemalloc
+
+import pytest
+from kivy.cache import Cache
+
+from utils.memory_monitor import MemoryMonitor, cache_sizes
+
+HELD = []
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    return tmp_path / "memory.log"
+
+
+@pytest.fixture
+def monitor(log_path):
+    mon = MemoryMonitor(log_path, every=3, top_n=5)
+    mon.start()
+    yield mon
+    if mon._started_tracing:
+        mon.stop()
+    HELD.clear()
+
+
+def grow():
+    HELD.append([bytearray(1024) for _ in range(256)])
+
+
+def test_growth_is_attributed(monitor, log_path):
+    """
+    Given memory retained between two snapshots
+    Check that the allocation site is reported as growing
+    """
+    grow()
+    growth = monitor.snapshot("test")
+    assert any(d.traceback[0].filename == __file__ for d in growth)
+    assert __file__ in log_path.read_text()
+
+
+def test_snapshots_on_category_and_every_n_paginations(monitor):
+    monitor.on_category("Python")
+    assert monitor.snapshots == 2
+    for _ in range(5):
+        monitor.on_paginate()
+    assert monitor.snapshots == 3
+    monitor.on_paginate()
+    assert monitor.snapshots == 4
+
+
+def test_stop_restores_tracing(monitor):
+    monitor.stop()
+    assert not tracemalloc.is_tracing()
+
+
+def test_cache_sizes():
+    Cache.register("memory_monitor_test")
+    Cache.append("memory_monitor_test", "a", object())
+    Cache.append("memory_monitor_test", "b", object())
+    sizes = cache_sizes()
+    assert sizes["memory_monitor_test"] == 2
+    assert "palette_contrast" in sizes
@@ -0,0 +1,65 @@
+import pytest
+
+from utils.scheduler import FrameScheduler, PRIORITY_HIGH, PRIORITY_LOW
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return FakeTimer()
+
+
+@pytest.fixture
+def scheduler(timer):
+    return FrameScheduler(budget=0.008, timer=timer)
+
+
+def test_chain_runs_in_one_frame(scheduler):
+    """
+    Given a chain of steps
+    Check that all steps run, in order, within a single frame
+    """
+    calls = []
+    scheduler.schedule(*[lambda dt, i=i: calls.append(i) for i in range(5)])
+    scheduler.run_frame()
+    assert calls == [0, 1, 2, 3, 4]
+    assert len(scheduler) == 0
+
+
+def test_budget_yields(scheduler, timer):
+    """
+    Given steps that exceed the frame budget
+    Check that the scheduler yields and resumes on the next frame
+    """
+    calls = []
+
+    def slow_step(dt, i):
+        calls.append(i)
+        timer.now += 0.005
+
+    scheduler.schedule(*[lambda dt, i=i: slow_step(dt, i) for i in range(4)])
+    scheduler.run_frame()
+    assert calls == [0, 1]
+    scheduler.run_frame()
+    assert calls == [0, 1, 2, 3]
+
+
+def test_priority_and_cancel(scheduler):
+    """
+    Given tasks of mixed priority, one cancelled
+    Check that high priority runs first and cancelled tasks never run
+    """
+    calls = []
+    scheduler.schedule(lambda dt: calls.append("low"), priority=PRIORITY_LOW)
+    cancelled = scheduler.schedule(lambda dt: calls.append("cancelled"))
+    scheduler.schedule(lambda dt: calls.append("high"), priority=PRIORITY_HIGH)
+    cancelled.cancel()
+    scheduler.run_frame()
+    assert calls == ["high", "low"]
@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from utils.tracing import Histogram, TRACER, trace
+
+
+@pytest.fixture
+def tracer():
+    enabled = TRACER.enabled
+    TRACER.enabled = True
+    TRACER.reset()
+    yield TRACER
+    TRACER.reset()
+    TRACER.enabled = enabled
+
+
+def test_histogram_percentiles():
+    """
+    Given 1..1000 ms
+    Check that percentiles are within bucket resolution of the exact values
+    """
+    hist = Histogram()
+    for ms in range(1, 1001):
+        hist.record(ms * 1_000_000)
+    summary = hist.summary()
+    assert summary["count"] == 1000
+    assert summary["max_ms"] == pytest.approx(1000)
+    for p, expected in ((50, 500), (95, 950), (99, 990)):
+        assert summary[f"p{p}_ms"] == pytest.approx(expected, rel=0.06)
+
+
+def test_trace_context_and_decorator(tracer):
+    @trace("decorated")
+    def work():
+        return 1
+
+    for _ in range(3):
+        assert work() == 1
+    with trace("block"):
+        pass
+
+    snapshot = tracer.snapshot()
+    assert snapshot["decorated"]["count"] == 3
+    assert snapshot["block"]["count"] == 1
+
+
+def test_trace_records_on_error(tracer):
+    @trace("fails")
+    def fail():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        fail()
+    assert tracer.snapshot()["fails"]["count"] == 1
+
+
+def test_disabled_records_nothing(tracer):
+    tracer.enabled = False
+    with trace("off"):
+        pass
+    assert tracer.snapshot() == {}
+
+
+def test_dump(tracer, tmp_path):
+    with trace("dumped"):
+        pass
+    out = tmp_path / "trace.json"
+    tracer.dump(out)
+    data = json.loads(out.read_text())
+    assert set(data["dumped"]) >= {"count", "p50_ms", "p95_ms", "p99_ms"}